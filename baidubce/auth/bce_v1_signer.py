@@ -16,9 +16,12 @@ This module provides authentication functions for bce services.
 from __future__ import absolute_import
 from builtins import str
 from builtins import bytes
+import bisect
+import collections
 import hashlib
 import hmac
 import logging
+import threading
 
 from baidubce.http import http_headers
 from baidubce import utils
@@ -27,15 +30,17 @@ from baidubce import compat
 
 _logger = logging.getLogger(__name__)
 
+_DEFAULT_HEADERS_TO_SIGN = frozenset([b"host",
+                                      b"content-md5",
+                                      b"content-length",
+                                      b"content-type"])
+
 
 def _get_canonical_headers(headers, headers_to_sign=None):
     headers = headers or {}
 
     if headers_to_sign is None or len(headers_to_sign) == 0:
-        headers_to_sign = set([b"host",
-                               b"content-md5",
-                               b"content-length",
-                               b"content-type"])
+        headers_to_sign = _DEFAULT_HEADERS_TO_SIGN
     result = []
     for k in headers:
         k_lower = k.strip().lower()
@@ -49,46 +54,178 @@ def _get_canonical_headers(headers, headers_to_sign=None):
     return (b'\n').join(result)
 
 
+class Signer(object):
+    """
+    A bce-auth-v1 signer which caches what does not change between requests.
+
+    The derived signing key only depends on the credentials, the second of the timestamp and the
+    expiration, so it is cached for the requests signed within the same second. The canonical
+    form of each header is cached too, as most headers (host, content-type...) repeat from one
+    request to another. Both caches are bounded and thread-safe.
+
+    :param max_sign_keys: the maximum number of derived signing keys kept
+    :type max_sign_keys: int
+    :param max_canonical_headers: the maximum number of canonical headers kept
+    :type max_canonical_headers: int
+    """
+    def __init__(self, max_sign_keys=64, max_canonical_headers=1024):
+        self._max_sign_keys = max_sign_keys
+        self._max_canonical_headers = max_canonical_headers
+        self._sign_keys = collections.OrderedDict()
+        self._canonical_headers = {}
+        self._lock = threading.Lock()
+
+    def _get_sign_key(self, credentials, canonical_time, expiration_in_seconds):
+        cache_key = (credentials.access_key_id, credentials.secret_access_key,
+                     canonical_time, expiration_in_seconds)
+        with self._lock:
+            cached = self._sign_keys.get(cache_key)
+        if cached is not None:
+            return cached
+
+        sign_key_info = b'bce-auth-v1/%s/%s/%d' % (
+            credentials.access_key_id,
+            canonical_time,
+            expiration_in_seconds)
+        sign_key = hmac.new(
+            credentials.secret_access_key,
+            sign_key_info,
+            hashlib.sha256).hexdigest()
+        cached = (sign_key_info, compat.convert_to_bytes(sign_key))
+        with self._lock:
+            self._sign_keys[cache_key] = cached
+            while len(self._sign_keys) > self._max_sign_keys:
+                self._sign_keys.popitem(last=False)
+        return cached
+
+    def _get_canonical_header(self, key, value):
+        cache_key = (key, value)
+        result = self._canonical_headers.get(cache_key)
+        if result is None:
+            result = b"%s:%s" % (
+                utils.normalize_string(key),
+                utils.normalize_string(utils.convert_to_standard_string(value).strip()))
+            with self._lock:
+                if len(self._canonical_headers) >= self._max_canonical_headers:
+                    self._canonical_headers.clear()
+                self._canonical_headers[cache_key] = result
+        return result
+
+    def prepare(self, credentials, http_method, path, headers, params,
+                expiration_in_seconds=1800, headers_to_sign=None, canonical_querystring=None):
+        """
+        Canonicalize a request once, so that it can be signed again on retry by only updating
+        the x-bce-date header.
+
+        :param canonical_querystring: the canonical querystring of params if already computed
+        :type canonical_querystring: bytes
+        :return: the prepared signature
+        :rtype: PreparedSignature
+        """
+        headers = headers or {}
+        if canonical_querystring is None:
+            canonical_querystring = utils.get_canonical_querystring(params or {}, True)
+        if not headers_to_sign:
+            signed_headers = _DEFAULT_HEADERS_TO_SIGN
+        else:
+            signed_headers = headers_to_sign
+        canonical_headers = []
+        for k in headers:
+            k_lower = k.strip().lower()
+            if k == http_headers.BCE_DATE:
+                continue
+            if k_lower.startswith(http_headers.BCE_PREFIX) \
+                    or k_lower in signed_headers:
+                canonical_headers.append(self._get_canonical_header(k_lower, headers[k]))
+        canonical_headers.sort()
+        return PreparedSignature(self, credentials,
+                                 (b'\n').join([http_method, path, canonical_querystring]),
+                                 canonical_headers, expiration_in_seconds, headers_to_sign)
+
+    def sign(self, credentials, http_method, path, headers, params,
+             timestamp=0, expiration_in_seconds=1800, headers_to_sign=None):
+        """
+        Create the authorization
+        """
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug('Sign params: %s %s %s %s %d %d %s' % (
+                http_method, path, headers, params, timestamp, expiration_in_seconds,
+                headers_to_sign))
+        headers = headers or {}
+        return self.prepare(credentials, http_method, path, headers, params,
+                            expiration_in_seconds, headers_to_sign).sign(headers, timestamp)
+
+
+class PreparedSignature(object):
+    """
+    The canonical request without x-bce-date, created by Signer.prepare.
+    """
+    def __init__(self, signer, credentials, canonical_request, canonical_headers,
+                 expiration_in_seconds, headers_to_sign):
+        self._signer = signer
+        self._credentials = credentials
+        self._canonical_request = canonical_request
+        self._canonical_headers = canonical_headers
+        self._expiration_in_seconds = expiration_in_seconds
+        self._headers_to_sign = headers_to_sign
+
+    def sign(self, headers, timestamp=0):
+        """
+        Create the authorization with the current x-bce-date of headers.
+
+        :param headers: the headers of the request
+        :type headers: dict
+        :param timestamp: the timestamp of the authorization, 0 for now
+        :type timestamp: int
+        :return: the authorization
+        :rtype: bytes
+        """
+        sign_key_info, sign_key = self._signer._get_sign_key(
+            self._credentials, utils.get_canonical_time(timestamp), self._expiration_in_seconds)
+
+        canonical_headers = self._canonical_headers
+        date = headers.get(http_headers.BCE_DATE)
+        if date is not None:
+            canonical_headers = list(canonical_headers)
+            bisect.insort(canonical_headers, b"%s:%s" % (
+                http_headers.BCE_DATE,
+                utils.normalize_string(utils.convert_to_standard_string(date).strip())))
+
+        string_to_sign = b'%s\n%s' % (self._canonical_request, (b'\n').join(canonical_headers))
+        sign_result = hmac.new(sign_key, string_to_sign, hashlib.sha256).hexdigest()
+        # convert to bytes
+        sign_result = compat.convert_to_bytes(sign_result)
+
+        if self._headers_to_sign:
+            result = b'%s/%s/%s' % (sign_key_info, (b';').join(self._headers_to_sign),
+                                    sign_result)
+        else:
+            result = b'%s//%s' % (sign_key_info, sign_result)
+
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug('sign_key=[%s] sign_string=[%d bytes][ %s ]' %
+                          (sign_key, len(string_to_sign), string_to_sign))
+            _logger.debug('result=%s' % result)
+        return result
+
+
+_default_signer = Signer()
+
+
 def sign(credentials, http_method, path, headers, params,
          timestamp=0, expiration_in_seconds=1800, headers_to_sign=None):
     """
-    Create the authorization
+    Create the authorization with the signer shared by all clients in the process.
     """
+    return _default_signer.sign(credentials, http_method, path, headers, params,
+                                timestamp, expiration_in_seconds, headers_to_sign)
 
-    _logger.debug('Sign params: %s %s %s %s %d %d %s' % (
-        http_method, path, headers, params, timestamp, expiration_in_seconds, headers_to_sign))
 
-    headers = headers or {}
-    params = params or {}
-
-    sign_key_info = b'bce-auth-v1/%s/%s/%d' % (
-        credentials.access_key_id,
-        utils.get_canonical_time(timestamp),
-        expiration_in_seconds)
-    sign_key = hmac.new(
-        credentials.secret_access_key,
-        sign_key_info,
-        hashlib.sha256).hexdigest()
-
-    canonical_uri = path
-    canonical_querystring = utils.get_canonical_querystring(params, True)
-
-    canonical_headers = _get_canonical_headers(headers, headers_to_sign)
-
-    string_to_sign = (b'\n').join([
-        http_method, canonical_uri, 
-        canonical_querystring, canonical_headers
-        ])
-    sign_result = hmac.new(compat.convert_to_bytes(sign_key), string_to_sign, hashlib.sha256).hexdigest()
-    # convert to bytes
-    sign_result = compat.convert_to_bytes(sign_result)
-
-    if headers_to_sign:
-        result = b'%s/%s/%s' % (sign_key_info, (b';').join(headers_to_sign), sign_result)
-    else:
-        result = b'%s//%s' % (sign_key_info, sign_result)
-
-    _logger.debug('sign_key=[%s] sign_string=[%d bytes][ %s ]' %
-                  (sign_key, len(string_to_sign), string_to_sign))
-    _logger.debug('result=%s' % result)
-    return result
+def prepare(credentials, http_method, path, headers, params,
+            expiration_in_seconds=1800, headers_to_sign=None, canonical_querystring=None):
+    """
+    Prepare the signature of a request with the signer shared by all clients in the process.
+    """
+    return _default_signer.prepare(credentials, http_method, path, headers, params,
+                                   expiration_in_seconds, headers_to_sign,
+                                   canonical_querystring)
@@ -35,7 +35,20 @@ class BceClientConfiguration(object):
                  send_buf_size=None,
                  recv_buf_size=None,
                  retry_policy=None,
-                 security_token=None):
+                 security_token=None,
+                 connection_pool_size=None,
+                 connection_idle_timeout_in_mills=None,
+                 raw_json_response=None,
+                 max_concurrency=None,
+                 max_requests_per_second=None,
+                 connect_timeout_in_mills=None,
+                 read_timeout_in_mills=None,
+                 write_timeout_in_mills=None,
+                 deadline_in_mills=None,
+                 deadline=None,
+                 hedge_policy=None,
+                 request_listeners=None,
+                 dns_cache_enabled=None):
         self.credentials = credentials
         self.endpoint = compat.convert_to_bytes(endpoint) if endpoint is not None else endpoint
         self.protocol = protocol
@@ -48,6 +61,29 @@ class BceClientConfiguration(object):
         else:
             self.retry_policy = retry_policy
         self.security_token = security_token
+        self.connection_pool_size = connection_pool_size
+        self.connection_idle_timeout_in_mills = connection_idle_timeout_in_mills
+        # set the JSON bodies as plain dicts to response.body instead of response attributes
+        self.raw_json_response = raw_json_response
+        # adaptive limits of the requests to the endpoint, shared by all clients in the process,
+        # see baidubce.http.throttle.AdaptiveLimiter
+        self.max_concurrency = max_concurrency
+        self.max_requests_per_second = max_requests_per_second
+        # timeouts of connecting, sending and receiving, connection_timeout_in_mills if None
+        self.connect_timeout_in_mills = connect_timeout_in_mills
+        self.read_timeout_in_mills = read_timeout_in_mills
+        self.write_timeout_in_mills = write_timeout_in_mills
+        # time allowed to an sdk call including its retries, and the time since epoch by which
+        # it should be done, which takes precedence and is shared by the requests of a call
+        self.deadline_in_mills = deadline_in_mills
+        self.deadline = deadline
+        # hedge the small reads of the clients supporting it, see baidubce.http.hedge
+        self.hedge_policy = hedge_policy
+        # callables receiving a baidubce.http.request_event.RequestEvent after each attempt
+        self.request_listeners = request_listeners
+        # resolve the endpoint through the cache shared by all clients, see
+        # baidubce.http.dns_cache, False to resolve it on every new connection
+        self.dns_cache_enabled = dns_cache_enabled
 
     def merge_non_none_values(self, other):
         """
@@ -65,10 +101,14 @@ DEFAULT_REGION = baidubce.region.BEIJING
 DEFAULT_CONNECTION_TIMEOUT_IN_MILLIS = 50 * 1000
 DEFAULT_SEND_BUF_SIZE = 1024 * 1024
 DEFAULT_RECV_BUF_SIZE = 10 * 1024 * 1024
+DEFAULT_CONNECTION_POOL_SIZE = 32
+DEFAULT_CONNECTION_IDLE_TIMEOUT_IN_MILLIS = 20 * 1000
 DEFAULT_CONFIG = BceClientConfiguration(
     protocol=DEFAULT_PROTOCOL,
     region=DEFAULT_REGION,
     connection_timeout_in_mills=DEFAULT_CONNECTION_TIMEOUT_IN_MILLIS,
     send_buf_size=DEFAULT_SEND_BUF_SIZE,
     recv_buf_size=DEFAULT_RECV_BUF_SIZE,
-    retry_policy=BackOffRetryPolicy())
+    retry_policy=BackOffRetryPolicy(),
+    connection_pool_size=DEFAULT_CONNECTION_POOL_SIZE,
+    connection_idle_timeout_in_mills=DEFAULT_CONNECTION_IDLE_TIMEOUT_IN_MILLIS)
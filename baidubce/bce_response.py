@@ -20,6 +20,9 @@ from baidubce import utils
 from baidubce import compat
 from baidubce.http import http_headers
 
+_BCE_PREFIX = compat.convert_to_string(http_headers.BCE_PREFIX)
+_ETAG = compat.convert_to_string(http_headers.ETAG.lower())
+
 
 class BceResponse(object):
     """
@@ -34,13 +37,14 @@ class BceResponse(object):
         :param headers:
         :return:
         """
+        metadata = self.metadata.__dict__
         for k, v in iteritems(headers):
-            if k.startswith(compat.convert_to_string(http_headers.BCE_PREFIX)):
-                k = 'bce_' + k[len(compat.convert_to_string(http_headers.BCE_PREFIX)):]
+            if k.startswith(_BCE_PREFIX):
+                k = 'bce_' + k[len(_BCE_PREFIX):]
             k = utils.pythonize_name(k.replace('-', '_'))
-            if k.lower() == compat.convert_to_string(http_headers.ETAG.lower()):
+            if k.lower() == _ETAG:
                 v = v.strip('"')
-            setattr(self.metadata, k, v)
+            metadata[k] = v
 
     def __getattr__(self, item):
         if item.startswith('__'):
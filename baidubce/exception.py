@@ -35,11 +35,13 @@ class BceServerError(BceError):
     REQUEST_EXPIRED = b'RequestExpired'
 
     """Error threw when connect to server."""
-    def __init__(self, message, status_code=None, code=None, request_id=None):
+    def __init__(self, message, status_code=None, code=None, request_id=None, retry_after=None):
         BceError.__init__(self, message)
         self.status_code = status_code
         self.code = code
         self.request_id = request_id
+        # the Retry-After header of the response, in seconds or as a http date
+        self.retry_after = retry_after
 
 
 class BceHttpClientError(BceError):
@@ -0,0 +1,593 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides an asyncio version of the http request function for bce services.
+
+It shares the signer, the response handlers and the retry policies with bce_http_client, only
+the network I/O is done with asyncio streams. Python 3.6+ is required.
+"""
+import asyncio
+import collections
+import logging
+import socket
+import ssl
+import time
+import traceback
+import weakref
+
+import baidubce
+from baidubce import compat
+from baidubce import utils
+from baidubce.bce_response import BceResponse
+from baidubce.exception import BceClientError
+from baidubce.exception import BceHttpClientError
+from baidubce.http import bce_http_client
+from baidubce.http import dns_cache
+from baidubce.http import handler
+from baidubce.http import http_headers
+from baidubce.http import http_methods
+from baidubce.http import request_event
+
+_logger = logging.getLogger(__name__)
+
+_USER_AGENT = bce_http_client.get_user_agent('bce-sdk-python-aio')
+
+_CHUNKED = 'chunked'
+
+
+async def _wait_for(coroutine, timeout_in_millis):
+    """
+    Wait for the coroutine with a timeout, a timeout is raised as socket.timeout just like the
+    blocking client so that the retry policies treat both clients the same way.
+    """
+    try:
+        return await asyncio.wait_for(coroutine, timeout_in_millis / 1000.0)
+    except asyncio.TimeoutError:
+        raise socket.timeout('timed out')
+
+
+class AsyncConnection(object):
+    """
+    A keep-alive connection built on asyncio streams.
+    """
+    def __init__(self, protocol, host, port, dns_cache_enabled=True):
+        self.protocol = protocol
+        self.host = host
+        self.port = port
+        self.dns_cache_enabled = dns_cache_enabled
+        self.reader = None
+        self.writer = None
+        self.last_used = time.time()
+
+    async def connect(self, connection_timeout_in_millis, event=None):
+        """
+        Open the connection.
+
+        :param event: the event the dns and connect timings are added to, the tls handshake
+            is part of connect
+        :type event: baidubce.http.request_event.RequestEvent
+        """
+        ssl_context = None
+        if self.protocol.name == baidubce.protocol.HTTPS.name:
+            ssl_context = ssl.create_default_context()
+        elif self.protocol.name != baidubce.protocol.HTTP.name:
+            raise ValueError(
+                'Invalid protocol: %s, either HTTP or HTTPS is expected.' % self.protocol)
+        self.reader, self.writer = await _wait_for(
+            self._open_connection(ssl_context, event), connection_timeout_in_millis)
+
+    async def _open_connection(self, ssl_context, event):
+        """
+        Connect to the addresses of the host given by the shared dns cache in turn, ejecting
+        those failing to connect, or to the host itself if the cache is disabled.
+        """
+        host = compat.convert_to_string(self.host)
+        if event is not None:
+            start = time.time()
+        if not self.dns_cache_enabled:
+            # the dns and connect phases can not be told apart
+            try:
+                return await asyncio.open_connection(
+                    host, self.port, ssl=ssl_context,
+                    server_hostname=host if ssl_context is not None else None)
+            finally:
+                if event is not None:
+                    event.add_timing(request_event.CONNECT, start)
+        cache = dns_cache.get_default_dns_cache()
+        addresses = await asyncio.get_event_loop().run_in_executor(
+            None, cache.get_addresses, host, self.port)
+        if event is not None:
+            start = event.add_timing(request_event.DNS, start)
+        error = None
+        for family, _, _, _, sockaddr in addresses:
+            try:
+                streams = await asyncio.open_connection(
+                    sockaddr[0], sockaddr[1], family=family, ssl=ssl_context,
+                    server_hostname=host if ssl_context is not None else None)
+            except OSError as e:
+                error = e
+                cache.eject(sockaddr)
+                continue
+            finally:
+                if event is not None:
+                    start = event.add_timing(request_event.CONNECT, start)
+            cache.restore(sockaddr)
+            return streams
+        if error is None:
+            error = OSError('getaddrinfo returns an empty list')
+        raise error
+
+    def is_dropped(self):
+        """
+        :return: true if the connection has been closed by either side
+        :rtype: bool
+        """
+        return self.writer is None or self.writer.is_closing() or self.reader.at_eof()
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class AsyncConnectionPool(object):
+    """
+    A pool of idle keep-alive connections keyed by (protocol, host, port), one per event loop.
+    """
+    def __init__(self):
+        self._idle_connections = {}
+
+    def get_connection(self, protocol, host, port, idle_timeout_in_millis):
+        """
+        :return: a reusable connection, or None if there is no one
+        :rtype: AsyncConnection
+        """
+        connections = self._idle_connections.get((protocol.name, host, port))
+        now = time.time()
+        while connections:
+            conn = connections.pop()
+            if idle_timeout_in_millis is not None \
+                    and (now - conn.last_used) * 1000 > idle_timeout_in_millis:
+                conn.close()
+            elif conn.is_dropped():
+                conn.close()
+            else:
+                return conn
+        return None
+
+    def release_connection(self, conn, max_size):
+        """
+        Put a connection whose last response has been fully read back to the pool.
+        """
+        if not max_size or conn.is_dropped():
+            conn.close()
+            return
+        connections = self._idle_connections.setdefault(
+            (conn.protocol.name, conn.host, conn.port), collections.deque())
+        if len(connections) < max_size:
+            conn.last_used = time.time()
+            connections.append(conn)
+        else:
+            conn.close()
+
+
+_pools = weakref.WeakKeyDictionary()
+
+
+def _get_pool():
+    loop = asyncio.get_event_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = AsyncConnectionPool()
+        _pools[loop] = pool
+    return pool
+
+
+class AsyncHttpResponse(object):
+    """
+    The response of an asyncio http request.
+
+    The response handlers shared with the blocking client read the body with read(), which works
+    once the body has been prefetched. Streaming bodies are read with the coroutine aread() and the
+    connection goes back to the pool when the body is exhausted.
+    """
+    def __init__(self, conn, http_method, config, read_timeout_in_millis=None):
+        self._conn = conn
+        self._http_method = http_method
+        self._config = config
+        if read_timeout_in_millis is None:
+            read_timeout_in_millis = bce_http_client.get_timeouts_in_millis(config)[2]
+        self._read_timeout = read_timeout_in_millis
+        self._headers = []
+        self._length = None
+        self._chunked = False
+        self._chunk_left = 0
+        self._will_close = False
+        self._body = None
+        self._done = False
+        self.status = None
+        self.reason = None
+        self.version = None
+
+    async def _read_line(self):
+        line = await _wait_for(self._conn.reader.readline(), self._read_timeout)
+        if not line:
+            raise IOError('Remote end closed connection without response')
+        return line
+
+    async def begin(self):
+        """
+        Read the status line and the headers.
+        """
+        while True:
+            version, status, reason = (
+                compat.convert_to_string(await self._read_line()).rstrip('\r\n') + '  ').split(' ', 2)
+            if not version.startswith('HTTP/'):
+                raise IOError('Bad status line: %s' % version)
+            headers = []
+            while True:
+                line = await self._read_line()
+                if line in (b'\r\n', b'\n'):
+                    break
+                k, v = compat.convert_to_string(line).split(':', 1)
+                headers.append((k.strip().lower(), v.strip()))
+            # skip the interim 100-continue response
+            if int(status) != 100:
+                break
+        self.version = version
+        self.status = int(status)
+        self.reason = reason.strip()
+        self._headers = headers
+
+        connection = (self.getheader('connection') or '').lower()
+        if version == 'HTTP/1.0':
+            self._will_close = connection != 'keep-alive'
+        else:
+            self._will_close = connection == 'close'
+        if self._http_method == http_methods.HEAD or self.status in (204, 304):
+            self._length = 0
+        elif (self.getheader('transfer-encoding') or '').lower() == _CHUNKED:
+            self._chunked = True
+        elif self.getheader('content-length') is not None:
+            self._length = int(self.getheader('content-length'))
+        else:
+            # the body is delimited by the end of the connection
+            self._will_close = True
+        if self._length == 0:
+            self._finish()
+
+    def getheaders(self):
+        """
+        :return: list of (header, value) tuples, header names are in lower case
+        :rtype: list
+        """
+        return list(self._headers)
+
+    def getheader(self, name, default=None):
+        """
+        :return: the value of the header, or default if there is no such header
+        """
+        name = compat.convert_to_string(name).lower()
+        for k, v in self._headers:
+            if k == name:
+                return v
+        return default
+
+    async def _read_chunked(self, amt):
+        reader = self._conn.reader
+        timeout = self._read_timeout
+        if self._chunk_left == 0:
+            line = compat.convert_to_string(await self._read_line())
+            self._chunk_left = int(line.split(';', 1)[0], 16)
+            if self._chunk_left == 0:
+                # skip the trailers
+                while (await self._read_line()) not in (b'\r\n', b'\n'):
+                    pass
+                self._finish()
+                return b''
+        if amt is None or amt < 0 or amt > self._chunk_left:
+            amt = self._chunk_left
+        data = await _wait_for(reader.read(amt), timeout)
+        if not data:
+            raise IOError('Connection closed in the middle of a chunk')
+        self._chunk_left -= len(data)
+        if self._chunk_left == 0:
+            await _wait_for(reader.readexactly(2), timeout)
+        return data
+
+    async def aread(self, amt=None):
+        """
+        Read at most amt bytes of the body, or the whole remaining body if amt is None.
+
+        :return: the data read, empty bytes at the end of the body
+        :rtype: bytes
+        """
+        if self._body is not None:
+            if amt is None or amt < 0:
+                data, self._body = self._body, b''
+            else:
+                data, self._body = self._body[:amt], self._body[amt:]
+            return data
+        if self._done:
+            return b''
+        if amt is None or amt < 0:
+            buf = []
+            while True:
+                data = await self.aread(self._config.recv_buf_size)
+                if not data:
+                    return b''.join(buf)
+                buf.append(data)
+        if self._chunked:
+            return await self._read_chunked(amt)
+        if self._length is not None:
+            amt = min(amt, self._length)
+        data = await _wait_for(self._conn.reader.read(amt), self._read_timeout)
+        if self._length is not None:
+            if not data:
+                raise IOError('Connection closed before the response body was complete')
+            self._length -= len(data)
+            if self._length == 0:
+                self._finish()
+        elif not data:
+            self._finish()
+        return data
+
+    async def iter_chunks(self, size=None):
+        """
+        Iterate over the body in chunks of at most size bytes.
+        """
+        size = size or self._config.recv_buf_size
+        while True:
+            data = await self.aread(size)
+            if not data:
+                break
+            yield data
+
+    async def prefetch(self):
+        """
+        Read the whole body into memory so that read() can be used.
+        """
+        if self._body is None:
+            self._body = await self.aread()
+
+    def read(self, amt=None):
+        """
+        Read the prefetched body.
+
+        :rtype: bytes
+        """
+        if self._body is None:
+            raise BceClientError('The body is not prefetched, use "await aread()" instead.')
+        if amt is None or amt < 0:
+            data, self._body = self._body, b''
+        else:
+            data, self._body = self._body[:amt], self._body[amt:]
+        return data
+
+    def _finish(self):
+        self._done = True
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if self._will_close:
+            conn.close()
+        else:
+            _get_pool().release_connection(conn, self._config.connection_pool_size)
+
+    def isclosed(self):
+        """
+        :return: true if the body has been fully read or the response is closed
+        :rtype: bool
+        """
+        return self._conn is None
+
+    def close(self):
+        """
+        Close the response, the connection is dropped if the body has not been fully read.
+        """
+        self._done = True
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+async def _acquire_connection(config, protocol, host, port, timeouts_in_millis=None,
+                              event=None):
+    if timeouts_in_millis is None:
+        timeouts_in_millis = bce_http_client.get_timeouts_in_millis(config)
+    conn = None
+    if config.connection_pool_size:
+        conn = _get_pool().get_connection(
+            protocol, host, port, config.connection_idle_timeout_in_mills)
+    if conn is None:
+        conn = AsyncConnection(protocol, host, port, config.dns_cache_enabled is not False)
+        await conn.connect(timeouts_in_millis[0], event)
+    return conn
+
+
+async def _send_http_request(conn, http_method, uri, headers, body, config,
+                             timeouts_in_millis=None, event=None):
+    if event is not None:
+        start = time.time()
+    if timeouts_in_millis is None:
+        timeouts_in_millis = bce_http_client.get_timeouts_in_millis(config)
+    timeout = timeouts_in_millis[1]
+    lines = [b'%s %s HTTP/1.1' % (compat.convert_to_bytes(http_method),
+                                   compat.convert_to_bytes(uri))]
+    for k, v in headers.items():
+        lines.append(b'%s: %s' % (utils.convert_to_standard_string(k),
+                                  utils.convert_to_standard_string(v)))
+    lines.append(b'\r\n')
+    writer = conn.writer
+    writer.write(b'\r\n'.join(lines))
+
+    if body:
+        if isinstance(body, bytes):
+            writer.write(body)
+        elif hasattr(body, '__aiter__'):
+            async for buf in body:
+                writer.write(buf)
+                await _wait_for(writer.drain(), timeout)
+        else:
+            total = int(headers[http_headers.CONTENT_LENGTH])
+            sent = 0
+            while sent < total:
+                size = min(total - sent, config.send_buf_size)
+                buf = body.read(size)
+                if asyncio.iscoroutine(buf):
+                    buf = await buf
+                if not buf:
+                    raise BceClientError(
+                        'Insufficient data, only %d bytes available while %s is %d' % (
+                            sent, http_headers.CONTENT_LENGTH, total))
+                writer.write(buf)
+                await _wait_for(writer.drain(), timeout)
+                sent += len(buf)
+    await _wait_for(writer.drain(), timeout)
+    if event is not None:
+        start = event.add_timing(request_event.WRITE, start)
+
+    http_response = AsyncHttpResponse(conn, http_method, config, timeouts_in_millis[2])
+    await http_response.begin()
+    if event is not None:
+        event.add_timing(request_event.FIRST_BYTE, start)
+        event.status = http_response.status
+    return http_response
+
+
+async def send_request(
+        config,
+        sign_function,
+        response_handler_functions,
+        http_method, path, body, headers, params,
+        stream=False, headers_to_sign=None, service_id=None, path_template=None):
+    """
+    Send request to BCE services, the coroutine version of bce_http_client.send_request.
+
+    :param config
+    :type config: baidubce.BceClientConfiguration
+
+    :param sign_function:
+
+    :param response_handler_functions:
+    :type response_handler_functions: list
+
+    :param stream: if true, the body of a 2xx response is not prefetched and has to be read with
+        "await http_response.aread()"
+    :type stream: bool
+
+    :param headers_to_sign: passed to sign_function if not None
+    :type headers_to_sign: list
+
+    :param service_id: the id of the service, reported to config.request_listeners
+    :type service_id: str
+
+    :param path_template: the path with placeholders for its variable parts, reported to
+        config.request_listeners instead of the path
+    :type path_template: bytes
+
+    :return:
+    :rtype: baidubce.BceResponse
+    """
+    _logger.debug(b'%s request start: %s %s, %s, %s',
+                  http_method, path, headers, params, body)
+    request = bce_http_client.PreparedRequest(config, sign_function, http_method, path, body,
+                                              headers, params, user_agent=_USER_AGENT,
+                                              headers_to_sign=headers_to_sign)
+    response_handler_functions = handler.get_response_handlers(config,
+                                                               response_handler_functions)
+    protocol, host, port = request.protocol, request.host, request.port
+    deadline = bce_http_client.get_deadline(config)
+    listeners = getattr(config, 'request_listeners', None)
+    if path_template is None:
+        path_template = path
+
+    retries_attempted = 0
+    errors = []
+    while True:
+        http_response = None
+        conn = None
+        bce_http_client.check_deadline(deadline, retries_attempted, errors)
+        breaker, endpoint = bce_http_client.check_circuit_breaker(config, protocol, host, port,
+                                                                  errors)
+        event = None
+        if listeners:
+            event = request_event.RequestEvent(service_id, http_method, path_template,
+                                               retries_attempted)
+            event.bytes_sent = int(request.headers.get(http_headers.CONTENT_LENGTH, 0))
+            start = time.time()
+        try:
+            request.sign()
+            if event is not None:
+                event.add_timing(request_event.SIGN, start)
+            if retries_attempted > 0:
+                request.rewind_body()
+
+            timeouts_in_millis = bce_http_client.get_timeouts_in_millis(config, deadline)
+            conn = await _acquire_connection(config, protocol, host, port, timeouts_in_millis,
+                                             event)
+            http_response = await _send_http_request(
+                conn, http_method, request.uri, request.headers, request.body, config,
+                timeouts_in_millis, event)
+            conn = None
+
+            if event is not None:
+                start = time.time()
+            if not stream or http_response.status // 100 != 2:
+                await http_response.prefetch()
+
+            _logger.debug('request return: status=%d, headers=%s',
+                          http_response.status, http_response.getheaders())
+            response = BceResponse()
+            response.set_metadata_from_headers(dict(http_response.getheaders()))
+
+            for handler_function in response_handler_functions:
+                if handler_function(http_response, response):
+                    break
+
+            if breaker is not None:
+                breaker.record_success(endpoint)
+            if event is not None:
+                event.add_timing(request_event.READ, start)
+                if response.metadata.content_length is not None:
+                    event.bytes_received = int(response.metadata.content_length)
+                event.finish(listeners)
+            return response
+        except Exception as e:
+            if breaker is not None:
+                breaker.record_error(endpoint, e)
+            if event is not None:
+                event.error = e
+                event.finish(listeners)
+            if conn is not None:
+                conn.close()
+            if http_response is not None:
+                http_response.close()
+
+            errors.append('\n'.join('>>>>' + line for line in traceback.format_exc().splitlines()))
+
+            if config.retry_policy.should_retry(e, retries_attempted):
+                delay_in_millis = config.retry_policy.get_delay_before_next_retry_in_millis(
+                    e, retries_attempted)
+                bce_http_client.check_deadline(deadline, retries_attempted, errors, e,
+                                               delay_in_millis)
+                await asyncio.sleep(delay_in_millis / 1000.0)
+            else:
+                raise BceHttpClientError('Unable to execute HTTP request. Retried %d times. '
+                                         'All trace backs:\n%s' % (retries_attempted,
+                                                                   '\n'.join(errors)), e)
+
+        retries_attempted += 1
@@ -13,26 +13,40 @@
 """
 This module provide http request function for bce services.
 """
-from future.utils import iteritems, iterkeys, itervalues
+from future.utils import iteritems, iterkeys, itervalues, raise_
 from builtins import str, bytes
 import logging
 import http.client
+import mmap
+import os
+import socket
+import ssl
+import stat
 import sys
+import threading
 import time
 import traceback
 
 import baidubce
 from baidubce import compat
 from baidubce import utils
+from baidubce.auth import bce_v1_signer
 from baidubce.bce_response import BceResponse
 from baidubce.exception import BceHttpClientError
 from baidubce.exception import BceClientError
+from baidubce.http import connection_pool
+from baidubce.http import dns_cache
+from baidubce.http import handler
 from baidubce.http import http_headers
+from baidubce.http import request_event
+from baidubce.http import throttle
+from baidubce.http.hedge import IDEMPOTENT_METHODS
 
 _logger = logging.getLogger(__name__)
 
 
-def _get_connection(protocol, host, port, connection_timeout_in_millis):
+def _get_connection(protocol, host, port, connection_timeout_in_millis,
+                    dns_cache_enabled=True):
     """
     :param protocol
     :type protocol: baidubce.protocol.Protocol
@@ -40,24 +54,196 @@ def _get_connection(protocol, host, port, connection_timeout_in_millis):
     :type endpoint: str
     :param connection_timeout_in_millis
     :type connection_timeout_in_millis int
+    :param dns_cache_enabled: resolve the host through the shared dns cache, and spread the
+        connections across its addresses
+    :type dns_cache_enabled: bool
     """
     host = compat.convert_to_string(host)
     if protocol.name == baidubce.protocol.HTTP.name:
-        return http.client.HTTPConnection(
-            host=host, port=port, timeout=connection_timeout_in_millis / 1000)
+        connection_class = dns_cache.CachedHTTPConnection if dns_cache_enabled \
+            else http.client.HTTPConnection
     elif protocol.name == baidubce.protocol.HTTPS.name:
-        return http.client.HTTPSConnection(
-            host=host, port=port, timeout=connection_timeout_in_millis / 1000)
+        connection_class = dns_cache.CachedHTTPSConnection if dns_cache_enabled \
+            else http.client.HTTPSConnection
     else:
         raise ValueError(
             'Invalid protocol: %s, either HTTP or HTTPS is expected.' % protocol)
+    return connection_class(host=host, port=port, timeout=connection_timeout_in_millis / 1000)
 
 
-def _send_http_request(conn, http_method, uri, headers, body, send_buf_size):
+def get_deadline(config):
+    """
+    :return: the time since epoch by which the call should be done, None if there is none.
+        config.deadline is used if it is set, like by the BosClient methods sending several
+        requests, otherwise deadline_in_mills counts from now.
+    :rtype: float
+    """
+    deadline = getattr(config, 'deadline', None)
+    if deadline is None:
+        deadline_in_mills = getattr(config, 'deadline_in_mills', None)
+        if deadline_in_mills is not None:
+            deadline = time.time() + deadline_in_mills / 1000.0
+    return deadline
+
+
+def get_timeouts_in_millis(config, deadline=None):
+    """
+    :return: the (connect, write, read) timeouts of the socket operations. The unset ones fall
+        back to connection_timeout_in_mills, and all are clipped to the time left before the
+        deadline.
+    :rtype: tuple
+    """
+    timeouts = []
+    for name in ('connect_timeout_in_mills', 'write_timeout_in_mills', 'read_timeout_in_mills'):
+        timeout = getattr(config, name, None)
+        if timeout is None:
+            timeout = config.connection_timeout_in_mills
+        if deadline is not None:
+            left = max(1, (deadline - time.time()) * 1000)
+            timeout = left if timeout is None else min(timeout, left)
+        timeouts.append(timeout)
+    return tuple(timeouts)
+
+
+def check_deadline(deadline, retries_attempted, errors, last_error=None, delay_in_millis=0):
+    """
+    Give up the request if the deadline is passed, or will be after delay_in_millis.
+
+    :raise BceHttpClientError: if the deadline is passed
+    """
+    if deadline is not None and time.time() + delay_in_millis / 1000.0 >= deadline:
+        raise _deadline_exceeded(retries_attempted, errors, last_error)
+
+
+def _deadline_exceeded(retries_attempted, errors, last_error=None):
+    """
+    :return: the error raised by check_deadline
+    :rtype: BceHttpClientError
+    """
+    if last_error is None:
+        last_error = BceClientError('Deadline exceeded.')
+    return BceHttpClientError('Unable to execute HTTP request before the deadline. '
+                              'Retried %d times. All trace backs:\n%s'
+                              % (retries_attempted, '\n'.join(errors)), last_error)
+
+
+def _acquire_connection(config, protocol, host, port, timeouts_in_millis=None):
+    """
+    Reuse an idle keep-alive connection to the endpoint if there is one, otherwise create a new one.
+
+    :param timeouts_in_millis: the (connect, write, read) timeouts of get_timeouts_in_millis,
+        applied by _send_http_request
+    :type timeouts_in_millis: tuple
+    """
+    if timeouts_in_millis is None:
+        timeouts_in_millis = get_timeouts_in_millis(config)
+    conn = None
+    if config.connection_pool_size:
+        conn = connection_pool.get_default_pool().get_connection(
+            protocol, host, port, config.connection_idle_timeout_in_mills)
+    if conn is None:
+        conn = _get_connection(protocol, host, port, timeouts_in_millis[0],
+                               config.dns_cache_enabled is not False)
+    else:
+        # the pooled connection may be created with another timeout
+        conn.timeout = timeouts_in_millis[0] / 1000
+        conn.sock.settimeout(timeouts_in_millis[1] / 1000)
+    conn.bce_timeouts = tuple(t / 1000.0 for t in timeouts_in_millis)
+    return conn
+
+
+def _get_limiter(config, protocol, host, port):
+    """
+    :return: the adaptive limiter of the endpoint shared by all clients, or None if neither
+        max_concurrency nor max_requests_per_second is configured
+    :rtype: baidubce.http.throttle.AdaptiveLimiter
+    """
+    max_concurrency = getattr(config, 'max_concurrency', None)
+    max_requests_per_second = getattr(config, 'max_requests_per_second', None)
+    if max_concurrency is None and max_requests_per_second is None:
+        return None
+    return throttle.get_default_registry().get_limiter(protocol, host, port, max_concurrency,
+                                                       max_requests_per_second)
+
+
+def check_circuit_breaker(config, protocol, host, port, errors):
+    """
+    Fail fast if the retry policy has a circuit breaker whose circuit of the endpoint is open.
+
+    :param errors: the trace backs of the former attempts of the request
+    :type errors: list
+    :return: the circuit breaker and the key of the endpoint, the breaker is None if the retry
+        policy has none
+    :rtype: tuple
+    :raise BceHttpClientError: if the circuit is open
+    """
+    breaker = getattr(config.retry_policy, 'circuit_breaker', None)
+    endpoint = (protocol.name, host, port)
+    if breaker is not None and not breaker.allow_request(endpoint):
+        raise BceHttpClientError('Unable to execute HTTP request, the circuit of %s is open. '
+                                 'All trace backs:\n%s' % (endpoint, '\n'.join(errors)),
+                                 BceClientError('Circuit of %s is open.' % (endpoint,)))
+    return breaker, endpoint
+
+
+def _release_connection(config, protocol, host, port, conn, http_response):
+    """
+    Put the connection back to the pool if the response has been fully read. Otherwise the body is
+    still being consumed by the caller, and the connection is closed together with the response.
+    """
+    try:
+        consumed = http_response.isclosed()
+    except AttributeError:
+        consumed = False
+    if consumed:
+        connection_pool.get_default_pool().release_connection(
+            protocol, host, port, conn, config.connection_pool_size)
+
+
+def _connect(conn, event):
+    """
+    Connect conn, adding the dns, connect and tls timings to the event.
+    """
+    start = time.time()
+    cached = isinstance(conn, (dns_cache.CachedHTTPConnection, dns_cache.CachedHTTPSConnection))
+    if cached:
+        conn.request_event = event
+    try:
+        conn.connect()
+    finally:
+        if cached:
+            conn.request_event = None
+    elapsed = (time.time() - start) * 1000
+    timings = event.timings
+    if request_event.CONNECT not in timings:
+        # the host is not resolved through the dns cache, the phases can not be told apart
+        timings[request_event.CONNECT] = elapsed
+    elif isinstance(conn, http.client.HTTPSConnection):
+        timings[request_event.TLS] = max(0, elapsed - timings.get(request_event.DNS, 0)
+                                         - timings[request_event.CONNECT])
+
+
+def _send_http_request(conn, http_method, uri, headers, body, send_buf_size, event=None):
+    """
+    :param event: the event the connect, write and first byte timings are added to, None if
+        there is no request listener
+    :type event: baidubce.http.request_event.RequestEvent
+    """
     # putrequest() need that http_method and uri is Ascii on Py2 and unicode \
     # on Py3
     http_method = compat.convert_to_string(http_method)
     uri = compat.convert_to_string(uri)
+    # the (connect, write, read) timeouts in seconds set by _acquire_connection
+    timeouts = getattr(conn, 'bce_timeouts', None)
+    if (timeouts is not None or event is not None) and conn.sock is None:
+        if event is not None:
+            _connect(conn, event)
+        else:
+            conn.connect()
+    if timeouts is not None:
+        conn.sock.settimeout(timeouts[1])
+    if event is not None:
+        start = time.time()
     conn.putrequest(http_method, uri, skip_host=True, skip_accept_encoding=True)
 
     for k, v in iteritems(headers):
@@ -71,20 +257,82 @@ def _send_http_request(conn, http_method, uri, headers, body, send_buf_size):
             conn.send(body)
         else:
             total = int(headers[http_headers.CONTENT_LENGTH])
-            sent = 0
-            while sent < total:
-                size = total - sent
-                if size > send_buf_size:
-                    size = send_buf_size
-                buf = body.read(size)
-                if not buf:
-                    raise BceClientError(
-                        'Insufficient data, only %d bytes available while %s is %d' % (
-                            sent, http_headers.CONTENT_LENGTH, total))
-                conn.send(buf)
-                sent += len(buf)
-
-    return conn.getresponse()
+            sent = _send_body(conn, body, total, send_buf_size)
+            if sent < total:
+                raise BceClientError(
+                    'Insufficient data, only %d bytes available while %s is %d' % (
+                        sent, http_headers.CONTENT_LENGTH, total))
+
+    if timeouts is not None:
+        conn.sock.settimeout(timeouts[2])
+    if event is None:
+        return conn.getresponse()
+    start = event.add_timing(request_event.WRITE, start)
+    http_response = conn.getresponse()
+    event.add_timing(request_event.FIRST_BYTE, start)
+    event.status = http_response.status
+    return http_response
+
+
+def _is_regular_file(body):
+    try:
+        return stat.S_ISREG(os.fstat(body.fileno()).st_mode)
+    except (AttributeError, IOError, OSError, ValueError):
+        return False
+
+
+def _send_body(conn, body, total, send_buf_size):
+    """
+    Send at most total bytes of a file-like body from its current position.
+
+    A regular file is sent by socket.sendfile on plain HTTP connections, so that the kernel
+    copies it to the socket without passing through user space. A mmap is sent by slices of
+    a memoryview. Other bodies are read into one reused buffer by readinto() if they have it,
+    or by read() otherwise.
+
+    :return: number of bytes sent, less than total only if the body is exhausted
+    :rtype: int
+    """
+    if total <= 0:
+        return 0
+    sock = getattr(conn, 'sock', None)
+    if hasattr(sock, 'sendfile') and not isinstance(sock, ssl.SSLSocket) \
+            and _is_regular_file(body):
+        return sock.sendfile(body, body.tell(), total)
+
+    sent = 0
+    buf_size = send_buf_size if send_buf_size > 0 else total
+    if compat.PY3 and isinstance(body, mmap.mmap):
+        offset = body.tell()
+        view = memoryview(body)
+        try:
+            end = min(offset + total, len(view))
+            while offset + sent < end:
+                size = min(buf_size, end - offset - sent)
+                conn.send(view[offset + sent:offset + sent + size])
+                sent += size
+        finally:
+            view.release()
+        body.seek(offset + sent)
+        return sent
+
+    readinto = getattr(body, 'readinto', None)
+    if readinto is None:
+        while sent < total:
+            buf = body.read(min(send_buf_size, total - sent))
+            if not buf:
+                break
+            conn.send(buf)
+            sent += len(buf)
+        return sent
+    buf = memoryview(bytearray(min(buf_size, total)))
+    while sent < total:
+        n = readinto(buf[:min(len(buf), total - sent)])
+        if not n:
+            break
+        conn.send(buf[:n])
+        sent += n
+    return sent
 
 
 def check_headers(headers):
@@ -99,11 +347,334 @@ def check_headers(headers):
             raise BceClientError(r'There should not be any "\n" in header[%s]:%s' % (k, v))
 
 
+def get_user_agent(name):
+    """
+    :return: the User-Agent header of the sdk named name
+    :rtype: bytes
+    """
+    user_agent = '%s/%s/%s/%s' % (
+        name, compat.convert_to_string(baidubce.SDK_VERSION), sys.version, sys.platform)
+    user_agent = user_agent.replace('\n', '')
+    return compat.convert_to_bytes(user_agent)
+
+
+_USER_AGENT = get_user_agent('bce-sdk-python')
+
+
+class PreparedRequest(object):
+    """
+    A request whose body, uri and headers are canonicalized once, before the first attempt.
+
+    Only x-bce-date and the authorization change from one attempt to another. When the request
+    is signed by bce_v1_signer.sign, the canonical request is also computed once and only the
+    date dependent part of the signature is computed again.
+
+    The headers dict is updated in place, as send_request always did.
+    """
+    def __init__(self, config, sign_function, http_method, path, body, headers, params,
+                 user_agent=_USER_AGENT, headers_to_sign=None):
+        headers = headers or {}
+        headers[http_headers.USER_AGENT] = user_agent
+
+        self.should_get_new_date = http_headers.BCE_DATE not in headers
+
+        if isinstance(body, str):
+            body = body.encode(baidubce.DEFAULT_ENCODING)
+        if not body:
+            headers[http_headers.CONTENT_LENGTH] = 0
+        elif isinstance(body, bytes):
+            headers[http_headers.CONTENT_LENGTH] = len(body)
+        elif http_headers.CONTENT_LENGTH not in headers:
+            raise ValueError(b'No %s is specified.' % http_headers.CONTENT_LENGTH)
+
+        # store the offset of fp body
+        self.offset = None
+        if hasattr(body, "tell") and hasattr(body, "seek"):
+            self.offset = body.tell()
+
+        self.protocol, self.host, self.port = utils.parse_host_port(config.endpoint,
+                                                                    config.protocol)
+        headers[http_headers.HOST] = self.host
+        if self.port != config.protocol.default_port:
+            headers[http_headers.HOST] += b':' + compat.convert_to_bytes(self.port)
+
+        # encode the header values once, they are sent and signed as bytes on every attempt
+        for k in list(headers):
+            v = utils.convert_to_standard_string(headers[k])
+            if b'\n' in v:
+                raise BceClientError(r'There should not be any "\n" in header[%s]:%s'
+                                     % (k, headers[k]))
+            headers[k] = v
+
+        # the canonical querystring is the same for the uri and the signature
+        encoded_params = utils.get_canonical_querystring(params or {}, False)
+        if len(encoded_params) > 0:
+            self.uri = path + b'?' + encoded_params
+        else:
+            self.uri = path
+
+        self.config = config
+        self.http_method = http_method
+        self.path = path
+        self.body = body
+        self.headers = headers
+        self.params = params
+        self.headers_to_sign = headers_to_sign
+        self._sign_function = sign_function
+        self._prepared_signature = None
+        if sign_function is bce_v1_signer.sign:
+            self._prepared_signature = bce_v1_signer.prepare(
+                config.credentials, http_method, path, headers, params,
+                headers_to_sign=headers_to_sign, canonical_querystring=encoded_params)
+
+    def sign(self):
+        """
+        Refresh x-bce-date if it was not given by the caller, and sign the request.
+        """
+        if self.should_get_new_date:
+            self.headers[http_headers.BCE_DATE] = utils.get_canonical_time()
+        if self._prepared_signature is not None:
+            authorization = self._prepared_signature.sign(self.headers)
+        elif self.headers_to_sign:
+            authorization = self._sign_function(
+                self.config.credentials, self.http_method, self.path, self.headers, self.params,
+                headers_to_sign=self.headers_to_sign)
+        else:
+            authorization = self._sign_function(
+                self.config.credentials, self.http_method, self.path, self.headers, self.params)
+        self.headers[http_headers.AUTHORIZATION] = authorization
+
+    def rewind_body(self):
+        """
+        Restore the offset of a file-like body before resending it.
+        """
+        if self.offset is not None:
+            self.body.seek(self.offset)
+
+
+def get_response_headers(http_response):
+    """
+    :return: the headers of http_response with lowercase names, decoded as utf-8 on py3
+    :rtype: list
+    """
+    headers_list = http_response.getheaders()
+
+    # on py3 ,values of headers_list is decoded with ios-8859-1 from
+    # utf-8 binary bytes
+
+    # headers_list[*][0] is lowercase on py2
+    # headers_list[*][0] is raw value py3
+    if compat.PY3 and isinstance(headers_list, list):
+        temp_heads = []
+        for k, v in headers_list:
+            k = k.encode('latin-1').decode('utf-8')
+            v = v.encode('latin-1').decode('utf-8')
+            k = k.lower()
+            temp_heads.append((k, v))
+        headers_list = temp_heads
+    return headers_list
+
+
+def _execute(config, request, response_handler_functions, timeouts_in_millis, attempt=None,
+             event=None):
+    """
+    Send the signed request once and handle its response.
+
+    :param attempt: the hedged attempt the connection is registered to, so that it can be
+        cancelled by the winner of the race
+    :type attempt: _HedgedAttempt
+    :param event: the event of the attempt, None if there is no request listener
+    :type event: baidubce.http.request_event.RequestEvent
+    :return: the connection, the http response and the handled response
+    :rtype: tuple
+    """
+    protocol, host, port = request.protocol, request.host, request.port
+    conn = _acquire_connection(config, protocol, host, port, timeouts_in_millis)
+    try:
+        if attempt is not None:
+            attempt.set_connection(conn)
+
+        _logger.debug('request args:method=%s, uri=%s, headers=%s,patams=%s, body=%s',
+                request.http_method, request.uri, request.headers, request.params, request.body)
+
+        http_response = _send_http_request(
+            conn, request.http_method, request.uri, request.headers, request.body,
+            config.send_buf_size, event)
+        if event is not None:
+            start = time.time()
+
+        headers_list = get_response_headers(http_response)
+        _logger.debug('request return: status=%d, headers=%s',
+                      http_response.status, headers_list)
+        response = BceResponse()
+        response.set_metadata_from_headers(dict(headers_list))
+
+        for handler_function in response_handler_functions:
+            if handler_function(http_response, response):
+                break
+        if event is not None:
+            event.add_timing(request_event.READ, start)
+            if response.metadata.content_length is not None:
+                event.bytes_received = int(response.metadata.content_length)
+    except Exception:
+        conn.close()
+        raise
+    return conn, http_response, response
+
+
+class _HedgedAttempt(object):
+    """
+    One of the concurrent attempts of a hedged request.
+    """
+    def __init__(self):
+        self.conn = None
+        self.event = None
+        self.result = None
+        self.exc_info = None
+        self.done = False
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def set_connection(self, conn):
+        """
+        :raise BceClientError: if the attempt was cancelled before getting its connection
+        """
+        with self._lock:
+            self.conn = conn
+            cancelled = self._cancelled
+        if cancelled:
+            raise BceClientError('Hedged request cancelled.')
+
+    def cancel(self):
+        """
+        Abort the attempt, the socket is shut down to wake up a thread blocked on it.
+        """
+        with self._lock:
+            self._cancelled = True
+            conn = self.conn
+        sock = getattr(conn, 'sock', None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except (IOError, OSError):
+                pass
+
+
+def _execute_hedged(config, request, response_handler_functions, timeouts_in_millis,
+                    hedge_policy, endpoint, event=None, limiter=None, deadline=None):
+    """
+    Send the request, and send it again on another connection if it has no response after the
+    delay of hedge_policy. The first attempt runs on the calling thread, only the hedge gets a
+    thread of its own. The first attempt to succeed wins, the other one is cancelled and its
+    connection closed. A failed attempt waits for the other one if it is still running.
+
+    The hedge takes a slot of limiter, and is skipped if none is free right away, like when
+    the hedge budget is exhausted. It is skipped too if it would start after the deadline, and
+    a failed first attempt waits for the hedge only until the deadline.
+
+    The race ends when the response handlers are done, so for a streamed body it is won by the
+    first response headers.
+
+    The event gets the timings of the winner, or of the first attempt if both failed.
+
+    :param limiter: the limiter of the endpoint, the caller holds a slot for the first attempt
+    :type limiter: baidubce.http.throttle.AdaptiveLimiter
+    :param deadline: the time since epoch by which the call should be done, None if there is none
+    :type deadline: float
+    :return: the connection, the http response and the handled response of the winner
+    :rtype: tuple
+    """
+    condition = threading.Condition(threading.Lock())
+    first = _HedgedAttempt()
+    attempts = [first]
+    state = {'winner': None}
+
+    def run(attempt):
+        start = time.time()
+        try:
+            result = _execute(config, request, response_handler_functions, timeouts_in_millis,
+                              attempt, attempt.event)
+        except Exception as e:
+            with condition:
+                attempt.exc_info = sys.exc_info()
+                attempt.done = True
+                condition.notify_all()
+            return e
+        with condition:
+            won = state['winner'] is None
+            if won:
+                state['winner'] = attempt
+                attempt.result = result
+            attempt.done = True
+            losers = [a for a in attempts if not a.done]
+            condition.notify_all()
+        if won:
+            hedge_policy.record_latency(endpoint, (time.time() - start) * 1000)
+            for loser in losers:
+                loser.cancel()
+        else:
+            result[0].close()
+        return None
+
+    def run_hedge():
+        with condition:
+            while not first.done:
+                left = hedge_at - time.time()
+                if left <= 0:
+                    break
+                condition.wait(left)
+            if first.done or not hedge_policy.acquire():
+                return
+            if limiter is not None and not limiter.try_acquire():
+                _logger.debug('Concurrency limit reached, skip hedge')
+                hedge_policy.refund()
+                return
+            hedge = _HedgedAttempt()
+            if event is not None:
+                hedge.event = event.fork()
+            attempts.append(hedge)
+        _logger.debug('Hedge request %s %s', request.http_method, request.uri)
+        error = run(hedge)
+        if limiter is not None:
+            limiter.release(error)
+
+    if event is not None:
+        first.event = event.fork()
+    hedge_policy.record_request()
+    hedge_at = time.time() + hedge_policy.get_delay_in_millis(endpoint) / 1000.0
+    if deadline is None or hedge_at < deadline:
+        thread = threading.Thread(target=run_hedge)
+        thread.daemon = True
+        thread.start()
+    run(first)
+    with condition:
+        while state['winner'] is None and not all(a.done for a in attempts):
+            left = None if deadline is None else deadline - time.time()
+            if left is not None and left <= 0:
+                break
+            condition.wait(left)
+        winner = state['winner']
+        hedged = len(attempts) > 1
+        running = [a for a in attempts if not a.done]
+    if winner is None:
+        # the deadline is passed, give up the hedge
+        for attempt in running:
+            attempt.cancel()
+    if event is not None:
+        event.copy_from((winner or first).event)
+        event.hedged = hedged
+    if winner is None:
+        exc_info = first.exc_info
+        raise_(exc_info[0], exc_info[1], exc_info[2])
+    return winner.result
+
+
 def send_request(
         config,
         sign_function,
         response_handler_functions,
-        http_method, path, body, headers, params):
+        http_method, path, body, headers, params,
+        headers_to_sign=None, hedge=False, service_id=None, path_template=None):
     """
     Send request to BCE services.
 
@@ -118,105 +689,92 @@ def send_request(
     :param request:
     :type request: baidubce.internal.InternalRequest
 
+    :param headers_to_sign: passed to sign_function if not None
+    :type headers_to_sign: list
+
+    :param hedge: hedge the request according to config.hedge_policy if it is set. Only GET
+        and HEAD requests without body may be hedged, and their response handlers must not
+        have side effects, since the loser is discarded.
+    :type hedge: bool
+
+    :param service_id: the id of the service, reported to config.request_listeners
+    :type service_id: str
+
+    :param path_template: the path with placeholders for its variable parts, reported to
+        config.request_listeners instead of the path
+    :type path_template: bytes
+
     :return:
     :rtype: baidubce.BceResponse
     """
     _logger.debug(b'%s request start: %s %s, %s, %s',
                   http_method, path, headers, params, body)
-    headers = headers or {}
-
-    user_agent = 'bce-sdk-python/%s/%s/%s' % (
-        compat.convert_to_string(baidubce.SDK_VERSION), sys.version, sys.platform)
-    user_agent = user_agent.replace('\n', '')
-    user_agent = compat.convert_to_bytes(user_agent)
-    headers[http_headers.USER_AGENT] = user_agent
- 
-    should_get_new_date = False
-    if http_headers.BCE_DATE not in headers:
-        should_get_new_date = True
-    headers[http_headers.HOST] = config.endpoint
-
-    if isinstance(body, str):
-        body = body.encode(baidubce.DEFAULT_ENCODING)
-    if not body:
-        headers[http_headers.CONTENT_LENGTH] = 0
-    elif isinstance(body, bytes):
-        headers[http_headers.CONTENT_LENGTH] = len(body)
-    elif http_headers.CONTENT_LENGTH not in headers:
-        raise ValueError(b'No %s is specified.' % http_headers.CONTENT_LENGTH)
-
-    # store the offset of fp body
-    offset = None
-    if hasattr(body, "tell") and hasattr(body, "seek"):
-        offset = body.tell()
-
-    protocol, host, port = utils.parse_host_port(config.endpoint, config.protocol)
-
-    headers[http_headers.HOST] = host
-    if port != config.protocol.default_port:
-        headers[http_headers.HOST] += b':' + compat.convert_to_bytes(port)
-    headers[http_headers.AUTHORIZATION] = sign_function(
-        config.credentials, http_method, path, headers, params)
-
-    encoded_params = utils.get_canonical_querystring(params, False)
-    if len(encoded_params) > 0:
-        uri = path + b'?' + encoded_params
-    else:
-        uri = path
-    check_headers(headers)
+    request = PreparedRequest(config, sign_function, http_method, path, body, headers, params,
+                              headers_to_sign=headers_to_sign)
+    response_handler_functions = handler.get_response_handlers(config,
+                                                               response_handler_functions)
+    protocol, host, port = request.protocol, request.host, request.port
+    limiter = _get_limiter(config, protocol, host, port)
+    deadline = get_deadline(config)
+    hedge_policy = None
+    if hedge and not request.body and http_method in IDEMPOTENT_METHODS:
+        hedge_policy = getattr(config, 'hedge_policy', None)
+    listeners = getattr(config, 'request_listeners', None)
+    if path_template is None:
+        path_template = path
 
     retries_attempted = 0
     errors = []
     while True:
-        conn = None
+        check_deadline(deadline, retries_attempted, errors)
+        breaker, endpoint = check_circuit_breaker(config, protocol, host, port, errors)
+        if limiter is not None and not limiter.acquire(
+                None if deadline is None else deadline - time.time()):
+            error = _deadline_exceeded(retries_attempted, errors)
+            if breaker is not None:
+                breaker.record_error(endpoint, error.last_error)
+            raise error
+        event = None
+        if listeners:
+            event = request_event.RequestEvent(service_id, http_method, path_template,
+                                               retries_attempted)
+            event.bytes_sent = int(request.headers.get(http_headers.CONTENT_LENGTH, 0))
+            start = time.time()
         try:
-            # restore the offset of fp body when retrying
-            if should_get_new_date is True:
-                headers[http_headers.BCE_DATE] = utils.get_canonical_time()
-
-            headers[http_headers.AUTHORIZATION] = sign_function(
-                config.credentials, http_method, path, headers, params)
-
-            if retries_attempted > 0 and offset is not None:
-                body.seek(offset)
-            
-            conn = _get_connection(protocol, host, port, config.connection_timeout_in_mills)
-
-            _logger.debug('request args:method=%s, uri=%s, headers=%s,patams=%s, body=%s',
-                    http_method, uri, headers, params, body)
-
-            http_response = _send_http_request(
-                conn, http_method, uri, headers, body, config.send_buf_size)
-            
-            headers_list = http_response.getheaders()
-
-            # on py3 ,values of headers_list is decoded with ios-8859-1 from
-            # utf-8 binary bytes
-
-            # headers_list[*][0] is lowercase on py2
-            # headers_list[*][0] is raw value py3
-            if compat.PY3 and isinstance(headers_list, list):
-                temp_heads = []
-                for k, v in headers_list:
-                    k = k.encode('latin-1').decode('utf-8')
-                    v = v.encode('latin-1').decode('utf-8')
-                    k = k.lower()
-                    temp_heads.append((k, v))
-                headers_list = temp_heads
-
-            _logger.debug(
-                'request return: status=%d, headers=%s' % (http_response.status, headers_list))
-            response = BceResponse()
-            response.set_metadata_from_headers(dict(headers_list))
-
-            for handler_function in response_handler_functions:
-                if handler_function(http_response, response):
-                    break
+            request.sign()
+            if event is not None:
+                event.add_timing(request_event.SIGN, start)
 
+            # restore the offset of fp body when retrying
+            if retries_attempted > 0:
+                request.rewind_body()
+
+            timeouts_in_millis = get_timeouts_in_millis(config, deadline)
+            if hedge_policy is None:
+                conn, http_response, response = _execute(
+                    config, request, response_handler_functions, timeouts_in_millis,
+                    event=event)
+            else:
+                conn, http_response, response = _execute_hedged(
+                    config, request, response_handler_functions, timeouts_in_millis,
+                    hedge_policy, endpoint, event, limiter, deadline)
+
+            _release_connection(config, protocol, host, port, conn, http_response)
+            if limiter is not None:
+                limiter.release()
+            if breaker is not None:
+                breaker.record_success(endpoint)
+            if event is not None:
+                event.finish(listeners)
             return response
         except Exception as e:
-            if conn is not None:
-                conn.close()
+            if limiter is not None:
+                limiter.release(e)
+            if breaker is not None:
+                breaker.record_error(endpoint, e)
+            if event is not None:
+                event.error = e
+                event.finish(listeners)
 
             # insert ">>>>" before all trace back lines and then save it
             errors.append('\n'.join('>>>>' + line for line in traceback.format_exc().splitlines()))
@@ -224,6 +782,7 @@ def send_request(
             if config.retry_policy.should_retry(e, retries_attempted):
                 delay_in_millis = config.retry_policy.get_delay_before_next_retry_in_millis(
                     e, retries_attempted)
+                check_deadline(deadline, retries_attempted, errors, e, delay_in_millis)
                 time.sleep(delay_in_millis / 1000.0)
             else:
                 raise BceHttpClientError('Unable to execute HTTP request. Retried %d times. '
@@ -0,0 +1,138 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides a pool of keep-alive http connections shared by all bce clients.
+"""
+import collections
+import logging
+import select
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+def is_connection_dropped(conn):
+    """
+    Check whether an idle connection has been closed by the server.
+
+    An idle keep-alive socket should never be readable: if it is, the server has either sent a
+    FIN (half-closed) or some unexpected data, and the connection can not be reused.
+
+    :param conn: the connection to check
+    :type conn: http.client.HTTPConnection
+    :return: true if the connection should be discarded
+    :rtype: bool
+    """
+    sock = getattr(conn, 'sock', None)
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0.0)
+    except (ValueError, select.error, OSError):
+        return True
+    return len(readable) > 0
+
+
+class ConnectionPool(object):
+    """
+    A thread-safe pool of idle keep-alive connections keyed by (protocol, host, port).
+
+    The pool never limits the number of connections in use; max_size only bounds how many idle
+    connections are kept per endpoint, extra connections are closed when released.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle_connections = {}
+
+    @staticmethod
+    def _get_key(protocol, host, port):
+        return protocol.name, host, port
+
+    def get_connection(self, protocol, host, port, idle_timeout_in_millis):
+        """
+        Take an idle connection to the endpoint out of the pool.
+
+        :param protocol: the protocol of the endpoint
+        :type protocol: baidubce.protocol.Protocol
+        :param host: the host of the endpoint
+        :param port: the port of the endpoint
+        :param idle_timeout_in_millis: connections idle for longer than this are discarded
+        :type idle_timeout_in_millis: int
+        :return: a reusable connection, or None if there is no one
+        """
+        key = ConnectionPool._get_key(protocol, host, port)
+        now = time.time()
+        while True:
+            with self._lock:
+                connections = self._idle_connections.get(key)
+                if not connections:
+                    return None
+                # LIFO, the most recently used connection is the most likely to be alive
+                conn, last_used = connections.pop()
+            if idle_timeout_in_millis is not None \
+                    and (now - last_used) * 1000 > idle_timeout_in_millis:
+                _logger.debug('discard idle connection to %s', key)
+                conn.close()
+                continue
+            if is_connection_dropped(conn):
+                _logger.debug('discard dropped connection to %s', key)
+                conn.close()
+                continue
+            return conn
+
+    def release_connection(self, protocol, host, port, conn, max_size):
+        """
+        Put a connection whose last response has been fully read back to the pool.
+
+        :param protocol: the protocol of the endpoint
+        :type protocol: baidubce.protocol.Protocol
+        :param host: the host of the endpoint
+        :param port: the port of the endpoint
+        :param conn: the connection to reuse
+        :type conn: http.client.HTTPConnection
+        :param max_size: the maximum number of idle connections kept for the endpoint
+        :type max_size: int
+        """
+        if not max_size or getattr(conn, 'sock', None) is None:
+            conn.close()
+            return
+        key = ConnectionPool._get_key(protocol, host, port)
+        with self._lock:
+            connections = self._idle_connections.setdefault(key, collections.deque())
+            if len(connections) < max_size:
+                connections.append((conn, time.time()))
+                return
+        conn.close()
+
+    def clear(self):
+        """
+        Close all idle connections.
+        """
+        with self._lock:
+            idle_connections = self._idle_connections
+            self._idle_connections = {}
+        for connections in idle_connections.values():
+            for conn, _ in connections:
+                conn.close()
+
+
+_default_pool = ConnectionPool()
+
+
+def get_default_pool():
+    """
+    :return: the connection pool shared by all clients in the process
+    :rtype: ConnectionPool
+    """
+    return _default_pool
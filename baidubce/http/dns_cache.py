@@ -0,0 +1,253 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides the cache of name resolutions shared by all bce clients.
+"""
+import http.client
+import itertools
+import logging
+import socket
+import ssl
+import threading
+import time
+
+from baidubce import compat
+from baidubce.http import request_event
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60
+DEFAULT_NEGATIVE_TTL = 5
+DEFAULT_EJECT_TIMEOUT = 30
+
+
+class _Resolution(object):
+    """
+    The cached addresses of a (host, port), or the error resolving it.
+    """
+    __slots__ = ('addresses', 'error', 'expires_at', 'counter')
+
+    def __init__(self, addresses, error, expires_at):
+        self.addresses = addresses
+        self.error = error
+        self.expires_at = expires_at
+        self.counter = itertools.count()
+
+
+class DnsCache(object):
+    """
+    A thread-safe cache of getaddrinfo results.
+
+    The addresses of a name are kept for ttl seconds, and a failure to resolve it is kept for
+    negative_ttl seconds. The connections to a name resolving to several addresses are spread
+    across them round-robin, and an address failing to connect is tried last for
+    eject_timeout seconds.
+
+    :param ttl: seconds during which the addresses of a name are reused, 0 to disable the cache
+    :type ttl: float
+    """
+    def __init__(self, ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL,
+                 eject_timeout=DEFAULT_EJECT_TIMEOUT):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.eject_timeout = eject_timeout
+        self._lock = threading.Lock()
+        self._resolutions = {}
+        self._ejected = {}
+
+    def resolve(self, host, port):
+        """
+        :return: the getaddrinfo results of the TCP addresses of host and port
+        :rtype: list
+        :raise socket.gaierror: if the name can not be resolved
+        """
+        return self._get_resolution(host, port).addresses
+
+    def _get_resolution(self, host, port):
+        host = compat.convert_to_string(host)
+        key = host, port
+        now = time.time()
+        with self._lock:
+            resolution = self._resolutions.get(key)
+        if resolution is None or resolution.expires_at <= now:
+            try:
+                addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+                resolution = _Resolution(addresses, None, now + self.ttl)
+            except socket.gaierror as e:
+                _logger.debug('Failed to resolve %s: %s', host, e)
+                resolution = _Resolution([], e, now + self.negative_ttl)
+            with self._lock:
+                self._resolutions[key] = resolution
+        if resolution.error is not None:
+            # a new error on every call, raising the cached one would chain the tracebacks
+            raise socket.gaierror(*resolution.error.args)
+        return resolution
+
+    def get_addresses(self, host, port):
+        """
+        :return: the addresses to connect to in order, rotated on every call, with the ejected
+            ones moved to the end
+        :rtype: list
+        """
+        resolution = self._get_resolution(host, port)
+        addresses = resolution.addresses
+        if len(addresses) > 1:
+            start = next(resolution.counter) % len(addresses)
+            addresses = addresses[start:] + addresses[:start]
+        now = time.time()
+        with self._lock:
+            if not self._ejected:
+                return addresses
+            healthy = []
+            ejected = []
+            for address in addresses:
+                ejected_at = self._ejected.get(address[4])
+                if ejected_at is None:
+                    healthy.append(address)
+                elif now - ejected_at < self.eject_timeout:
+                    ejected.append(address)
+                else:
+                    del self._ejected[address[4]]
+                    healthy.append(address)
+        return healthy + ejected
+
+    def eject(self, sockaddr):
+        """
+        Try the address last for eject_timeout seconds.
+        """
+        _logger.debug('Eject address %s', sockaddr)
+        with self._lock:
+            self._ejected[sockaddr] = time.time()
+
+    def restore(self, sockaddr):
+        """
+        Cancel the ejection of the address.
+        """
+        if self._ejected:
+            with self._lock:
+                self._ejected.pop(sockaddr, None)
+
+    def create_connection(self, address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
+                          source_address=None, event=None):
+        """
+        Same as socket.create_connection, but resolves the host through the cache, and ejects
+        the addresses failing to connect.
+
+        :param event: the event the dns and connect timings are added to
+        :type event: baidubce.http.request_event.RequestEvent
+        :return: the connected socket
+        :rtype: socket.socket
+        """
+        host, port = address
+        error = None
+        if event is not None:
+            start = time.time()
+        addresses = self.get_addresses(host, port)
+        if event is not None:
+            start = event.add_timing(request_event.DNS, start)
+        for family, socktype, proto, _, sockaddr in addresses:
+            sock = None
+            try:
+                sock = socket.socket(family, socktype, proto)
+                if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sockaddr)
+                self.restore(sockaddr)
+                return sock
+            except socket.error as e:
+                error = e
+                if sock is not None:
+                    sock.close()
+                self.eject(sockaddr)
+            finally:
+                if event is not None:
+                    start = event.add_timing(request_event.CONNECT, start)
+        if error is None:
+            error = socket.error('getaddrinfo returns an empty list')
+        raise error
+
+    def clear(self):
+        """
+        Forget all resolutions and ejections.
+        """
+        with self._lock:
+            self._resolutions = {}
+            self._ejected = {}
+
+
+class CachedHTTPConnection(http.client.HTTPConnection):
+    """
+    A HTTPConnection resolving the host through a DnsCache.
+
+    :param dns_cache: the cache to resolve the host through, the shared one by default
+    :type dns_cache: DnsCache
+    """
+    def __init__(self, host, port=None, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, dns_cache=None,
+                 **kwargs):
+        http.client.HTTPConnection.__init__(self, host, port=port, timeout=timeout, **kwargs)
+        self.dns_cache = dns_cache or get_default_dns_cache()
+        # the event the dns and connect timings of the next connect() are added to
+        self.request_event = None
+
+    def connect(self):
+        """
+        Connect to the addresses of the host in the order given by the cache.
+        """
+        _connect_socket(self)
+
+
+class CachedHTTPSConnection(http.client.HTTPSConnection):
+    """
+    A HTTPSConnection resolving the host through a DnsCache.
+
+    :param dns_cache: the cache to resolve the host through, the shared one by default
+    :type dns_cache: DnsCache
+    """
+    def __init__(self, host, port=None, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, dns_cache=None,
+                 **kwargs):
+        self.ssl_context = kwargs.pop('context', None) or ssl.create_default_context()
+        http.client.HTTPSConnection.__init__(self, host, port=port, timeout=timeout,
+                                             context=self.ssl_context, **kwargs)
+        self.dns_cache = dns_cache or get_default_dns_cache()
+        # the event the dns and connect timings of the next connect() are added to
+        self.request_event = None
+
+    def connect(self):
+        """
+        Connect to the addresses of the host in the order given by the cache, then do the
+        tls handshake.
+        """
+        _connect_socket(self)
+        self.sock = self.ssl_context.wrap_socket(self.sock, server_hostname=self.host)
+
+
+def _connect_socket(conn):
+    conn.sock = conn.dns_cache.create_connection(
+        (conn.host, conn.port), conn.timeout, conn.source_address, event=conn.request_event)
+    try:
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except socket.error:
+        pass
+
+
+_default_dns_cache = DnsCache()
+
+
+def get_default_dns_cache():
+    """
+    :return: the dns cache shared by all clients in the process
+    :rtype: DnsCache
+    """
+    return _default_dns_cache
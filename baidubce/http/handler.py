@@ -18,11 +18,57 @@ import http.client
 from builtins import str
 from builtins import bytes
 import json
+import logging
+import sys
 from baidubce import utils
 from baidubce import compat
 from baidubce.exception import BceClientError
 from baidubce.exception import BceServerError
 
+_logger = logging.getLogger(__name__)
+
+# json.loads accepts bytes since python 3.6, and str on python 2
+_LOADS_BYTES = not compat.PY3 or sys.version_info >= (3, 6)
+
+
+_json_backend = None
+
+
+def set_json_backend(loads):
+    """
+    Use a faster JSON decoder, such as orjson.loads, for the bodies decoded into plain dicts
+    and lists, that is the raw JSON responses and the BOS listings. The json module is used if
+    the backend fails on a body.
+
+    Note that some decoders lose precision silently on integers beyond 64 bits instead of
+    failing, so none is used unless set here.
+
+    :param loads: a function decoding bytes into plain dicts and lists like json.loads, or None
+        to use the json module
+    :type loads: function
+    """
+    global _json_backend
+    _json_backend = loads
+
+
+def loads_json(body):
+    """
+    Decode a JSON body into plain dicts and lists with the JSON backend.
+
+    :param body: the body
+    :type body: bytes
+    """
+    if _json_backend is not None:
+        try:
+            return _json_backend(body)
+        except Exception as e:
+            # e.g. integers out of the range of the backend, the json module handles any input
+            _logger.debug('JSON backend failed, fallback to json module: %s', e)
+    if not _LOADS_BYTES:
+        body = compat.convert_to_string(body)
+    return json.loads(body)
+
+
 def parse_json(http_response, response):
     """If the body is not empty, convert it to a python object and set as the value of
     response.body. http_response is always closed if no error occurs.
@@ -38,12 +84,58 @@ def parse_json(http_response, response):
     """
     body = http_response.read()
     if body:
-        body = compat.convert_to_string(body)
+        # the object_hook of the json module is faster than converting the output of any
+        # backend afterwards
+        if not _LOADS_BYTES:
+            body = compat.convert_to_string(body)
         response.__dict__.update(json.loads(body, object_hook=utils.dict_to_python_object).__dict__)
     http_response.close()
     return True
 
 
+def parse_json_raw(http_response, response):
+    """If the body is not empty, decode it into plain dicts and lists with the field names
+    of the service and set it as response.body. It is used instead of parse_json when
+    BceClientConfiguration.raw_json_response is true. http_response is always closed if no error
+    occurs.
+
+    :param http_response: the http_response object returned by HTTPConnection.getresponse()
+    :type http_response: httplib.HTTPResponse
+
+    :param response: general response object which will be returned to the caller
+    :type response: baidubce.BceResponse
+
+    :return: always true
+    :rtype bool
+    """
+    body = http_response.read()
+    if body:
+        response.body = loads_json(body)
+    http_response.close()
+    return True
+
+
+def json_parser(parser):
+    """
+    Mark a response handler decoding a JSON body into python objects like parse_json, so that
+    get_response_handlers replaces it by parse_json_raw too.
+    """
+    parser.json_parser = True
+    return parser
+
+
+def get_response_handlers(config, response_handler_functions):
+    """
+    :return: the response handlers, with parse_json and the handlers marked by json_parser
+        replaced by parse_json_raw if config.raw_json_response is true
+    :rtype: list
+    """
+    if not getattr(config, 'raw_json_response', None):
+        return response_handler_functions
+    return [parse_json_raw if f is parse_json or getattr(f, 'json_parser', False) else f
+            for f in response_handler_functions]
+
+
 def parse_error(http_response, response):
     """If the body is not empty, convert it to a python object and set as the value of
     response.body. http_response is always closed if no error occurs.
@@ -71,4 +163,5 @@ def parse_error(http_response, response):
     if bse is None:
         bse = BceServerError(http_response.reason, request_id=response.metadata.bce_request_id)
     bse.status_code = http_response.status
+    bse.retry_after = response.metadata.retry_after
     raise bse
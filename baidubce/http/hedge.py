@@ -0,0 +1,115 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides the policy of hedged requests.
+"""
+import collections
+import logging
+import threading
+
+from baidubce.http import http_methods
+
+_logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset([http_methods.GET, http_methods.HEAD])
+
+
+class HedgePolicy(object):
+    """
+    Decide when a request with no response yet is sent again on another connection.
+
+    The delay before the hedge is the given percentile of the latencies recently observed on
+    the endpoint, so only the slowest requests are hedged. Until min_samples latencies are
+    known, initial_delay_in_millis is used.
+
+    The hedges are capped by a budget: every request earns max_hedge_ratio token, a hedge
+    takes a whole one, and at most max_tokens are kept.
+
+    :param percentile: the percentile of the latencies after which a request is hedged
+    :type percentile: float
+    :param max_hedge_ratio: the maximum ratio of hedges to requests in the long run
+    :type max_hedge_ratio: float
+    """
+    def __init__(self, percentile=95, initial_delay_in_millis=100, min_delay_in_millis=5,
+                 max_hedge_ratio=0.05, max_tokens=10, window_size=1000, min_samples=20):
+        if not 0 < percentile < 100:
+            raise ValueError('percentile should be in (0, 100).')
+        self.percentile = percentile
+        self.initial_delay_in_millis = initial_delay_in_millis
+        self.min_delay_in_millis = min_delay_in_millis
+        self.max_hedge_ratio = max_hedge_ratio
+        self.max_tokens = max_tokens
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._delays = {}
+        self._recorded = collections.Counter()
+        self._tokens = float(max_tokens)
+
+    def get_delay_in_millis(self, endpoint):
+        """
+        :return: the time to wait for a response before hedging a request to the endpoint
+        :rtype: float
+        """
+        with self._lock:
+            delay = self._delays.get(endpoint)
+        if delay is None:
+            delay = self.initial_delay_in_millis
+        return max(self.min_delay_in_millis, delay)
+
+    def record_latency(self, endpoint, latency_in_millis):
+        """
+        Record the latency of a successful request to the endpoint.
+        """
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None:
+                latencies = collections.deque(maxlen=self.window_size)
+                self._latencies[endpoint] = latencies
+            latencies.append(latency_in_millis)
+            self._recorded[endpoint] += 1
+            # sorting the window on every request would cost more than the hedges save
+            count = len(latencies)
+            if count >= self.min_samples and self._recorded[endpoint] % 10 == 0:
+                ordered = sorted(latencies)
+                index = min(count - 1, int(count * self.percentile / 100.0))
+                self._delays[endpoint] = ordered[index]
+
+    def record_request(self):
+        """
+        Earn the budget of a request.
+        """
+        with self._lock:
+            self._tokens = min(float(self.max_tokens), self._tokens + self.max_hedge_ratio)
+
+    def acquire(self):
+        """
+        Take a hedge from the budget.
+
+        :return: false if the budget is exhausted
+        :rtype: bool
+        """
+        with self._lock:
+            if self._tokens < 1:
+                _logger.debug('Hedge budget exhausted')
+                return False
+            self._tokens -= 1
+            return True
+
+    def refund(self):
+        """
+        Give back a hedge taken from the budget but not sent.
+        """
+        with self._lock:
+            self._tokens = min(float(self.max_tokens), self._tokens + 1)
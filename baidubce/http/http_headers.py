@@ -40,6 +40,10 @@ EXPIRES = b"Expires"
 
 HOST = b"Host"
 
+IF_MODIFIED_SINCE = b"If-Modified-Since"
+
+IF_NONE_MATCH = b"If-None-Match"
+
 LAST_MODIFIED = b"Last-Modified"
 
 RANGE = b"Range"
@@ -96,6 +100,8 @@ BOS_RESTORE_TIER = b"x-bce-restore-tier"
 
 BOS_RESTORE_DAYS = b"x-bce-restore-days"
 
+BOS_CONTENT_CRC32 = b"x-bce-content-crc32"
+
 # STS HTTP Headers
 
 STS_SECURITY_TOKEN = b"x-bce-security-token"
@@ -0,0 +1,103 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides the events of http requests passed to the request listeners.
+"""
+import copy
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+SIGN = 'sign'
+DNS = 'dns'
+CONNECT = 'connect'
+TLS = 'tls'
+WRITE = 'write'
+FIRST_BYTE = 'first_byte'
+READ = 'read'
+
+
+class RequestEvent(object):
+    """
+    The outcome of an attempt of a request, passed to each of config.request_listeners once
+    the attempt is done.
+
+    timings holds the milliseconds spent in each phase of the attempt, keyed by SIGN, DNS,
+    CONNECT, TLS, WRITE, FIRST_BYTE and READ. Only the phases the attempt went through are
+    present, a reused keep-alive connection has no DNS, CONNECT nor TLS. READ covers the
+    response handlers, a streamed body is read by the caller after the event.
+
+    :param service_id: the id of the service, like bos, None if the client does not tell it
+    :type service_id: str
+    :param path_template: the path with its variable parts replaced by placeholders, like
+        /{bucket}/{key}, or the path itself if the client does not tell it
+    :type path_template: bytes
+    """
+    def __init__(self, service_id, http_method, path_template, retries_attempted):
+        self.service_id = service_id
+        self.http_method = http_method
+        self.path_template = path_template
+        self.retries_attempted = retries_attempted
+        self.hedged = False
+        self.status = None
+        self.error = None
+        self.bytes_sent = 0
+        self.bytes_received = None
+        self.start_time = time.time()
+        self.total_time_in_millis = None
+        self.timings = {}
+
+    def add_timing(self, phase, start, end=None):
+        """
+        Add the time from start to end, or to now, to the phase.
+
+        :return: end
+        :rtype: float
+        """
+        if end is None:
+            end = time.time()
+        self.timings[phase] = self.timings.get(phase, 0) + (end - start) * 1000
+        return end
+
+    def fork(self):
+        """
+        :return: a copy of the event for a concurrent attempt of the same request
+        :rtype: RequestEvent
+        """
+        event = copy.copy(self)
+        event.timings = dict(self.timings)
+        return event
+
+    def copy_from(self, fork):
+        """
+        Take the outcome and the timings of fork, the fork of this event whose attempt ended
+        the request.
+
+        :type fork: RequestEvent
+        """
+        self.status = fork.status
+        self.bytes_received = fork.bytes_received
+        self.timings = dict(fork.timings)
+
+    def finish(self, listeners):
+        """
+        Pass the event to the listeners. A failing listener is logged and does not fail the
+        request.
+        """
+        self.total_time_in_millis = (time.time() - self.start_time) * 1000
+        for listener in listeners:
+            try:
+                listener(self)
+            except Exception as e:
+                _logger.warning('Request listener %r failed: %s', listener, e)
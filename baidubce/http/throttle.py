@@ -0,0 +1,200 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides the adaptive request limiters shared by all bce clients.
+"""
+import logging
+import threading
+import time
+
+from baidubce.retry.retry_policy import is_throttling_error
+from baidubce.retry.retry_policy import TokenBucket
+
+_logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter(object):
+    """
+    A thread-safe limiter of the requests in flight to an endpoint, with an optional cap of
+    requests per second.
+
+    The allowed concurrency follows AIMD: it grows by one every `limit` successful requests,
+    up to max_concurrency, and is halved by a throttling error, down to min_concurrency. All
+    the requests in flight when the server starts throttling usually fail together, so the
+    limit is decreased at most once per decrease_interval seconds.
+
+    The requests per second are capped by a token bucket holding up to one second of tokens.
+
+    :param max_concurrency: the maximum number of requests in flight, None for no limit
+    :type max_concurrency: int
+    :param requests_per_second: the maximum rate of requests, None for no cap
+    :type requests_per_second: float
+    """
+    def __init__(self, max_concurrency, requests_per_second=None, min_concurrency=1,
+                 decrease_factor=0.5, decrease_interval=1.0):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError('max_concurrency should be positive.')
+        if requests_per_second is not None and requests_per_second <= 0:
+            raise ValueError('requests_per_second should be positive.')
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.requests_per_second = requests_per_second
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+        self.limit = None
+        if max_concurrency is not None:
+            self.min_concurrency = min(min_concurrency, max_concurrency)
+            self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self._condition = threading.Condition(threading.Lock())
+        self._last_decrease = 0
+        self._bucket = None
+        if requests_per_second is not None:
+            self._bucket = TokenBucket(requests_per_second, requests_per_second)
+
+    def set_limits(self, max_concurrency, requests_per_second=None):
+        """
+        Change the maximum concurrency and the rate cap, the current limit is clipped to the
+        new maximum.
+        """
+        with self._condition:
+            self.max_concurrency = max_concurrency
+            if max_concurrency is None:
+                self.limit = None
+            else:
+                self.min_concurrency = min(self.min_concurrency, max_concurrency)
+                self.limit = min(self.limit or max_concurrency, float(max_concurrency))
+            if requests_per_second != self.requests_per_second:
+                self.requests_per_second = requests_per_second
+                if requests_per_second is None:
+                    self._bucket = None
+                elif self._bucket is None:
+                    self._bucket = TokenBucket(requests_per_second, requests_per_second, 0)
+                else:
+                    self._bucket.refill()
+                    self._bucket.rate = self._bucket.capacity = requests_per_second
+                    self._bucket.tokens = min(self._bucket.tokens, float(requests_per_second))
+            self._condition.notify_all()
+
+    def acquire(self, timeout=None):
+        """
+        Block until a request may be sent, the caller must call release() once it is done.
+
+        :param timeout: the maximum seconds to wait, None to wait as long as needed
+        :type timeout: float
+        :return: false if the request may not be sent within timeout, then release() must not
+            be called
+        :rtype: bool
+        """
+        end = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self.limit is not None and self.in_flight >= int(self.limit):
+                if end is None:
+                    self._condition.wait()
+                    continue
+                left = end - time.time()
+                if left <= 0:
+                    return False
+                self._condition.wait(left)
+            wait = self._bucket.take() if self._bucket is not None else 0
+            if end is not None and wait > 0 and time.time() + wait > end:
+                # give the token back, the request would wait beyond the timeout
+                self._bucket.put_back()
+                return False
+            self.in_flight += 1
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def try_acquire(self):
+        """
+        Same as acquire(), but never waits.
+
+        :return: false if no request may be sent now, otherwise the caller must call release()
+            once it is done
+        :rtype: bool
+        """
+        with self._condition:
+            if self.limit is not None and self.in_flight >= int(self.limit):
+                return False
+            if self._bucket is not None and not self._bucket.try_take():
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, error=None):
+        """
+        Finish a request and adapt the limit to its outcome.
+
+        :param error: the error of the request, None if it succeeded. Errors other than
+            throttling ones leave the limit unchanged.
+        :type error: Exception
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if self.limit is None:
+                return
+            if error is None:
+                if self.limit < self.max_concurrency:
+                    self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            elif is_throttling_error(error):
+                now = time.time()
+                if now - self._last_decrease >= self.decrease_interval:
+                    self._last_decrease = now
+                    self.limit = max(float(self.min_concurrency),
+                                     self.limit * self.decrease_factor)
+                    _logger.debug('Throttled, decrease concurrency limit to %d', self.limit)
+            self._condition.notify_all()
+
+
+class LimiterRegistry(object):
+    """
+    The AdaptiveLimiter of each endpoint and limits, keyed by (protocol, host, port) like the
+    connection pool and by the limits, so that clients configured differently do not change
+    the limits of each other.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limiters = {}
+
+    def get_limiter(self, protocol, host, port, max_concurrency, requests_per_second=None):
+        """
+        Get the limiter of the endpoint with these limits, created on first use.
+
+        :rtype: AdaptiveLimiter
+        """
+        key = protocol.name, host, port, max_concurrency, requests_per_second
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = AdaptiveLimiter(max_concurrency, requests_per_second)
+                self._limiters[key] = limiter
+            return limiter
+
+    def clear(self):
+        """
+        Forget all limiters.
+        """
+        with self._lock:
+            self._limiters = {}
+
+
+_default_registry = LimiterRegistry()
+
+
+def get_default_registry():
+    """
+    :return: the limiters shared by all clients in the process
+    :rtype: LimiterRegistry
+    """
+    return _default_registry
@@ -14,16 +14,41 @@
 This module defines a common configuration class for BCE.
 """
 
+import email.utils
 import http.client
 import logging
+import random
+import threading
+import time
 from builtins import str
 from builtins import bytes
 
+from baidubce import compat
 from baidubce.exception import BceServerError
 
 
 _logger = logging.getLogger(__name__)
 
+TOO_MANY_REQUESTS = 429
+THROTTLING_ERROR_CODES = frozenset([
+    'SlowDown', 'RequestRateLimitExceeded', 'TooManyRequests', 'Throttling',
+    'ThrottlingException', 'RequestLimitExceeded'])
+
+
+def is_throttling_error(error):
+    """
+    :return: true if the error means the server is asking clients to slow down
+    :rtype: bool
+    """
+    if not isinstance(error, BceServerError):
+        return False
+    if error.status_code in (TOO_MANY_REQUESTS, 503):
+        return True
+    code = error.code
+    if isinstance(code, bytes):
+        code = code.decode('utf-8', 'replace')
+    return code in THROTTLING_ERROR_CODES
+
 
 class NoRetryPolicy(object):
     """A policy that never retries."""
@@ -131,3 +156,318 @@ class BackOffRetryPolicy(object):
         if delay_in_millis > self.max_delay_in_millis:
             return self.max_delay_in_millis
         return delay_in_millis
+
+
+JITTER_NONE = 'none'
+JITTER_FULL = 'full'
+JITTER_DECORRELATED = 'decorrelated'
+
+
+def get_retry_after_in_millis(error):
+    """Return the delay asked by the Retry-After header of a server error.
+
+    :param error: the caught error.
+    :type error: Exception
+    :return: the delay in milliseconds, or None if the server did not ask for one.
+    :rtype: int
+    """
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is None:
+        return None
+    retry_after = compat.convert_to_string(retry_after).strip()
+    try:
+        return max(0, int(float(retry_after) * 1000))
+    except ValueError:
+        pass
+    date = email.utils.parsedate_tz(retry_after)
+    if date is None:
+        return None
+    return max(0, int((email.utils.mktime_tz(date) - time.time()) * 1000))
+
+
+class TokenBucket(object):
+    """A bucket of tokens refilled at rate tokens per second, holding at most capacity tokens.
+
+    It is not thread-safe, its owner serializes the calls with its own lock.
+    """
+
+    def __init__(self, rate, capacity, tokens=None):
+        """
+        :param rate: the tokens added per second.
+        :type rate: float
+        :param capacity: the maximum number of tokens.
+        :type capacity: float
+        :param tokens: the initial number of tokens, capacity if None.
+        :type tokens: float
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity if tokens is None else tokens)
+        self._last_refill = time.time()
+
+    def refill(self):
+        """Add the tokens earned since the last refill."""
+        now = time.time()
+        self.tokens = min(float(self.capacity),
+                          self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def try_take(self):
+        """Take a token if there is a whole one.
+
+        :return: false if the bucket is empty.
+        :rtype: bool
+        """
+        self.refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def take(self):
+        """Take a token even if the bucket is empty, a negative balance is a debt.
+
+        :return: the seconds to wait until the token is earned.
+        :rtype: float
+        """
+        self.refill()
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def put_back(self):
+        """Return a token taken but not used."""
+        self.tokens += 1
+
+
+class RetryBudget(object):
+    """A thread-safe token bucket bounding the rate of retries of all the requests sharing it.
+
+    When an endpoint fails every request, retries would multiply the load on it by
+    max_error_retry. A request only retries if it can take a token from the budget, so the
+    extra load is at most retries_per_second, after a burst of max_tokens.
+    """
+
+    def __init__(self, retries_per_second=10, max_tokens=100):
+        """
+        :param retries_per_second: the rate at which tokens are refilled.
+        :type retries_per_second: float
+        :param max_tokens: the capacity of the bucket.
+        :type max_tokens: float
+        """
+        if retries_per_second <= 0 or max_tokens <= 0:
+            raise ValueError(b'retries_per_second and max_tokens should be positive.')
+        self.retries_per_second = retries_per_second
+        self.max_tokens = max_tokens
+        self._bucket = TokenBucket(retries_per_second, max_tokens)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token for a retry.
+
+        :return: false if the budget is exhausted.
+        :rtype: bool
+        """
+        with self._lock:
+            return self._bucket.try_take()
+
+
+_default_retry_budget = RetryBudget()
+
+
+def get_default_retry_budget():
+    """
+    :return: the retry budget shared by all the JitterRetryPolicy in the process by default.
+    :rtype: RetryBudget
+    """
+    return _default_retry_budget
+
+
+class CircuitBreaker(object):
+    """A thread-safe per-endpoint circuit breaker.
+
+    After failure_threshold consecutive failures of an endpoint, its circuit opens and requests
+    to it fail fast for reset_timeout_in_millis. Then one trial request is let through: its
+    success closes the circuit, its failure opens it again. Only IOError and 5xx errors other
+    than throttling count as failures, any response of the server proves it is up. Errors raised
+    on the client side, like an expired deadline, say nothing of the endpoint and are ignored.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout_in_millis=10 * 1000):
+        """
+        :param failure_threshold: consecutive failures opening the circuit.
+        :type failure_threshold: int
+        :param reset_timeout_in_millis: how long an open circuit fails requests.
+        :type reset_timeout_in_millis: int
+        """
+        if failure_threshold < 1:
+            raise ValueError(b'failure_threshold should be a positive integer.')
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_in_millis = reset_timeout_in_millis
+        self._lock = threading.Lock()
+        # endpoint -> [consecutive failures, time the circuit opened or None, trial in flight]
+        self._states = {}
+
+    @staticmethod
+    def is_failure(error):
+        """Return true if the error means the endpoint is down.
+
+        :param error: the caught error.
+        :type error: Exception
+        :rtype: bool
+        """
+        if isinstance(error, BceServerError):
+            return error.status_code is not None and error.status_code >= 500 \
+                and not is_throttling_error(error)
+        return isinstance(error, IOError)
+
+    def allow_request(self, endpoint):
+        """Return false if requests to the endpoint should fail fast.
+
+        :param endpoint: the key of the endpoint, like (protocol, host, port).
+        :rtype: bool
+        """
+        with self._lock:
+            state = self._states.get(endpoint)
+            if state is None or state[1] is None:
+                return True
+            if (time.time() - state[1]) * 1000 < self.reset_timeout_in_millis or state[2]:
+                return False
+            state[2] = True
+            return True
+
+    def is_open(self, endpoint):
+        """
+        :return: true if the circuit of the endpoint is open or half open.
+        :rtype: bool
+        """
+        with self._lock:
+            state = self._states.get(endpoint)
+            return state is not None and state[1] is not None
+
+    def record_success(self, endpoint):
+        """Close the circuit of the endpoint."""
+        with self._lock:
+            self._states.pop(endpoint, None)
+
+    def record_error(self, endpoint, error):
+        """Count the error against the endpoint if it is a failure, open the circuit once there
+        are failure_threshold consecutive failures. Another error from the server closes the
+        circuit like a success, an error raised on the client side leaves it as it is.
+        """
+        if not CircuitBreaker.is_failure(error):
+            if isinstance(error, BceServerError):
+                self.record_success(endpoint)
+                return
+            with self._lock:
+                state = self._states.get(endpoint)
+                if state is not None:
+                    # the trial request, if it was this one, proved nothing, let another one
+                    state[2] = False
+            return
+        with self._lock:
+            state = self._states.setdefault(endpoint, [0, None, False])
+            state[0] += 1
+            if state[1] is not None or state[0] >= self.failure_threshold:
+                if state[1] is None:
+                    _logger.warning('Open the circuit of %s after %d failures.',
+                                    endpoint, state[0])
+                state[1] = time.time()
+                state[2] = False
+
+
+class JitterRetryPolicy(BackOffRetryPolicy):
+    """A back-off policy which spreads the retries of concurrent requests.
+
+    The delays are randomized with full jitter, uniform in [0, backoff], or decorrelated jitter,
+    uniform in [base interval, 3 * previous delay], so that requests failing together do not
+    retry together. Throttling errors (429, 503 and SlowDown-like codes) are retried too, and a
+    Retry-After given by the server is honored: the request is not retried if the server asks to
+    wait for longer than max_delay_in_millis.
+
+    Retries take tokens from a RetryBudget, shared by default by all the policies in the
+    process. An optional CircuitBreaker makes the http client fail fast on an endpoint which is
+    down.
+    """
+
+    def __init__(self,
+                 max_error_retry=3,
+                 max_delay_in_millis=20 * 1000,
+                 base_interval_in_millis=300,
+                 jitter=JITTER_FULL,
+                 retry_budget=None,
+                 circuit_breaker=None):
+        """
+        :param jitter: JITTER_FULL, JITTER_DECORRELATED or JITTER_NONE.
+        :type jitter: str
+        :param retry_budget: the budget of the retries, get_default_retry_budget() if None.
+        :type retry_budget: RetryBudget
+        :param circuit_breaker: the circuit breaker of the endpoints, None for no breaker.
+        :type circuit_breaker: CircuitBreaker
+        """
+        BackOffRetryPolicy.__init__(self, max_error_retry, max_delay_in_millis,
+                                    base_interval_in_millis)
+        if jitter not in (JITTER_NONE, JITTER_FULL, JITTER_DECORRELATED):
+            raise ValueError(b'Invalid jitter.')
+        self.jitter = jitter
+        self.retry_budget = retry_budget if retry_budget is not None \
+            else get_default_retry_budget()
+        self.circuit_breaker = circuit_breaker
+        self._last_delay = threading.local()
+
+    def should_retry(self, error, retries_attempted):
+        """Return true if the http client should retry the request.
+
+        :param error: the caught error.
+        :type error: Exception
+        :param retries_attempted: the number of retries which has been attempted before.
+        :type retries_attempted: int
+        :return: true if the http client should retry the request.
+        :rtype: bool
+        """
+        if retries_attempted >= self.max_error_retry:
+            return False
+        if BackOffRetryPolicy.should_retry(self, error, retries_attempted):
+            pass
+        elif is_throttling_error(error):
+            _logger.debug(b'Retry for throttling.')
+        else:
+            return False
+        retry_after = get_retry_after_in_millis(error)
+        if retry_after is not None and retry_after > self.max_delay_in_millis:
+            _logger.debug(b'Do not retry, Retry-After exceeds the maximum delay.')
+            return False
+        if not self.retry_budget.acquire():
+            _logger.debug(b'Do not retry, the retry budget is exhausted.')
+            return False
+        return True
+
+    def get_delay_before_next_retry_in_millis(self, error, retries_attempted):
+        """Returns the delay time in milliseconds before the next retry.
+
+        :param error: the caught error.
+        :type error: Exception
+        :param retries_attempted: the number of retries which has been attempted before.
+        :type retries_attempted: int
+        :return: the delay time in milliseconds before the next retry.
+        :rtype: int
+        """
+        retry_after = get_retry_after_in_millis(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay_in_millis)
+        if retries_attempted < 0:
+            return 0
+        if self.jitter == JITTER_DECORRELATED:
+            # the previous delay of the request retried by this thread
+            previous = getattr(self._last_delay, 'value', None)
+            if retries_attempted == 0 or previous is None:
+                previous = self.base_interval_in_millis
+            delay = random.uniform(self.base_interval_in_millis,
+                                   max(self.base_interval_in_millis, previous * 3))
+            delay = min(self.max_delay_in_millis, int(delay))
+            self._last_delay.value = delay
+            return delay
+        delay = BackOffRetryPolicy.get_delay_before_next_retry_in_millis(
+            self, error, retries_attempted)
+        if self.jitter == JITTER_FULL:
+            return int(random.uniform(0, delay))
+        return delay
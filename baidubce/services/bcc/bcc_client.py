@@ -24,6 +24,7 @@ import string
 import uuid
 
 from baidubce import bce_base_client
+from baidubce import utils
 from baidubce.auth import bce_v1_signer
 from baidubce.http import bce_http_client
 from baidubce.http import handler
@@ -392,6 +393,33 @@ class BccClient(bce_base_client.BceBaseClient):
 
         return self._send_request(http_methods.GET, path, params=params, config=config)
 
+    def list_all_instances(self, internal_ip=None, dedicated_host_id=None, zone_name=None,
+                           page_size=None, max_items=None, config=None, read_ahead=False):
+        """
+        Generate all the instances owned by the authenticated user, the pages are listed
+        by list_instances.
+
+        :param page_size:
+            The number of instances requested per page.
+        :type page_size: int
+
+        :param max_items:
+            Stop after max_items instances.
+        :type max_items: int
+
+        :param read_ahead:
+            Request the next page while the instances of the current one are consumed.
+        :type read_ahead: bool
+
+        :return: generator of instances
+        """
+        def list_page(marker, max_keys):
+            return self.list_instances(marker=marker, max_keys=max_keys, internal_ip=internal_ip,
+                                       dedicated_host_id=dedicated_host_id,
+                                       zone_name=zone_name, config=config)
+        return utils.paginate(list_page, 'instances', page_size=page_size, max_items=max_items,
+                              read_ahead=read_ahead)
+
     @required(instance_id=(bytes, str))  # ***Unicode***
     def get_instance(self, instance_id, config=None):
         """
@@ -1091,6 +1119,32 @@ class BccClient(bce_base_client.BceBaseClient):
 
         return self._send_request(http_methods.GET, path, params=params, config=config)
 
+    def list_all_volumes(self, instance_id=None, zone_name=None, page_size=None, max_items=None,
+                         config=None, read_ahead=False):
+        """
+        Generate all the volumes owned by the authenticated user, the pages are listed
+        by list_volumes.
+
+        :param page_size:
+            The number of volumes requested per page.
+        :type page_size: int
+
+        :param max_items:
+            Stop after max_items volumes.
+        :type max_items: int
+
+        :param read_ahead:
+            Request the next page while the volumes of the current one are consumed.
+        :type read_ahead: bool
+
+        :return: generator of volumes
+        """
+        def list_page(marker, max_keys):
+            return self.list_volumes(instance_id=instance_id, zone_name=zone_name, marker=marker,
+                                     max_keys=max_keys, config=config)
+        return utils.paginate(list_page, 'volumes', page_size=page_size, max_items=max_items,
+                              read_ahead=read_ahead)
+
     @required(volume_id=(bytes, str))  # ***Unicode***
     def get_volume(self, volume_id, config=None):
         """
@@ -1757,6 +1811,31 @@ class BccClient(bce_base_client.BceBaseClient):
 
         return self._send_request(http_methods.GET, path, params=params, config=config)
 
+    def list_all_snapshots(self, volume_id=None, page_size=None, max_items=None, config=None,
+                           read_ahead=False):
+        """
+        Generate all the snapshots, the pages are listed by list_snapshots.
+
+        :param page_size:
+            The number of snapshots requested per page.
+        :type page_size: int
+
+        :param max_items:
+            Stop after max_items snapshots.
+        :type max_items: int
+
+        :param read_ahead:
+            Request the next page while the snapshots of the current one are consumed.
+        :type read_ahead: bool
+
+        :return: generator of snapshots
+        """
+        def list_page(marker, max_keys):
+            return self.list_snapshots(marker=marker, max_keys=max_keys, volume_id=volume_id,
+                                       config=config)
+        return utils.paginate(list_page, 'snapshots', page_size=page_size, max_items=max_items,
+                              read_ahead=read_ahead)
+
     @required(snapshot_id=(bytes, str))  # ***Unicode***
     def get_snapshot(self, snapshot_id, config=None):
         """
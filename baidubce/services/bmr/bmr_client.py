@@ -23,6 +23,7 @@ import baidubce
 from baidubce.auth import bce_v1_signer
 from baidubce import bce_base_client
 from baidubce import compat 
+from baidubce import utils
 from baidubce.http import bce_http_client
 from baidubce.http import handler
 from baidubce.http import http_content_types
@@ -131,6 +132,27 @@ class BmrClient(bce_base_client.BceBaseClient):
 
         return self._send_request(http_methods.GET, path, params=params)
 
+    def list_all_clusters(self, page_size=None, max_items=None, read_ahead=False):
+        """
+        List all the clusters, the pages are listed by list_clusters.
+
+        :param page_size: number of clusters requested per page.
+        :type page_size: int
+
+        :param max_items: stop after max_items clusters.
+        :type max_items: int
+
+        :param read_ahead: request the next page while the clusters of the current one are
+            consumed.
+        :type read_ahead: bool
+
+        :return: generator of clusters
+        """
+        def list_page(marker, max_keys):
+            return self.list_clusters(marker=marker, max_keys=max_keys)
+        return utils.paginate(list_page, 'clusters', page_size=page_size, max_items=max_items,
+                              read_ahead=read_ahead)
+
     @required(cluster_id=value_type)
     def get_cluster(self, cluster_id):
         """
@@ -19,4 +19,8 @@ MAX_APPEND_OBJECT_LENGTH = 5 * 1024 * 1024 * 1024
 MAX_USER_METADATA_SIZE = 2 * 1024
 MIN_PART_NUMBER = 1
 MAX_PART_NUMBER = 10000
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_COPY_PART_SIZE = 64 * 1024 * 1024
+DEFAULT_TRANSFER_WORKERS = 5
+MAX_DELETE_OBJECTS = 1000
 URL_PREFIX = b"/"
@@ -0,0 +1,537 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides an asyncio client class for BOS. Python 3.6+ is required.
+"""
+
+import asyncio
+import base64
+import functools
+import hashlib
+import http.client
+import json
+import os
+
+import baidubce
+from baidubce import compat
+from baidubce import utils
+from baidubce.auth import bce_v1_signer
+from baidubce.exception import BceClientError
+from baidubce.exception import BceHttpClientError
+from baidubce.exception import BceServerError
+from baidubce.http import aio_http_client
+from baidubce.http import handler
+from baidubce.http import http_content_types
+from baidubce.http import http_headers
+from baidubce.http import http_methods
+from baidubce.services.bos.bos_client import BosClient
+from baidubce.utils import required
+
+
+def _not_supported(name):
+    """
+    :return: a method raising BceClientError in place of the BosClient method name
+    """
+    def method(self, *args, **kwargs):
+        raise BceClientError('%s is not supported by AsyncBosClient, use BosClient instead.'
+                             % name)
+    method.__name__ = name
+    method.__doc__ = 'Not supported by AsyncBosClient, use BosClient.%s instead.' % name
+    return method
+
+
+class _ExecutorFileReader(object):
+    """
+    A file whose read() is a coroutine reading in the default executor, so that the event loop
+    is not blocked by the disk.
+    """
+    def __init__(self, fp):
+        self._fp = fp
+
+    async def read(self, size=-1):
+        """
+        :return: at most size bytes
+        :rtype: bytes
+        """
+        return await asyncio.get_event_loop().run_in_executor(None, self._fp.read, size)
+
+    def tell(self):
+        """
+        :return: the position in the file
+        :rtype: int
+        """
+        return self._fp.tell()
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        """
+        Move to offset like file.seek().
+        """
+        return self._fp.seek(offset, whence)
+
+
+class AsyncBosClient(BosClient):
+    """
+    asyncio sdk client, every request method is a coroutine.
+
+    Requests and responses are built exactly as in BosClient, only the methods that post-process
+    the response are overridden here.
+    """
+    def __init__(self, config=None):
+        BosClient.__init__(self, config)
+
+    # the BosClient helpers driving many requests from worker threads have no coroutine
+    # version, inheriting them would hand coroutines to code expecting responses
+    list_all_objects_parallel = _not_supported('list_all_objects_parallel')
+    walk_objects = _not_supported('walk_objects')
+    download_file = _not_supported('download_file')
+    upload_file = _not_supported('upload_file')
+    copy_large_object = _not_supported('copy_large_object')
+    delete_keys = _not_supported('delete_keys')
+    delete_prefix = _not_supported('delete_prefix')
+    sync_upload = _not_supported('sync_upload')
+    sync_download = _not_supported('sync_download')
+
+    @required(bucket_name=(bytes, str))
+    async def get_bucket_location(self, bucket_name, config=None):
+        """
+        Get the region which the bucket located in.
+
+        :param bucket_name: the name of bucket
+        :type bucket_name: string or unicode
+        :param config: None
+        :type config: BceClientConfiguration
+
+        :return: region of the bucket
+        :rtype: str
+        """
+        params = {b'location': b''}
+        response = await self._send_request(
+            http_methods.GET, bucket_name, params=params, config=config)
+        return response.location_constraint
+
+    @required(bucket_name=(bytes, str))
+    async def does_bucket_exist(self, bucket_name, config=None):
+        """
+        Check whether there is a bucket with specific name
+
+        :param bucket_name: None
+        :type bucket_name: str
+        :return:True or False
+        :rtype: bool
+        """
+        try:
+            await self._send_request(http_methods.HEAD, bucket_name, config=config)
+            return True
+        except BceHttpClientError as e:
+            if isinstance(e.last_error, BceServerError):
+                if e.last_error.status_code == http.client.FORBIDDEN:
+                    return True
+                if e.last_error.status_code == http.client.NOT_FOUND:
+                    return False
+            raise e
+
+    @required(bucket_name=(bytes, str), acl=(list, dict))
+    async def set_bucket_acl(self, bucket_name, acl, config=None):
+        """
+        Set Access Control Level of bucket
+
+        :type bucket: string
+        :param bucket: None
+
+        :type grant_list: list of grant
+        :param grant_list: None
+        """
+        await self._send_request(http_methods.PUT,
+                                 bucket_name,
+                                 body=json.dumps({'accessControlList': acl},
+                                                 default=BosClient._dump_acl_object),
+                                 headers={http_headers.CONTENT_TYPE: http_content_types.JSON},
+                                 params={b'acl': b''},
+                                 config=config)
+
+    @required(bucket_name=(bytes, str), canned_acl=bytes)
+    async def set_bucket_canned_acl(self, bucket_name, canned_acl, config=None):
+        """
+
+        :param bucket_name:
+        :param canned_acl:
+        :param config:
+        """
+        await self._send_request(http_methods.PUT,
+                                 bucket_name,
+                                 headers={http_headers.BCE_ACL: canned_acl},
+                                 params={b'acl': b''},
+                                 config=config)
+
+    @required(bucket_name=(bytes, str))
+    async def list_all_objects(self, bucket_name, prefix=None, delimiter=None, config=None,
+                               page_size=None, max_items=None):
+        """
+        Asynchronous generator of all objects in the bucket.
+
+        :param bucket_name:
+        :param prefix:
+        :param delimiter:
+        :param config:
+        :param page_size: number of objects requested per list_objects call
+        :param max_items: stop after max_items objects
+        :return:
+        """
+        remaining = max_items
+        marker = None
+        while remaining is None or remaining > 0:
+            max_keys = page_size
+            if remaining is not None and (max_keys is None or remaining < max_keys):
+                max_keys = remaining
+            response = await self.list_objects(
+                bucket_name, max_keys=max_keys, marker=marker, prefix=prefix,
+                delimiter=delimiter, config=config)
+            items = response.contents
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+            for item in items:
+                yield item
+            if response.is_truncated:
+                marker = response.next_marker
+            else:
+                break
+
+    @required(bucket_name=(bytes, str), key=(bytes, str))
+    async def get_object(self, bucket_name, key, range=None, config=None):
+        """
+        The body is not read into memory, response.data is an AsyncHttpResponse whose content
+        is read with "await response.data.aread()".
+
+        :param bucket_name:
+        :param key:
+        :param range:
+        :param config:
+        :return:
+        """
+        key = compat.convert_to_bytes(key)
+        return await self._send_request(
+            http_methods.GET,
+            bucket_name,
+            key,
+            headers=BosClient._get_range_header_dict(range),
+            config=config,
+            body_parser=BosClient._parse_bos_object,
+            stream=True)
+
+    @required(bucket_name=(bytes, str), key=(bytes, str))
+    async def get_object_as_string(self, bucket_name, key, range=None, config=None):
+        """
+
+        :param bucket_name:
+        :param key:
+        :param range:
+        :param config:
+        :return:
+        """
+        response = await self.get_object(bucket_name, key, range=range, config=config)
+        try:
+            return await response.data.aread()
+        finally:
+            response.data.close()
+
+    @required(bucket_name=(bytes, str), key=(bytes, str), file_name=(bytes, str))
+    async def get_object_to_file(self, bucket_name, key, file_name, range=None, config=None):
+        """
+        Get Content of Object and Put Content to File
+
+        :type bucket: string
+        :param bucket: None
+
+        :type key: string
+        :param key: None
+
+        :type file_name: string
+        :param file_name: None
+
+        :type range: tuple
+        :param range: (0,9) represent get object contents of 0-9 in bytes. 10 bytes date in total.
+        :return:
+            **HTTP Response**
+        """
+        file_name = compat.convert_to_bytes(file_name)
+        response = await self.get_object(bucket_name, key, range=range, config=config)
+        buf_size = self._get_config_parameter(config, 'recv_buf_size')
+        try:
+            with open(file_name, 'wb') as f:
+                async for buf in response.data.iter_chunks(buf_size):
+                    f.write(buf)
+        finally:
+            response.data.close()
+        del response.data
+        return response
+
+    @staticmethod
+    def _get_md5(data):
+        return base64.standard_b64encode(hashlib.md5(data).digest())
+
+    @required(bucket_name=(bytes, str),
+              key=(bytes, str),
+              data=(bytes, str))
+    async def append_object_from_string(self, bucket_name, key, data,
+                                        content_md5=None,
+                                        offset=None,
+                                        content_type=None,
+                                        user_metadata=None,
+                                        content_sha256=None,
+                                        storage_class=None,
+                                        user_headers=None,
+                                        config=None):
+        """
+        Create an appendable object and put content of string to the object
+        or add content of string to an appendable object
+        """
+        if isinstance(data, str):
+            data = data.encode(baidubce.DEFAULT_ENCODING)
+        if content_md5 is None:
+            content_md5 = AsyncBosClient._get_md5(data)
+        return await self.append_object(bucket_name=bucket_name,
+                                        key=key,
+                                        data=data,
+                                        content_md5=content_md5,
+                                        content_length=len(data),
+                                        offset=offset,
+                                        content_type=content_type,
+                                        user_metadata=user_metadata,
+                                        content_sha256=content_sha256,
+                                        storage_class=storage_class,
+                                        user_headers=user_headers,
+                                        config=config)
+
+    @required(bucket=(bytes, str), key=(bytes, str), data=(bytes, str))
+    async def put_object_from_string(self, bucket, key, data,
+                                     content_md5=None,
+                                     content_type=None,
+                                     content_sha256=None,
+                                     user_metadata=None,
+                                     storage_class=None,
+                                     user_headers=None,
+                                     config=None):
+        """
+        Create object and put content of string to the object
+        """
+        if isinstance(data, str):
+            data = data.encode(baidubce.DEFAULT_ENCODING)
+        if content_md5 is None:
+            content_md5 = AsyncBosClient._get_md5(data)
+        return await self.put_object(bucket, key, data,
+                                     content_length=len(data),
+                                     content_md5=content_md5,
+                                     content_type=content_type,
+                                     content_sha256=content_sha256,
+                                     user_metadata=user_metadata,
+                                     storage_class=storage_class,
+                                     user_headers=user_headers,
+                                     config=config)
+
+    @required(bucket=(bytes, str), key=(bytes, str), file_name=(bytes, str))
+    async def put_object_from_file(self, bucket, key, file_name,
+                                   content_length=None,
+                                   content_md5=None,
+                                   content_type=None,
+                                   content_sha256=None,
+                                   user_metadata=None,
+                                   storage_class=None,
+                                   user_headers=None,
+                                   calculate_sha256=False,
+                                   config=None):
+        """
+        Put object and put content of file to the object. The file is hashed and read in the
+        default executor of the event loop.
+        """
+        loop = asyncio.get_event_loop()
+        with open(file_name, 'rb') as fp:
+            if content_length is None:
+                content_length = os.fstat(fp.fileno()).st_size
+            calculate_sha256 = calculate_sha256 and content_sha256 is None
+            if content_md5 is None or calculate_sha256:
+                md5, sha256 = await loop.run_in_executor(None, functools.partial(
+                    utils.get_content_digests_from_file,
+                    file_name, length=content_length, sha256=calculate_sha256,
+                    buf_size=self._get_config_parameter(config, 'recv_buf_size')))
+                if content_md5 is None:
+                    content_md5 = md5
+                if calculate_sha256:
+                    content_sha256 = sha256
+            if content_type is None:
+                content_type = utils.guess_content_type_by_file_name(file_name)
+            return await self.put_object(bucket, key, _ExecutorFileReader(fp),
+                                         content_length=content_length,
+                                         content_md5=content_md5,
+                                         content_type=content_type,
+                                         content_sha256=content_sha256,
+                                         user_metadata=user_metadata,
+                                         storage_class=storage_class,
+                                         user_headers=user_headers,
+                                         config=config)
+
+    @required(bucket_name=(bytes, str),
+              key=(bytes, str),
+              upload_id=(bytes, str),
+              part_number=int,
+              part_size=compat.integer_types,
+              file_name=(bytes, str),
+              offset=compat.integer_types)
+    async def upload_part_from_file(self, bucket_name, key, upload_id,
+                                    part_number, part_size, file_name, offset, part_md5=None,
+                                    config=None):
+        """
+
+        :param bucket_name:
+        :param key:
+        :param upload_id:
+        :param part_number:
+        :param part_size:
+        :param file_name:
+        :param offset:
+        :param part_md5:
+        :param config:
+        :return:
+        """
+        with open(file_name, 'rb') as f:
+            f.seek(offset)
+            return await self.upload_part(bucket_name, key, upload_id, part_number, part_size,
+                                          _ExecutorFileReader(f), part_md5=part_md5,
+                                          config=config)
+
+    @required(bucket_name=(bytes, str), key=(bytes, str), upload_id=(bytes, str))
+    async def list_all_parts(self, bucket_name, key, upload_id, config=None):
+        """
+        Asynchronous generator of all uploaded parts.
+
+        :param bucket_name:
+        :param key:
+        :param upload_id:
+        :param config:
+        :return:
+        """
+        part_number_marker = None
+        while True:
+            response = await self.list_parts(bucket_name, key, upload_id,
+                                             part_number_marker=part_number_marker,
+                                             config=config)
+            for item in response.parts:
+                yield item
+            if not response.is_truncated:
+                break
+            part_number_marker = response.next_part_number_marker
+
+    @required(bucket_name=(bytes, str))
+    async def list_all_multipart_uploads(self, bucket_name, prefix=None, delimiter=None,
+                                         config=None):
+        """
+        Asynchronous generator of all multipart uploads.
+
+        :param bucket_name:
+        :param prefix:
+        :param delimiter:
+        :param config:
+        :return:
+        """
+        key_marker = None
+        while True:
+            response = await self.list_multipart_uploads(bucket_name,
+                                                         key_marker=key_marker,
+                                                         prefix=prefix,
+                                                         delimiter=delimiter,
+                                                         config=config)
+            for item in response.uploads:
+                yield item
+            if not response.is_truncated:
+                break
+            if response.next_key_marker is not None:
+                key_marker = response.next_key_marker
+            elif len(response.uploads) != 0:
+                key_marker = response.uploads[-1].key
+            else:
+                break
+
+    @required(bucket_name=(bytes, str), key=(bytes, str), acl=(list, dict))
+    async def set_object_acl(self, bucket_name, key, acl, config=None):
+        """
+        Set Access Control Level of object
+
+        :type bucket: string
+        :param bucket: None
+
+        :type acl: list of grant
+        :param acl: None
+        """
+        key = compat.convert_to_bytes(key)
+        await self._send_request(http_methods.PUT,
+                                 bucket_name,
+                                 key,
+                                 body=json.dumps({'accessControlList': acl},
+                                                 default=BosClient._dump_acl_object),
+                                 headers={http_headers.CONTENT_TYPE: http_content_types.JSON},
+                                 params={b'acl': b''},
+                                 config=config)
+
+    @required(bucket_name=(bytes, str), key=(bytes, str))
+    async def set_object_canned_acl(self, bucket_name, key,
+                                    canned_acl=None,
+                                    grant_read=None,
+                                    grant_full_control=None,
+                                    config=None):
+        """
+        Set canned acl, grant read or grant full control of object, only one of them is allowed.
+        """
+        key = compat.convert_to_bytes(key)
+        headers = {}
+        if canned_acl is not None:
+            headers[http_headers.BCE_ACL] = compat.convert_to_bytes(canned_acl)
+        if grant_read is not None:
+            headers[http_headers.BOS_GRANT_READ] = compat.convert_to_bytes(grant_read)
+        if grant_full_control is not None:
+            headers[http_headers.BOS_GRANT_FULL_CONTROL] = \
+                compat.convert_to_bytes(grant_full_control)
+
+        if len(headers) == 0:
+            raise ValueError("donn't give any object canned acl arguments!")
+        elif len(headers) >= 2:
+            raise ValueError("cann't get more than one object canned acl arguments!")
+
+        await self._send_request(http_methods.PUT,
+                                 bucket_name,
+                                 key,
+                                 headers=headers,
+                                 params={b'acl': b''},
+                                 config=config)
+
+    def _send_request(
+            self, http_method, bucket_name=None, key=None,
+            body=None, headers=None, params=None,
+            config=None,
+            body_parser=None,
+            stream=False,
+            hedge=False):
+        # the aio transport does not hedge, hedge is accepted for the methods of BosClient
+        config = self._merge_config(config)
+        path = BosClient._get_path(config, bucket_name, key)
+        if body_parser is None:
+            body_parser = handler.parse_json
+
+        if config.security_token is not None:
+            headers = headers or {}
+            headers[http_headers.STS_SECURITY_TOKEN] = config.security_token
+
+        return aio_http_client.send_request(
+            config, bce_v1_signer.sign, [handler.parse_error, body_parser],
+            http_method, path, body, headers, params, stream=stream,
+            service_id=self.service_id,
+            path_template=BosClient._get_path_template(bucket_name, key))
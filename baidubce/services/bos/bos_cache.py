@@ -0,0 +1,314 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides the local read-through object caches of BosClient.
+"""
+import collections
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+from baidubce import compat
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_CACHE_SIZE = 64 * 1024 * 1024
+DEFAULT_DISK_CACHE_SIZE = 1024 * 1024 * 1024
+
+
+class CacheEntry(object):
+    """
+    A cached object.
+
+    :param metadata: the response metadata of the GET which fetched the object, it holds the
+        etag and last_modified used to revalidate the entry
+    :type metadata: dict
+    :param size: the size of the content
+    :type size: int
+    :param validated_at: the time the content was last known to be current
+    :type validated_at: float
+    """
+    __slots__ = ('cache_key', 'metadata', 'size', 'validated_at', 'data')
+
+    def __init__(self, cache_key, metadata, size, validated_at, data=None):
+        self.cache_key = cache_key
+        self.metadata = metadata
+        self.size = size
+        self.validated_at = validated_at
+        self.data = data
+
+    @property
+    def etag(self):
+        """
+        :rtype: str
+        """
+        return self.metadata.get('etag')
+
+    @property
+    def last_modified(self):
+        """
+        :rtype: str
+        """
+        return self.metadata.get('last_modified')
+
+
+class ObjectCache(object):
+    """
+    A thread-safe LRU cache of object contents bounded by their total size, holding the
+    contents in memory. DiskObjectCache keeps them in files instead.
+
+    An entry younger than ttl seconds is served without asking the server, an older one is
+    revalidated by BosClient with a conditional GET. With ttl None every hit is revalidated.
+
+    :param max_size: the maximum total size of the cached contents in bytes
+    :type max_size: int
+    :param ttl: seconds during which an entry is used without revalidation
+    :type ttl: float
+    """
+    def __init__(self, max_size, ttl=None):
+        if max_size <= 0:
+            raise ValueError('max_size should be positive.')
+        self.max_size = max_size
+        self.ttl = ttl
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def get_cache_key(bucket_name, key):
+        """
+        :return: the key of an object in the cache
+        :rtype: str
+        """
+        return '%s/%s' % (compat.convert_to_string(bucket_name), compat.convert_to_string(key))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, cache_key):
+        return cache_key in self._entries
+
+    def get(self, cache_key):
+        """
+        Look up an entry and mark it as the most recently used.
+
+        :return: the entry, or None if the object is not cached
+        :rtype: CacheEntry
+        """
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.pop(cache_key)
+                self._entries[cache_key] = entry
+            return entry
+
+    def is_fresh(self, entry):
+        """
+        :return: true if the entry may be used without revalidation
+        :rtype: bool
+        """
+        return self.ttl is not None and time.time() - entry.validated_at < self.ttl
+
+    def refresh(self, entry):
+        """
+        Record that the server confirmed the entry is current.
+        """
+        entry.validated_at = time.time()
+
+    def put(self, cache_key, metadata, data=None, file_name=None):
+        """
+        Cache the content given as bytes or as a file, replacing the former entry of the key.
+        Contents larger than max_size are not cached, nor those failing to be stored.
+
+        :param metadata: the response metadata of the GET
+        :type metadata: dict
+        :return: the entry, or None if the content is not cached
+        :rtype: CacheEntry
+        """
+        if data is not None:
+            size = len(data)
+        else:
+            size = os.path.getsize(file_name)
+        self.remove(cache_key)
+        if size > self.max_size:
+            return None
+        entry = CacheEntry(cache_key, dict(metadata), size, time.time())
+        try:
+            self._store(entry, data, file_name)
+        except (IOError, OSError) as e:
+            _logger.warning('Failed to cache %s: %s', cache_key, e)
+            return None
+        with self._lock:
+            self._entries[cache_key] = entry
+            self.size += size
+            self._evict()
+        return entry
+
+    def remove(self, cache_key):
+        """
+        Drop the entry of the key if any.
+        """
+        with self._lock:
+            entry = self._entries.pop(cache_key, None)
+            if entry is None:
+                return
+            self.size -= entry.size
+            self._discard(entry)
+
+    def clear(self):
+        """
+        Drop all entries.
+        """
+        with self._lock:
+            for entry in self._entries.values():
+                self._discard(entry)
+            self._entries.clear()
+            self.size = 0
+
+    def _evict(self):
+        while self.size > self.max_size and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+            self._discard(entry)
+
+    def open(self, entry):
+        """
+        Open the content of the entry, unless the entry was dropped since it was looked up.
+        The content stays readable once opened, even if the entry is dropped meanwhile.
+
+        :return: a binary file object reading the content of the entry, or None if the entry
+            is no longer cached
+        """
+        with self._lock:
+            if self._entries.get(entry.cache_key) is not entry:
+                return None
+            try:
+                return self._open(entry)
+            except (IOError, OSError) as e:
+                _logger.warning('Failed to read cached %s: %s', entry.cache_key, e)
+                return None
+
+    def _open(self, entry):
+        return io.BytesIO(entry.data)
+
+    def _store(self, entry, data, file_name):
+        if data is None:
+            with open(file_name, 'rb') as f:
+                data = f.read()
+        entry.data = bytes(data)
+
+    def _discard(self, entry):
+        pass
+
+
+class MemoryObjectCache(ObjectCache):
+    """
+    An ObjectCache holding the contents in memory.
+    """
+    def __init__(self, max_size=DEFAULT_MEMORY_CACHE_SIZE, ttl=None):
+        ObjectCache.__init__(self, max_size, ttl)
+
+
+class DiskObjectCache(ObjectCache):
+    """
+    An ObjectCache keeping the contents as files in cache_dir, which survives the process.
+
+    Each object is stored as <sha1 of cache key>.data with its metadata in <sha1>.meta. The
+    mtime of the data file is the time the entry was last validated, the entries found in
+    cache_dir are loaded in that order when the cache is created.
+
+    :param cache_dir: the directory of the cache, created if missing
+    :type cache_dir: str
+    """
+    def __init__(self, cache_dir, max_size=DEFAULT_DISK_CACHE_SIZE, ttl=None):
+        ObjectCache.__init__(self, max_size, ttl)
+        self.cache_dir = cache_dir
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        self._load()
+
+    def _get_path(self, cache_key, suffix):
+        name = hashlib.sha1(compat.convert_to_bytes(cache_key)).hexdigest()
+        return os.path.join(self.cache_dir, name + suffix)
+
+    def _load(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.meta'):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            data_path = meta_path[:-len('.meta')] + '.data'
+            try:
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+                stat = os.stat(data_path)
+            except (IOError, OSError, ValueError):
+                _logger.debug('Drop broken cache entry %s', meta_path)
+                self._remove_files(meta_path, data_path)
+                continue
+            entries.append(CacheEntry(meta['cacheKey'], meta['metadata'], stat.st_size,
+                                      stat.st_mtime))
+        entries.sort(key=lambda e: e.validated_at)
+        with self._lock:
+            for entry in entries:
+                self._entries[entry.cache_key] = entry
+                self.size += entry.size
+            self._evict()
+
+    def _open(self, entry):
+        return open(self._get_path(entry.cache_key, '.data'), 'rb')
+
+    def refresh(self, entry):
+        """
+        Record that the server confirmed the entry is current.
+        """
+        ObjectCache.refresh(self, entry)
+        try:
+            os.utime(self._get_path(entry.cache_key, '.data'),
+                     (entry.validated_at, entry.validated_at))
+        except OSError:
+            pass
+
+    def _store(self, entry, data, file_name):
+        data_path = self._get_path(entry.cache_key, '.data')
+        meta_path = self._get_path(entry.cache_key, '.meta')
+        temp_path = '%s.%d.%d.tmp' % (data_path, os.getpid(), threading.current_thread().ident)
+        try:
+            if data is not None:
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+            else:
+                shutil.copyfile(file_name, temp_path)
+            with open(meta_path, 'w') as f:
+                json.dump({'cacheKey': entry.cache_key, 'metadata': entry.metadata}, f)
+            os.rename(temp_path, data_path)
+        except Exception:
+            self._remove_files(temp_path, meta_path)
+            raise
+
+    def _discard(self, entry):
+        self._remove_files(self._get_path(entry.cache_key, '.meta'),
+                           self._get_path(entry.cache_key, '.data'))
+
+    @staticmethod
+    def _remove_files(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
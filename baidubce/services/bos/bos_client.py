@@ -15,12 +15,19 @@ This module provides a client class for BOS.
 """
 
 import io
+import collections
 import copy
+import itertools
 import http.client
 import os
 import json
 import logging
+import queue
 import shutil
+import threading
+import time
+import traceback
+from concurrent import futures
 from builtins import str
 from builtins import bytes
 from future.utils import iteritems, iterkeys, itervalues
@@ -30,6 +37,7 @@ from baidubce import bce_client_configuration
 from baidubce import utils
 from baidubce.auth import bce_v1_signer
 from baidubce.bce_base_client import BceBaseClient
+from baidubce.bce_response import BceResponse
 from baidubce.exception import BceClientError
 from baidubce.exception import BceServerError
 from baidubce.exception import BceHttpClientError
@@ -40,6 +48,8 @@ from baidubce.http import http_headers
 from baidubce.http import http_methods
 from baidubce.services import bos
 from baidubce.services.bos import bos_handler
+from baidubce.services.bos import bos_stream
+from baidubce.services.bos import bos_transfer
 from baidubce.services.bos import storage_class
 from baidubce.utils import required
 from baidubce import compat
@@ -56,9 +66,14 @@ ENCRYPTION_ALGORITHM= "AES256"
 class BosClient(BceBaseClient):
     """
     sdk client
+
+    :param object_cache: a bos_cache.ObjectCache serving get_object_as_string and
+        get_object_to_file of whole objects, None to disable caching
+    :type object_cache: baidubce.services.bos.bos_cache.ObjectCache
     """
-    def __init__(self, config=None):
+    def __init__(self, config=None, object_cache=None):
         BceBaseClient.__init__(self, config)
+        self.object_cache = object_cache
 
     def list_buckets(self, config=None):
         """
@@ -731,28 +746,241 @@ class BosClient(BceBaseClient):
         if delimiter is not None:
             params[b'delimiter'] = delimiter
 
-        return self._send_request(http_methods.GET, bucket_name, params=params, config=config)
+        return self._send_request(http_methods.GET, bucket_name, params=params, config=config,
+                                  body_parser=bos_handler.parse_list_objects)
 
     @required(bucket_name=(bytes, str))
-    def list_all_objects(self, bucket_name, prefix=None, delimiter=None, config=None):
+    def list_all_objects(self, bucket_name, prefix=None, delimiter=None, config=None,
+                         page_size=None, max_items=None, read_ahead=False):
         """
 
         :param bucket_name:
         :param prefix:
         :param delimiter:
         :param config:
+        :param page_size: number of objects requested per list_objects call
+        :param max_items: stop after max_items objects
+        :param read_ahead: request the next page while the objects of the current one are consumed
         :return:
         """
+        config = self._start_deadline(config)
+        def list_page(marker, max_keys):
+            return self.list_objects(bucket_name, max_keys=max_keys, marker=marker,
+                                     prefix=prefix, delimiter=delimiter, config=config)
+        return utils.paginate(list_page, 'contents', page_size=page_size, max_items=max_items,
+                              read_ahead=read_ahead)
+
+    @required(bucket_name=(bytes, str))
+    def list_all_objects_parallel(self, bucket_name, prefix=None, delimiter='/',
+                                  max_workers=None, ordered=True, config=None):
+        """
+        List all the objects under prefix with concurrent list_objects requests.
+
+        The keyspace is split by the common prefixes found with delimiter right under prefix,
+        and the shards are listed concurrently while the top level is still being paged. A
+        keyspace without any delimiter under prefix is listed as one shard, sequentially.
+
+        :type bucket_name: string
+        :param bucket_name: None
+
+        :type prefix: string
+        :param prefix: None
+
+        :type delimiter: string
+        :param delimiter: the delimiter splitting the keyspace into shards
+
+        :type max_workers: int
+        :param max_workers: number of shards listed concurrently
+
+        :type ordered: bool
+        :param ordered: yield the objects in key order like list_all_objects. Otherwise they are
+            yielded as soon as they are listed, which keeps all the workers busy.
+
+        :return: generator of the object summaries
+        """
+        config = self._start_deadline(config)
+        max_workers = max_workers or bos.DEFAULT_TRANSFER_WORKERS
+        stop = threading.Event()
+        executor = futures.ThreadPoolExecutor(max_workers)
+        try:
+            segments = self._list_object_segments(bucket_name, prefix, delimiter, config)
+            if ordered:
+                merge = self._merge_shards_ordered
+            else:
+                merge = self._merge_shards_unordered
+            for item in merge(bucket_name, segments, executor, max_workers * 2, stop, config):
+                yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+
+    def _list_object_segments(self, bucket_name, prefix, delimiter, config):
+        """
+        Page the level right under prefix, and generate in key order (objects, None) for the
+        objects of this level and (None, shard) for every common prefix.
+        """
         marker = None
         while True:
-            response = self.list_objects(
-                bucket_name, marker=marker, prefix=prefix, delimiter=delimiter, config=config)
-            for item in response.contents:
-                yield item
-            if response.is_truncated:
+            response = self.list_objects(bucket_name, prefix=prefix, marker=marker,
+                                         delimiter=delimiter, config=config)
+            entries = [(item.key, item) for item in response.contents or []]
+            entries.extend((item.prefix, None) for item in response.common_prefixes or [])
+            entries.sort(key=lambda entry: entry[0])
+            objects = []
+            for key, item in entries:
+                if item is not None:
+                    objects.append(item)
+                    continue
+                if objects:
+                    yield objects, None
+                    objects = []
+                yield None, key
+            if objects:
+                yield objects, None
+            if not response.is_truncated:
+                break
+            marker = response.next_marker
+
+    def _list_shard(self, bucket_name, shard, output, stop, config):
+        """
+        List all the objects of a shard and put the pages to output, followed by None.
+        """
+        try:
+            marker = None
+            while not stop.is_set():
+                response = self.list_objects(bucket_name, prefix=shard, marker=marker,
+                                             config=config)
+                BosClient._put_until_stopped(output, response.contents or [], stop)
+                if not response.is_truncated:
+                    break
                 marker = response.next_marker
+            BosClient._put_until_stopped(output, None, stop)
+        except Exception as e:
+            BosClient._put_until_stopped(output, e, stop)
+
+    @staticmethod
+    def _put_until_stopped(output, page, stop):
+        while not stop.is_set():
+            try:
+                output.put(page, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _merge_shards_ordered(self, bucket_name, segments, executor, window_size, stop,
+                              config):
+        # every shard listed ahead has its own bounded queue of pages, consumed in key order
+        window = collections.deque()
+        while True:
+            while len(window) < window_size:
+                segment = next(segments, None)
+                if segment is None:
+                    break
+                objects, shard = segment
+                if shard is None:
+                    window.append(objects)
+                else:
+                    pages = queue.Queue(4)
+                    executor.submit(self._list_shard, bucket_name, shard, pages, stop, config)
+                    window.append(pages)
+            if not window:
+                return
+            head = window.popleft()
+            if isinstance(head, list):
+                for item in head:
+                    yield item
+                continue
+            while True:
+                page = head.get()
+                if page is None:
+                    break
+                if isinstance(page, Exception):
+                    raise page
+                for item in page:
+                    yield item
+
+    def _merge_shards_unordered(self, bucket_name, segments, executor, window_size, stop,
+                                config):
+        # all the shards put their pages to one queue, a shard is done once it puts None
+        pages = queue.Queue(window_size * 2)
+        running = 0
+        while True:
+            while running < window_size:
+                segment = next(segments, None)
+                if segment is None:
+                    break
+                objects, shard = segment
+                if shard is None:
+                    for item in objects:
+                        yield item
+                else:
+                    executor.submit(self._list_shard, bucket_name, shard, pages, stop, config)
+                    running += 1
+            if running == 0:
+                return
+            page = pages.get()
+            if page is None:
+                running -= 1
+                continue
+            if isinstance(page, Exception):
+                raise page
+            for item in page:
+                yield item
+
+    @required(bucket_name=(bytes, str))
+    def walk_objects(self, bucket_name, prefix=None, delimiter='/', max_workers=None,
+                     config=None):
+        """
+        Walk the tree of common prefixes under prefix like os.walk, listing the levels
+        concurrently.
+
+        Yield (prefix, sub_prefixes, objects) for every level, a level is always yielded before
+        its sub levels but the order between levels is not otherwise defined. Like with
+        os.walk, the caller can remove entries of sub_prefixes in place to skip them.
+
+        :type bucket_name: string
+        :param bucket_name: None
+
+        :type prefix: string
+        :param prefix: the root of the walk
+
+        :type delimiter: string
+        :param delimiter: None
+
+        :type max_workers: int
+        :param max_workers: number of levels listed concurrently
+
+        :return: generator of (prefix, sub_prefixes, objects)
+        """
+        config = self._start_deadline(config)
+        executor = futures.ThreadPoolExecutor(max_workers or bos.DEFAULT_TRANSFER_WORKERS)
+        pending = set()
+        try:
+            pending.add(executor.submit(self._list_level, bucket_name, prefix, delimiter,
+                                        config))
+            while pending:
+                done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                for task in done:
+                    level = task.result()
+                    yield level
+                    for sub_prefix in level[1]:
+                        pending.add(executor.submit(self._list_level, bucket_name, sub_prefix,
+                                                    delimiter, config))
+        finally:
+            for task in pending:
+                task.cancel()
+            executor.shutdown(wait=True)
+
+    def _list_level(self, bucket_name, prefix, delimiter, config):
+        sub_prefixes = []
+        objects = []
+        for objects_page, shard in self._list_object_segments(bucket_name, prefix, delimiter,
+                                                              config):
+            if shard is None:
+                objects.extend(objects_page)
             else:
-                break
+                sub_prefixes.append(shard)
+        return prefix, sub_prefixes, objects
 
     @staticmethod
     def _get_range_header_dict(range):
@@ -800,9 +1028,29 @@ class BosClient(BceBaseClient):
         response.data = http_response
         return True
 
+    @staticmethod
+    def _parse_bos_object_stream(http_response, response):
+        """Same as _parse_bos_object, but sets response.data to a bos_stream.ObjectStream which
+        verifies the body against the ETag and CRC32 when the whole object is returned.
+        """
+        BosClient._parse_bos_object(http_response, response)
+        content_length = response.metadata.content_length
+        if content_length is not None:
+            content_length = int(content_length)
+        etag = None
+        crc32 = None
+        if http_response.status == http.client.OK:
+            etag = response.metadata.etag
+            if response.metadata.bce_content_crc32 is not None:
+                crc32 = int(response.metadata.bce_content_crc32)
+        response.data = bos_stream.ObjectStream(http_response, content_length, etag, crc32)
+        return True
+
     @required(bucket_name=(bytes, str), key=(bytes, str))
     def get_object(self, bucket_name, key, range=None, config=None):
         """
+        Get an object without reading its content. response.data is a bos_stream.ObjectStream,
+        read it with read(), readinto(), iter_chunks() or iter_lines().
 
         :param bucket_name:
         :param key:
@@ -817,7 +1065,7 @@ class BosClient(BceBaseClient):
             key,
             headers=BosClient._get_range_header_dict(range),
             config=config,
-            body_parser=BosClient._parse_bos_object)
+            body_parser=BosClient._parse_bos_object_stream)
 # restore object
     @required(bucket_name=(bytes, str), key=(bytes, str))
     def restore_object(self, bucket_name, key, days=None, tier="Standard", config=None):
@@ -865,7 +1113,31 @@ class BosClient(BceBaseClient):
         :return:
         """
         key = compat.convert_to_bytes(key)
-        response = self.get_object(bucket_name, key, range=range, config=config)
+        if range is None and self.object_cache is not None:
+            entry, response = self._get_object_through_cache(
+                bucket_name, key, config, BosClient._parse_bos_object_stream, hedge=True)
+            if entry is None:
+                s = response.data.read()
+                response.data.close()
+                self.object_cache.put(self.object_cache.get_cache_key(bucket_name, key),
+                                      response.metadata.__dict__, data=s)
+                return s
+            f = self.object_cache.open(entry)
+            if f is not None:
+                try:
+                    return f.read()
+                finally:
+                    f.close()
+            # the entry was evicted since it was looked up, get the object from BOS
+        # a small read, hedged if config.hedge_policy is set
+        response = self._send_request(
+            http_methods.GET,
+            bucket_name,
+            key,
+            headers=BosClient._get_range_header_dict(range),
+            config=config,
+            body_parser=BosClient._parse_bos_object_stream,
+            hedge=True)
         s = response.data.read()
         response.data.close()
         return s
@@ -891,17 +1163,265 @@ class BosClient(BceBaseClient):
         """
         key = compat.convert_to_bytes(key)
         file_name = compat.convert_to_bytes(file_name)
+        body_parser = lambda http_response, response: BosClient._save_body_to_file(
+            http_response,
+            response,
+            file_name,
+            self._get_config_parameter(config, 'recv_buf_size'))
+        if range is None and self.object_cache is not None:
+            entry, response = self._get_object_through_cache(bucket_name, key, config,
+                                                             body_parser)
+            if entry is None:
+                self.object_cache.put(self.object_cache.get_cache_key(bucket_name, key),
+                                      response.metadata.__dict__, file_name=file_name)
+                return response
+            src = self.object_cache.open(entry)
+            if src is not None:
+                try:
+                    with open(file_name, 'wb') as dst:
+                        shutil.copyfileobj(src, dst,
+                                           self._get_config_parameter(config, 'recv_buf_size'))
+                finally:
+                    src.close()
+                response = BceResponse()
+                response.metadata.__dict__.update(entry.metadata)
+                return response
+            # the entry was evicted since it was looked up, get the object from BOS
         return self._send_request(
             http_methods.GET,
             bucket_name,
             key,
             headers=BosClient._get_range_header_dict(range),
             config=config,
-            body_parser=lambda http_response, response: BosClient._save_body_to_file(
-                http_response,
-                response,
-                file_name,
-                self._get_config_parameter(config, 'recv_buf_size')))
+            body_parser=body_parser)
+
+    def _get_object_through_cache(self, bucket_name, key, config, body_parser, hedge=False):
+        """
+        Look up the object in self.object_cache, revalidate the entry if it is not fresh, and
+        fetch the object if it is not cached or has changed.
+
+        The revalidation is a GET with If-None-Match and If-Modified-Since, a 304 response
+        means the entry is current. A 404 response drops the entry.
+
+        :return: (entry, None) if the cached content is current, otherwise (None, response)
+            of the GET parsed by body_parser
+        :rtype: tuple
+        """
+        cache = self.object_cache
+        cache_key = cache.get_cache_key(bucket_name, key)
+        entry = cache.get(cache_key)
+        if entry is not None and cache.is_fresh(entry):
+            return entry, None
+        headers = None
+        if entry is not None and entry.etag is not None:
+            headers = {http_headers.IF_NONE_MATCH: compat.convert_to_bytes('"%s"' % entry.etag)}
+            if entry.last_modified is not None:
+                headers[http_headers.IF_MODIFIED_SINCE] = \
+                    compat.convert_to_bytes(entry.last_modified)
+        try:
+            response = self._send_request(
+                http_methods.GET,
+                bucket_name,
+                key,
+                headers=headers,
+                config=config,
+                body_parser=body_parser,
+                hedge=hedge)
+        except BceHttpClientError as e:
+            if isinstance(e.last_error, BceServerError):
+                if e.last_error.status_code == http.client.NOT_MODIFIED and entry is not None:
+                    cache.refresh(entry)
+                    return entry, None
+                if e.last_error.status_code == http.client.NOT_FOUND:
+                    cache.remove(cache_key)
+            raise
+        return None, response
+
+    @required(bucket_name=(bytes, str), key=(bytes, str), file_name=(bytes, str))
+    def download_file(self, bucket_name, key, file_name,
+                      part_size=None,
+                      max_workers=None,
+                      progress_callback=None,
+                      max_range_retries=3,
+                      verify_md5=True,
+                      checkpoint_file=None,
+                      config=None):
+        """
+        Download an object to file by fetching byte ranges concurrently. Every range is written
+        into the preallocated file at its offset, failed ranges are retried individually.
+
+        :type bucket_name: string
+        :param bucket_name: None
+
+        :type key: string
+        :param key: None
+
+        :type file_name: string
+        :param file_name: None
+
+        :type part_size: int
+        :param part_size: size of each range, bos.DEFAULT_PART_SIZE by default
+
+        :type max_workers: int
+        :param max_workers: number of ranges fetched concurrently
+
+        :type progress_callback: callable
+        :param progress_callback: called as progress_callback(downloaded_bytes, total_bytes)
+
+        :type max_range_retries: int
+        :param max_range_retries: times to retry a range which failed in the middle of the body,
+            at most, the retries are decided and delayed by the retry policy of the configuration
+
+        :type verify_md5: bool
+        :param verify_md5: check the MD5 of the file if the ETag of the object is its MD5, the
+            MD5 is computed while the ranges are written
+
+        :type checkpoint_file: string
+        :param checkpoint_file: if set, the ranges downloaded are recorded in this file and the
+            partial file is kept on failure, so that calling download_file again only fetches the
+            missing ranges. The download restarts from scratch if the object changed. The
+            checkpoint file is removed once the download is completed.
+
+        :return:
+            **HttpResponse** of get_object_meta_data
+        """
+        config = self._start_deadline(config)
+        key = compat.convert_to_bytes(key)
+        response = self.get_object_meta_data(bucket_name, key, config=config)
+        total_size = int(response.metadata.content_length)
+        etag = compat.convert_to_string(response.metadata.etag)
+        part_size = bos_transfer.get_part_size(total_size, part_size)
+        ranges = bos_transfer.split_ranges(total_size, part_size)
+
+        journal = None
+        downloaded_ranges = set()
+        if checkpoint_file is not None:
+            journal = bos_transfer.TransferJournal(checkpoint_file)
+            header = {'bucket': compat.convert_to_string(bucket_name),
+                      'key': compat.convert_to_string(key),
+                      'eTag': etag,
+                      'size': total_size,
+                      'partSize': part_size}
+            saved_header, records = journal.load()
+            if saved_header == header and os.path.isfile(file_name) \
+                    and os.path.getsize(file_name) == total_size:
+                downloaded_ranges = set((record['start'], record['end']) for record in records)
+            journal.start(header, [{'start': start, 'end': end}
+                                   for start, end in sorted(downloaded_ranges)])
+
+        writer = bos_transfer.PositionalWriter(file_name, total_size,
+                                               truncate=not downloaded_ranges)
+        progress = bos_transfer.ProgressTracker(
+            total_size, progress_callback,
+            sum(end - start + 1 for start, end in downloaded_ranges))
+        digest = None
+        if verify_md5 and bos_transfer.is_md5_etag(etag):
+            digest = bos_transfer.RangeDigest(
+                file_name, self._get_config_parameter(config, 'recv_buf_size'))
+        try:
+            if digest is not None:
+                for start, end in downloaded_ranges:
+                    digest.complete(start, end)
+            self._download_ranges(bucket_name, key, etag, writer,
+                                  [byte_range for byte_range in ranges
+                                   if byte_range not in downloaded_ranges],
+                                  progress, max_workers, max_range_retries, config, journal,
+                                  digest)
+        except Exception:
+            writer.close()
+            if digest is not None:
+                digest.close()
+            if journal is None:
+                os.remove(file_name)
+            else:
+                journal.close()
+            raise
+        writer.close()
+
+        if digest is not None:
+            md5 = digest.hexdigest()
+            if md5 != etag.lower():
+                os.remove(file_name)
+                if journal is not None:
+                    journal.remove()
+                raise BceClientError('MD5 of %s mismatched, local: %s, server: %s' % (
+                    compat.convert_to_string(file_name), md5, etag))
+        if journal is not None:
+            journal.remove()
+        return response
+
+    def _download_ranges(self, bucket_name, key, etag, writer, ranges, progress,
+                         max_workers, max_range_retries, config, journal=None, digest=None):
+        executor = futures.ThreadPoolExecutor(max_workers or bos.DEFAULT_TRANSFER_WORKERS)
+        tasks = []
+        try:
+            tasks = [executor.submit(self._download_range, bucket_name, key, etag, writer,
+                                     byte_range, progress, max_range_retries, config, digest)
+                     for byte_range in ranges]
+            for task in futures.as_completed(tasks):
+                start, end = task.result()
+                if journal is not None:
+                    journal.append({'start': start, 'end': end})
+                if digest is not None:
+                    digest.complete(start, end)
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+    def _download_range(self, bucket_name, key, etag, writer, byte_range, progress,
+                        max_range_retries, config, digest=None):
+        buf_size = self._get_config_parameter(config, 'recv_buf_size')
+        retry_policy = self._get_config_parameter(config, 'retry_policy')
+        deadline = self._get_config_parameter(config, 'deadline')
+        retries_attempted = 0
+        errors = []
+        while True:
+            written = 0
+            try:
+                response = self.get_object(bucket_name, key, range=byte_range, config=config)
+                try:
+                    if compat.convert_to_string(response.metadata.etag) != etag:
+                        raise BceClientError('Object %s changed during download.'
+                                             % compat.convert_to_string(key))
+                    offset = byte_range[0]
+                    while True:
+                        try:
+                            buf = response.data.read(buf_size)
+                        except http.client.HTTPException as e:
+                            # a broken body, like a connection reset, is retried as an IOError
+                            raise IOError('Failed to read range %d-%d: %r'
+                                          % (byte_range[0], byte_range[1], e))
+                        if not buf:
+                            break
+                        writer.write(offset + written, buf)
+                        if digest is not None:
+                            digest.update(offset + written, buf)
+                        written += len(buf)
+                        progress.add(len(buf))
+                finally:
+                    response.data.close()
+                if written != byte_range[1] - byte_range[0] + 1:
+                    raise IOError('Range %d-%d is incomplete, only %d bytes received.'
+                                  % (byte_range[0], byte_range[1], written))
+                return byte_range
+            except Exception as e:
+                progress.add(-written)
+                if retries_attempted >= max_range_retries or \
+                        not retry_policy.should_retry(e, retries_attempted):
+                    raise
+                errors.append('\n'.join('>>>>' + line
+                                         for line in traceback.format_exc().splitlines()))
+                delay_in_millis = retry_policy.get_delay_before_next_retry_in_millis(
+                    e, retries_attempted)
+                bce_http_client.check_deadline(deadline, retries_attempted, errors, e,
+                                               delay_in_millis)
+                _logger.debug('Retry range %d-%d of %s for %s', byte_range[0], byte_range[1],
+                              key, e)
+                time.sleep(delay_in_millis / 1000.0)
+                retries_attempted += 1
 
     @required(bucket_name=(bytes, str), key=(bytes, str))
     def get_object_meta_data(self, bucket_name, key, config=None):
@@ -917,7 +1437,8 @@ class BosClient(BceBaseClient):
             **_GetObjectMetaDataResponse Class**
         """
         key = compat.convert_to_bytes(key)
-        return self._send_request(http_methods.HEAD, bucket_name, key, config=config)
+        return self._send_request(http_methods.HEAD, bucket_name, key, config=config,
+                                  hedge=True)
 
     @required(bucket_name=(bytes, str),
               key=(bytes, str),
@@ -1000,8 +1521,7 @@ class BosClient(BceBaseClient):
         try:
             fp = io.BytesIO(data)
             if content_md5 is None:
-                content_md5 = utils.get_md5_from_fp(
-                    fp, buf_size=self._get_config_parameter(config, 'recv_buf_size'))
+                content_md5 = utils.get_content_digests(data)[0]
 
             return self.append_object(bucket_name=bucket_name,
                                       key=key,
@@ -1110,8 +1630,7 @@ class BosClient(BceBaseClient):
         try:
             fp = io.BytesIO(data)
             if content_md5 is None:
-                content_md5 = utils.get_md5_from_fp(
-                    fp, buf_size=self._get_config_parameter(config, 'recv_buf_size'))
+                content_md5 = utils.get_content_digests(data)[0]
             return self.put_object(bucket, key, fp,
                                    content_length=len(data),
                                    content_md5=content_md5,
@@ -1134,11 +1653,15 @@ class BosClient(BceBaseClient):
                              user_metadata=None,
                              storage_class=None,
                              user_headers=None,
+                             calculate_sha256=False,
                              config=None):
 
         """
         Put object and put content of file to the object
 
+        The Content-MD5, and the x-bce-content-sha256 if calculate_sha256 is true, are computed
+        on the file mapped in memory, see utils.get_content_digests_from_file.
+
         :type bucket: string
         :param bucket: None
 
@@ -1148,6 +1671,9 @@ class BosClient(BceBaseClient):
         :type file_name: string
         :param file_name: None
 
+        :type calculate_sha256: bool
+        :param calculate_sha256: compute content_sha256 if it is not given
+
         :type options: dict
         :param options: None
         :return:
@@ -1160,10 +1686,15 @@ class BosClient(BceBaseClient):
                 fp.seek(0, os.SEEK_END)
                 content_length = fp.tell()
                 fp.seek(0)
-            if content_md5 is None:
-                recv_buf_size = self._get_config_parameter(config, 'recv_buf_size')
-                content_md5 = utils.get_md5_from_fp(fp, length=content_length,
-                                                    buf_size=recv_buf_size)
+            calculate_sha256 = calculate_sha256 and content_sha256 is None
+            if content_md5 is None or calculate_sha256:
+                md5, sha256 = utils.get_content_digests_from_file(
+                    file_name, length=content_length, sha256=calculate_sha256,
+                    buf_size=self._get_config_parameter(config, 'recv_buf_size'))
+                if content_md5 is None:
+                    content_md5 = md5
+                if calculate_sha256:
+                    content_sha256 = sha256
             if content_type is None:
                 content_type = utils.guess_content_type_by_file_name(file_name)
             return self.put_object(bucket, key, fp,
@@ -1277,6 +1808,282 @@ class BosClient(BceBaseClient):
                                   params={b'delete': b''},
                                   config=config)
 
+    @required(bucket_name=(bytes, str))
+    def delete_keys(self, bucket_name, keys, max_workers=None, batch_size=None, config=None):
+        """
+        Delete any number of objects with concurrent delete_multiple_objects requests.
+
+        keys is consumed lazily in batches of batch_size, and only a few batches per worker are
+        in flight at any time, so keys can be a generator over millions of keys. The keys which
+        can not be deleted are reported in the result instead of stopping the run, including
+        every key of a batch whose request failed.
+
+        :type bucket_name: string
+        :param bucket_name: None
+
+        :type keys: iterable
+        :param keys: the keys to delete
+
+        :type max_workers: int
+        :param max_workers: number of requests sent concurrently
+
+        :type batch_size: int
+        :param batch_size: keys per request, at most bos.MAX_DELETE_OBJECTS
+
+        :return: deleted_count, the number of keys deleted, and errors, a list of objects with
+            key, code and message
+        :rtype: baidubce.utils.Expando
+        """
+        config = self._start_deadline(config)
+        batch_size = batch_size or bos.MAX_DELETE_OBJECTS
+        if batch_size <= 0 or batch_size > bos.MAX_DELETE_OBJECTS:
+            raise ValueError('batch_size should be in [1, %d].' % bos.MAX_DELETE_OBJECTS)
+        max_workers = max_workers or bos.DEFAULT_TRANSFER_WORKERS
+        result = utils.Expando({'deleted_count': 0, 'errors': []})
+
+        def _collect(tasks):
+            for task in tasks:
+                deleted_count, errors = task.result()
+                result.deleted_count += deleted_count
+                result.errors.extend(errors)
+
+        executor = futures.ThreadPoolExecutor(max_workers)
+        try:
+            end = object()
+            pending = set()
+            batch = []
+            for key in itertools.chain(keys, [end]):
+                if key is not end:
+                    batch.append(key)
+                    if len(batch) < batch_size:
+                        continue
+                if not batch:
+                    break
+                if len(pending) >= max_workers * 2:
+                    done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                    _collect(done)
+                pending.add(executor.submit(self._delete_batch, bucket_name, batch, config))
+                batch = []
+            _collect(futures.wait(pending)[0])
+        finally:
+            executor.shutdown(wait=True)
+        return result
+
+    def _delete_batch(self, bucket_name, key_list, config):
+        """
+        :return: (number of keys deleted, list of errors)
+        """
+        try:
+            response = self.delete_multiple_objects(bucket_name, key_list, config=config)
+        except BceHttpClientError as e:
+            _logger.debug('Failed to delete %d objects: %s', len(key_list), e.last_error)
+            code = getattr(e.last_error, 'code', None)
+            message = str(e.last_error)
+            return 0, [utils.Expando({'key': compat.convert_to_string(key),
+                                      'code': code,
+                                      'message': message})
+                       for key in key_list]
+        errors = response.errors or []
+        return len(key_list) - len(errors), errors
+
+    @required(bucket_name=(bytes, str), prefix=(bytes, str))
+    def delete_prefix(self, bucket_name, prefix, max_workers=None, config=None):
+        """
+        Delete all the objects whose key starts with prefix, the keys are listed and deleted
+        at the same time. See delete_keys for the result.
+
+        :type bucket_name: string
+        :param bucket_name: None
+
+        :type prefix: string
+        :param prefix: None
+
+        :type max_workers: int
+        :param max_workers: number of delete requests sent concurrently
+
+        :rtype: baidubce.utils.Expando
+        """
+        config = self._start_deadline(config)
+        return self.delete_keys(bucket_name,
+                                (item.key for item in self.list_all_objects(
+                                    bucket_name, prefix=prefix, config=config)),
+                                max_workers=max_workers, config=config)
+
+    @required(local_dir=(bytes, str), bucket_name=(bytes, str))
+    def sync_upload(self, local_dir, bucket_name, prefix=None,
+                    compare=bos_transfer.SYNC_COMPARE_MTIME, delete=False, dry_run=False,
+                    max_workers=None, config=None):
+        """
+        Make the objects under prefix the same as the files under local_dir, only the files
+        which differ are uploaded, concurrently.
+
+        :type local_dir: string
+        :param local_dir: None
+
+        :type bucket_name: string
+        :param bucket_name: None
+
+        :type prefix: string
+        :param prefix: the "directory" of the objects, a '/' is appended if missing
+
+        :type compare: string
+        :param compare: how files and objects of the same size are compared, see
+            bos_transfer.is_same_file. SYNC_COMPARE_ETAG reads every file of the same size as
+            its object.
+
+        :type delete: bool
+        :param delete: delete the objects under prefix which have no local file
+
+        :type dry_run: bool
+        :param dry_run: only compare, the summary lists what would be uploaded and deleted
+
+        :type max_workers: int
+        :param max_workers: number of files compared and uploaded concurrently
+
+        :return: utils.Expando with transferred (relative paths), transferred_bytes, skipped,
+            deleted (relative paths), errors (Expando with key and message) and dry_run
+        :rtype: baidubce.utils.Expando
+        """
+        config = self._start_deadline(config)
+        prefix = BosClient._get_sync_prefix(prefix)
+        local_files = bos_transfer.list_local_files(local_dir)
+        remote_objects = self._list_sync_objects(bucket_name, prefix, config)
+
+        def upload(name):
+            self.upload_file(bucket_name, prefix + name, local_files[name][0], config=config)
+
+        def delete_objects(names, summary):
+            result = self.delete_keys(bucket_name, (prefix + name for name in names),
+                                      max_workers=max_workers, config=config)
+            failed = set()
+            for error in result.errors:
+                name = compat.convert_to_string(error.key)[len(prefix):]
+                failed.add(name)
+                summary.errors.append(utils.Expando({
+                    'key': name, 'message': '%s: %s' % (error.code, error.message)}))
+            summary.deleted = [name for name in names if name not in failed]
+        return BosClient._run_sync(local_files, remote_objects, True, compare, delete, dry_run,
+                                   max_workers, upload, delete_objects)
+
+    @required(bucket_name=(bytes, str), local_dir=(bytes, str))
+    def sync_download(self, bucket_name, local_dir, prefix=None,
+                      compare=bos_transfer.SYNC_COMPARE_MTIME, delete=False, dry_run=False,
+                      max_workers=None, config=None):
+        """
+        Make the files under local_dir the same as the objects under prefix, only the objects
+        which differ are downloaded, concurrently. The mtime of a downloaded file is set to
+        the last modified time of its object.
+
+        See sync_upload for the parameters and the result, delete removes the local files which
+        have no object.
+        """
+        config = self._start_deadline(config)
+        prefix = BosClient._get_sync_prefix(prefix)
+        local_files = bos_transfer.list_local_files(local_dir)
+        remote_objects = self._list_sync_objects(bucket_name, prefix, config)
+        root = os.path.abspath(local_dir)
+
+        def download(name):
+            item = remote_objects[name]
+            file_name = os.path.abspath(os.path.join(root, *name.split('/')))
+            if not file_name.startswith(os.path.join(root, '')):
+                raise BceClientError('Key %s is outside of %s.' % (prefix + name, local_dir))
+            try:
+                os.makedirs(os.path.dirname(file_name))
+            except OSError:
+                if not os.path.isdir(os.path.dirname(file_name)):
+                    raise
+            if int(item.size) <= bos.DEFAULT_PART_SIZE:
+                self.get_object_to_file(bucket_name, prefix + name, file_name, config=config)
+            else:
+                self.download_file(bucket_name, prefix + name, file_name, config=config)
+            mtime = bos_transfer.parse_last_modified(item.last_modified)
+            os.utime(file_name, (mtime, mtime))
+
+        def delete_files(names, summary):
+            for name in names:
+                try:
+                    os.remove(local_files[name][0])
+                    summary.deleted.append(name)
+                except OSError as e:
+                    summary.errors.append(utils.Expando({'key': name, 'message': str(e)}))
+        return BosClient._run_sync(local_files, remote_objects, False, compare, delete, dry_run,
+                                   max_workers, download, delete_files)
+
+    @staticmethod
+    def _get_sync_prefix(prefix):
+        prefix = compat.convert_to_string(prefix or '')
+        if prefix and not prefix.endswith('/'):
+            prefix += '/'
+        return prefix
+
+    def _list_sync_objects(self, bucket_name, prefix, config):
+        """
+        :return: dict of the key relative to prefix to the object summary, without the
+            directory placeholders
+        """
+        remote_objects = {}
+        for item in self.list_all_objects(bucket_name, prefix=prefix or None, config=config):
+            key = compat.convert_to_string(item.key)
+            if not key.endswith('/'):
+                remote_objects[key[len(prefix):]] = item
+        return remote_objects
+
+    @staticmethod
+    def _run_sync(local_files, remote_objects, upload, compare, delete, dry_run, max_workers,
+                  transfer, remove):
+        """
+        Compare and transfer every source of the sync concurrently, then remove the extraneous
+        targets if delete is true.
+        """
+        if compare not in (bos_transfer.SYNC_COMPARE_SIZE, bos_transfer.SYNC_COMPARE_MTIME,
+                           bos_transfer.SYNC_COMPARE_ETAG):
+            raise ValueError('Invalid compare %s.' % compare)
+        if upload:
+            sources, targets = local_files, remote_objects
+        else:
+            sources, targets = remote_objects, local_files
+        summary = utils.Expando({'transferred': [], 'transferred_bytes': 0, 'skipped': 0,
+                                 'deleted': [], 'errors': [], 'dry_run': dry_run})
+
+        def sync_one(name):
+            local_file = local_files.get(name)
+            remote_object = remote_objects.get(name)
+            if local_file is not None and remote_object is not None \
+                    and bos_transfer.is_same_file(local_file, remote_object, compare, upload):
+                return False
+            if not dry_run:
+                transfer(name)
+            return True
+
+        executor = futures.ThreadPoolExecutor(max_workers or bos.DEFAULT_TRANSFER_WORKERS)
+        try:
+            tasks = dict((executor.submit(sync_one, name), name) for name in sources)
+            for task in futures.as_completed(tasks):
+                name = tasks[task]
+                try:
+                    transferred = task.result()
+                except Exception as e:
+                    _logger.debug('Failed to sync %s: %s', name, e)
+                    summary.errors.append(utils.Expando({'key': name, 'message': str(e)}))
+                    continue
+                if transferred:
+                    summary.transferred.append(name)
+                    summary.transferred_bytes += local_files[name][1] if upload \
+                        else int(remote_objects[name].size)
+                else:
+                    summary.skipped += 1
+        finally:
+            executor.shutdown(wait=True)
+        summary.transferred.sort()
+
+        extraneous = sorted(name for name in targets if name not in sources) if delete else []
+        if dry_run:
+            summary.deleted = extraneous
+        elif extraneous:
+            remove(extraneous, summary)
+        return summary
+
     @required(source_bucket=(bytes, str),
               target_bucket=(bytes, str),
               target_prefix=(bytes, str))
@@ -1565,7 +2372,8 @@ class BosClient(BceBaseClient):
             key,
             body=json.dumps({'parts': part_list}),
             headers=headers,
-            params={b'uploadId': upload_id})
+            params={b'uploadId': upload_id},
+            config=config)
 
     @required(bucket_name=(bytes, str), key=(bytes, str), upload_id=(bytes, str))
     def abort_multipart_upload(self, bucket_name, key, upload_id, config=None):
@@ -1585,7 +2393,392 @@ class BosClient(BceBaseClient):
         """
         key = compat.convert_to_bytes(key)
         return self._send_request(http_methods.DELETE, bucket_name, key,
-                                  params={b'uploadId': upload_id})
+                                  params={b'uploadId': upload_id},
+                                  config=config)
+
+    @required(bucket_name=(bytes, str), key=(bytes, str), file_name=(bytes, str))
+    def upload_file(self, bucket_name, key, file_name,
+                    part_size=None,
+                    max_workers=None,
+                    progress_callback=None,
+                    bandwidth_limit=None,
+                    content_type=None,
+                    user_metadata=None,
+                    storage_class=None,
+                    user_headers=None,
+                    checkpoint_file=None,
+                    config=None):
+        """
+        Upload a file of any size. Files larger than one part are uploaded with multipart upload,
+        the parts are uploaded concurrently and verified against the ETag returned by BOS.
+
+        :type bucket_name: string
+        :param bucket_name: None
+
+        :type key: string
+        :param key: None
+
+        :type file_name: string
+        :param file_name: None
+
+        :type part_size: int
+        :param part_size: preferred part size, bos.DEFAULT_PART_SIZE by default. It is enlarged
+            automatically if the file would need more than bos.MAX_PART_NUMBER parts.
+
+        :type max_workers: int
+        :param max_workers: number of parts uploaded concurrently
+
+        :type progress_callback: callable
+        :param progress_callback: called as progress_callback(uploaded_bytes, total_bytes)
+
+        :type bandwidth_limit: int
+        :param bandwidth_limit: maximum of bytes per second uploaded by all the workers
+
+        :type checkpoint_file: string
+        :param checkpoint_file: if set, the multipart upload is recorded in this file and is not
+            aborted on failure, so that calling upload_file again only uploads the missing parts.
+            The upload restarts from scratch if the size, mtime or sampled content of the file
+            changed. The checkpoint file is removed once the upload is completed.
+
+        :return:
+            **HttpResponse**
+        """
+        config = self._start_deadline(config)
+        key = compat.convert_to_bytes(key)
+        total_size = os.path.getsize(file_name)
+        part_size = bos_transfer.get_part_size(total_size, part_size)
+        if content_type is None:
+            content_type = utils.guess_content_type_by_file_name(file_name)
+
+        if total_size <= part_size:
+            if progress_callback is None and bandwidth_limit is None:
+                return self.put_object_from_file(bucket_name, key, file_name,
+                                                 content_length=total_size,
+                                                 content_type=content_type,
+                                                 user_metadata=user_metadata,
+                                                 storage_class=storage_class,
+                                                 user_headers=user_headers,
+                                                 config=config)
+            return self._put_object_from_file_with_progress(
+                bucket_name, key, file_name, total_size, progress_callback, bandwidth_limit,
+                content_type, user_metadata, storage_class, user_headers, config)
+
+        parts = bos_transfer.split_parts(total_size, part_size)
+        journal = None
+        upload_id = None
+        uploaded_parts = {}
+        if checkpoint_file is not None:
+            journal = bos_transfer.TransferJournal(checkpoint_file)
+            header = {'bucket': compat.convert_to_string(bucket_name),
+                      'key': compat.convert_to_string(key),
+                      'file': bos_transfer.get_file_signature(file_name),
+                      'partSize': part_size}
+            upload_id, uploaded_parts = self._load_upload_checkpoint(bucket_name, key, journal,
+                                                                     header, parts, config)
+        if upload_id is None:
+            upload_id = self.initiate_multipart_upload(bucket_name, key,
+                                                       content_type=content_type,
+                                                       storage_class=storage_class,
+                                                       user_headers=user_headers,
+                                                       config=config).upload_id
+            if journal is not None:
+                header['uploadId'] = upload_id
+                journal.start(header)
+
+        progress = bos_transfer.ProgressTracker(
+            total_size, progress_callback,
+            sum(size for part_number, _, size in parts if part_number in uploaded_parts))
+        try:
+            part_list = self._upload_parts(bucket_name, key, upload_id, file_name,
+                                           [part for part in parts
+                                            if part[0] not in uploaded_parts],
+                                           progress, max_workers, bandwidth_limit, config,
+                                           journal)
+            part_list.extend({'partNumber': part_number, 'eTag': etag}
+                             for part_number, etag in iteritems(uploaded_parts))
+            part_list.sort(key=lambda part: part['partNumber'])
+            response = self.complete_multipart_upload(bucket_name, key, upload_id, part_list,
+                                                      user_metadata=user_metadata,
+                                                      config=config)
+        except Exception:
+            if journal is None:
+                self.abort_multipart_upload(bucket_name, key, upload_id, config=config)
+            else:
+                journal.close()
+            raise
+        if journal is not None:
+            journal.remove()
+        return response
+
+    def _put_object_from_file_with_progress(self, bucket_name, key, file_name, total_size,
+                                            progress_callback, bandwidth_limit, content_type,
+                                            user_metadata, storage_class, user_headers, config):
+        """
+        Put a file small enough for one request, read through a PartReader like the parts of a
+        multipart upload, so that progress_callback and bandwidth_limit apply the same way.
+        """
+        progress = bos_transfer.ProgressTracker(total_size, progress_callback)
+        rate_limiter = None
+        if bandwidth_limit is not None:
+            rate_limiter = bos_transfer.RateLimiter(bandwidth_limit)
+        content_md5, _ = utils.get_content_digests_from_file(
+            file_name, length=total_size,
+            buf_size=self._get_config_parameter(config, 'recv_buf_size'))
+        f = open(file_name, 'rb')
+        try:
+            response = self.put_object(bucket_name, key,
+                                       bos_transfer.PartReader(f, total_size, progress,
+                                                               rate_limiter),
+                                       content_length=total_size,
+                                       content_md5=content_md5,
+                                       content_type=content_type,
+                                       user_metadata=user_metadata,
+                                       storage_class=storage_class,
+                                       user_headers=user_headers,
+                                       config=config)
+        finally:
+            f.close()
+        if total_size == 0 and progress_callback is not None:
+            progress_callback(0, 0)
+        return response
+
+    def _load_upload_checkpoint(self, bucket_name, key, journal, header, parts, config):
+        """
+        Find the parts which can be reused from an interrupted upload_file, the parts journaled
+        are reconciled with the parts listed by BOS.
+
+        :return: (upload_id, {part_number: etag}), upload_id is None if there is nothing to resume
+        """
+        saved_header, records = journal.load()
+        if saved_header is None:
+            return None, {}
+        upload_id = saved_header.pop('uploadId', None)
+        if upload_id is None:
+            return None, {}
+        if saved_header != header:
+            _logger.debug('Source of upload %s changed, restart the upload.', upload_id)
+            try:
+                self.abort_multipart_upload(bucket_name, key, upload_id, config=config)
+            except BceHttpClientError as e:
+                _logger.debug('Failed to abort upload %s: %s', upload_id, e)
+            return None, {}
+
+        journaled_parts = dict((record['partNumber'], record['eTag']) for record in records)
+        part_sizes = dict((part_number, size) for part_number, _, size in parts)
+        uploaded_parts = {}
+        try:
+            for part in self.list_all_parts(bucket_name, key, upload_id, config=config):
+                etag = compat.convert_to_string(part.etag).strip('"')
+                if part_sizes.get(part.part_number) == int(part.size) \
+                        and journaled_parts.get(part.part_number, etag) == etag:
+                    uploaded_parts[part.part_number] = etag
+        except BceHttpClientError as e:
+            if isinstance(e.last_error, BceServerError) and e.last_error.status_code == 404:
+                _logger.debug('Upload %s no longer exists, restart the upload.', upload_id)
+                return None, {}
+            raise
+
+        header['uploadId'] = upload_id
+        journal.start(header, [{'partNumber': part_number, 'eTag': etag}
+                               for part_number, etag in sorted(iteritems(uploaded_parts))])
+        return upload_id, uploaded_parts
+
+    def _upload_parts(self, bucket_name, key, upload_id, file_name, parts, progress,
+                      max_workers, bandwidth_limit, config, journal=None):
+        """
+        Upload the parts of file_name concurrently.
+
+        :param parts: list of (part_number, offset, size)
+        :param journal: if not None, every part uploaded is appended to it
+        :return: the part list for complete_multipart_upload, ordered by part number
+        """
+        rate_limiter = None
+        if bandwidth_limit is not None:
+            rate_limiter = bos_transfer.RateLimiter(bandwidth_limit)
+        executor = futures.ThreadPoolExecutor(max_workers or bos.DEFAULT_TRANSFER_WORKERS)
+        tasks = []
+        try:
+            tasks = [executor.submit(self._upload_part_with_md5, bucket_name, key, upload_id,
+                                     file_name, part_number, offset, size,
+                                     progress, rate_limiter, config)
+                     for part_number, offset, size in parts]
+            part_list = []
+            for task in futures.as_completed(tasks):
+                part_list.append(task.result())
+                if journal is not None:
+                    journal.append(part_list[-1])
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+        part_list.sort(key=lambda part: part['partNumber'])
+        return part_list
+
+    def _upload_part_with_md5(self, bucket_name, key, upload_id, file_name,
+                              part_number, offset, size, progress, rate_limiter, config):
+        f = open(file_name, 'rb')
+        try:
+            f.seek(offset)
+            reader = bos_transfer.PartReader(f, size, progress, rate_limiter)
+            response = self.upload_part(bucket_name, key, upload_id, part_number, size, reader,
+                                        config=config)
+        finally:
+            f.close()
+        etag = compat.convert_to_string(response.metadata.etag)
+        if etag.lower() != reader.hexdigest():
+            raise BceClientError('MD5 of part %d mismatched, local: %s, server: %s' % (
+                part_number, reader.hexdigest(), etag))
+        return {'partNumber': part_number, 'eTag': etag}
+
+    @required(source_bucket_name=(bytes, str),
+              source_key=(bytes, str),
+              target_bucket_name=(bytes, str),
+              target_key=(bytes, str))
+    def copy_large_object(self,
+                          source_bucket_name, source_key,
+                          target_bucket_name, target_key,
+                          part_size=None,
+                          max_workers=None,
+                          progress_callback=None,
+                          content_type=None,
+                          user_metadata=None,
+                          storage_class=None,
+                          user_headers=None,
+                          config=None):
+        """
+        Copy an object of any size. Objects larger than one part are copied with multipart
+        upload, the parts are copied concurrently by upload_part_copy on the server side.
+
+        Every copy request is pinned to the ETag of the source read at the start, so the copy
+        fails instead of mixing two versions if the source is overwritten meanwhile. The content
+        type and the user metadata of the source are carried over unless given.
+
+        :type source_bucket_name: string
+        :param source_bucket_name: None
+
+        :type source_key: string
+        :param source_key: None
+
+        :type target_bucket_name: string
+        :param target_bucket_name: None
+
+        :type target_key: string
+        :param target_key: None
+
+        :type part_size: int
+        :param part_size: preferred part size, bos.DEFAULT_COPY_PART_SIZE by default. It is
+            enlarged automatically if the object would need more than bos.MAX_PART_NUMBER parts.
+
+        :type max_workers: int
+        :param max_workers: number of parts copied concurrently
+
+        :type progress_callback: callable
+        :param progress_callback: called as progress_callback(copied_bytes, total_bytes)
+
+        :type storage_class: string
+        :param storage_class: the storage class of the target, e.g. to migrate the object
+
+        :return:
+            **HttpResponse**
+        """
+        config = self._start_deadline(config)
+        source_key = compat.convert_to_bytes(source_key)
+        target_key = compat.convert_to_bytes(target_key)
+        source = self._get_object_meta_data_for_copy(source_bucket_name, source_key, config)
+        total_size = int(source.metadata.content_length)
+        etag = source.metadata.etag
+        part_size = bos_transfer.get_part_size(total_size,
+                                               part_size or bos.DEFAULT_COPY_PART_SIZE)
+
+        if total_size <= part_size:
+            # the metadata directive of copy_object keeps the source metadata by itself
+            response = self.copy_object(source_bucket_name, source_key,
+                                        target_bucket_name, target_key,
+                                        etag=etag,
+                                        content_type=content_type,
+                                        user_metadata=user_metadata,
+                                        storage_class=storage_class,
+                                        user_headers=user_headers,
+                                        config=config)
+            if progress_callback is not None:
+                progress_callback(total_size, total_size)
+            return response
+
+        if content_type is None:
+            content_type = source.metadata.content_type
+        if user_metadata is None:
+            user_metadata = source.user_metadata
+        upload_id = self.initiate_multipart_upload(target_bucket_name, target_key,
+                                                   content_type=content_type,
+                                                   storage_class=storage_class,
+                                                   user_headers=user_headers,
+                                                   config=config).upload_id
+        progress = bos_transfer.ProgressTracker(total_size, progress_callback)
+        try:
+            part_list = self._copy_parts(source_bucket_name, source_key,
+                                         target_bucket_name, target_key, upload_id, etag,
+                                         bos_transfer.split_parts(total_size, part_size),
+                                         progress, max_workers, config)
+            return self.complete_multipart_upload(target_bucket_name, target_key, upload_id,
+                                                  part_list, user_metadata=user_metadata,
+                                                  config=config)
+        except Exception:
+            self.abort_multipart_upload(target_bucket_name, target_key, upload_id,
+                                        config=config)
+            raise
+
+    def _get_object_meta_data_for_copy(self, bucket_name, key, config):
+        """
+        get_object_meta_data, with the user metadata names kept as they are in the headers as
+        response.user_metadata.
+        """
+        prefix = compat.convert_to_string(http_headers.BCE_USER_METADATA_PREFIX)
+
+        def parse_user_metadata(http_response, response):
+            response.user_metadata = dict(
+                (k[len(prefix):], v)
+                for k, v in bce_http_client.get_response_headers(http_response)
+                if k.startswith(prefix))
+            http_response.close()
+            return True
+        return self._send_request(http_methods.HEAD, bucket_name, key, config=config,
+                                  body_parser=parse_user_metadata)
+
+    def _copy_parts(self, source_bucket_name, source_key, target_bucket_name, target_key,
+                    upload_id, etag, parts, progress, max_workers, config):
+        """
+        Copy the parts of the source concurrently.
+
+        :param parts: list of (part_number, offset, size)
+        :return: the part list for complete_multipart_upload, ordered by part number
+        """
+        executor = futures.ThreadPoolExecutor(max_workers or bos.DEFAULT_TRANSFER_WORKERS)
+        tasks = []
+        try:
+            tasks = [executor.submit(self._copy_part, source_bucket_name, source_key,
+                                     target_bucket_name, target_key, upload_id,
+                                     part_number, offset, size, etag, progress, config)
+                     for part_number, offset, size in parts]
+            part_list = [task.result() for task in futures.as_completed(tasks)]
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+        part_list.sort(key=lambda part: part['partNumber'])
+        return part_list
+
+    def _copy_part(self, source_bucket_name, source_key, target_bucket_name, target_key,
+                   upload_id, part_number, offset, size, etag, progress, config):
+        response = self.upload_part_copy(source_bucket_name, source_key,
+                                         target_bucket_name, target_key,
+                                         upload_id, part_number, size, offset,
+                                         etag=etag, config=config)
+        progress.add(size)
+        return {'partNumber': part_number, 'eTag': response.etag}
 
     @required(bucket_name=(bytes, str), key=(bytes, str), upload_id=(bytes, str))
     def list_parts(self, bucket_name, key, upload_id,
@@ -1618,28 +2811,36 @@ class BosClient(BceBaseClient):
         if part_number_marker is not None:
             params[b'partNumberMarker'] = part_number_marker
 
-        return self._send_request(http_methods.GET, bucket_name, key, params=params, config=config)
+        return self._send_request(http_methods.GET, bucket_name, key, params=params,
+                                  config=config, body_parser=bos_handler.parse_list_parts)
 
     @required(bucket_name=(bytes, str), key=(bytes, str), upload_id=(bytes, str))
-    def list_all_parts(self, bucket_name, key, upload_id, config=None):
+    def list_all_parts(self, bucket_name, key, upload_id, config=None, page_size=None,
+                       max_items=None, read_ahead=False):
         """
 
         :param bucket_name:
         :param key:
         :param upload_id:
         :param config:
+        :param page_size: number of parts requested per list_parts call
+        :param max_items: stop after max_items parts
+        :param read_ahead: request the next page while the parts of the current one are consumed
         :return:
         """
+        config = self._start_deadline(config)
         key = compat.convert_to_bytes(key)
-        part_number_marker = None
-        while True:
-            response = self.list_parts(bucket_name, key, upload_id,
-                                      part_number_marker=part_number_marker, config=config)
-            for item in response.parts:
-                yield item
-            if not response.is_truncated:
-                break
-            part_number_marker = response.next_part_number_marker
+
+        def list_page(part_number_marker, max_parts):
+            return self.list_parts(bucket_name, key, upload_id, max_parts=max_parts,
+                                   part_number_marker=part_number_marker, config=config)
+
+        def next_marker(response):
+            if response.is_truncated:
+                return response.next_part_number_marker
+            return None
+        return utils.paginate(list_page, 'parts', page_size=page_size, max_items=max_items,
+                              read_ahead=read_ahead, next_marker=next_marker)
 
     @required(bucket_name=(bytes, str))
     def list_multipart_uploads(self, bucket_name, max_uploads=None, key_marker=None,
@@ -1679,35 +2880,42 @@ class BosClient(BceBaseClient):
         if prefix is not None:
             params[b'prefix'] = prefix
 
-        return self._send_request(http_methods.GET, bucket_name, params=params, config=config)
+        return self._send_request(http_methods.GET, bucket_name, params=params, config=config,
+                                  body_parser=bos_handler.parse_list_multipart_uploads)
 
     @required(bucket_name=(bytes, str))
-    def list_all_multipart_uploads(self, bucket_name, prefix=None, delimiter=None, config=None):
+    def list_all_multipart_uploads(self, bucket_name, prefix=None, delimiter=None, config=None,
+                                   page_size=None, max_items=None, read_ahead=False):
         """
 
         :param bucket_name:
         :param prefix:
         :param delimiter:
         :param config:
+        :param page_size: number of uploads requested per list_multipart_uploads call
+        :param max_items: stop after max_items uploads
+        :param read_ahead: request the next page while the uploads of the current one are consumed
         :return:
         """
-        key_marker = None
-        while True:
-            response = self.list_multipart_uploads(bucket_name,
-                                                   key_marker=key_marker,
-                                                   prefix=prefix,
-                                                   delimiter=delimiter,
-                                                   config=config)
-            for item in response.uploads:
-                yield item
+        config = self._start_deadline(config)
+        def list_page(key_marker, max_uploads):
+            return self.list_multipart_uploads(bucket_name,
+                                               max_uploads=max_uploads,
+                                               key_marker=key_marker,
+                                               prefix=prefix,
+                                               delimiter=delimiter,
+                                               config=config)
+
+        def next_marker(response):
             if not response.is_truncated:
-                break
+                return None
             if response.next_key_marker is not None:
-                key_marker = response.next_key_marker
+                return response.next_key_marker
             elif len(response.uploads) != 0:
-                key_marker = response.uploads[-1].key
-            else:
-                break
+                return response.uploads[-1].key
+            return None
+        return utils.paginate(list_page, 'uploads', page_size=page_size, max_items=max_items,
+                              read_ahead=read_ahead, next_marker=next_marker)
 
     @required(bucket_name=(bytes, str), key=(bytes, str), acl=(list, dict))
     def set_object_acl(self, bucket_name, key, acl, config=None):
@@ -1963,6 +3171,31 @@ class BosClient(BceBaseClient):
     def _get_path(config, bucket_name=None, key=None):
         return utils.append_uri(bos.URL_PREFIX, bucket_name, key)
 
+    @staticmethod
+    def _get_path_template(bucket_name=None, key=None):
+        if key:
+            return bos.URL_PREFIX + b'{bucket}/{key}'
+        if bucket_name:
+            return bos.URL_PREFIX + b'{bucket}'
+        return bos.URL_PREFIX
+
+    def _start_deadline(self, config):
+        """
+        Fix the deadline of a call sending several requests, so that deadline_in_mills bounds
+        the whole call instead of each request.
+
+        :return: config, or a copy of it with deadline set
+        :rtype: baidubce.bce_client_configuration.BceClientConfiguration
+        """
+        if config is not None and config.deadline is not None:
+            return config
+        deadline_in_mills = self._get_config_parameter(config, 'deadline_in_mills')
+        if deadline_in_mills is None:
+            return config
+        config = copy.copy(config if config is not None else self.config)
+        config.deadline = time.time() + deadline_in_mills / 1000.0
+        return config
+
     def _merge_config(self, config):
         if config is None:
             return self.config
@@ -1975,7 +3208,8 @@ class BosClient(BceBaseClient):
             self, http_method, bucket_name=None, key=None,
             body=None, headers=None, params=None,
             config=None,
-            body_parser=None):
+            body_parser=None,
+            hedge=False):
         config = self._merge_config(config)
         path = BosClient._get_path(config, bucket_name, key)
         if body_parser is None:
@@ -1987,4 +3221,5 @@ class BosClient(BceBaseClient):
 
         return bce_http_client.send_request(
             config, bce_v1_signer.sign, [handler.parse_error, body_parser],
-            http_method, path, body, headers, params)
+            http_method, path, body, headers, params, hedge=hedge, service_id=self.service_id,
+            path_template=BosClient._get_path_template(bucket_name, key))
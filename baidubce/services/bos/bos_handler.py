@@ -18,6 +18,7 @@ import json
 from baidubce import utils
 from baidubce.exception import BceServerError
 from baidubce.http import handler
+from baidubce.services.bos import bos_model
 from builtins import str
 from builtins import bytes
 
@@ -45,3 +46,44 @@ def parse_copy_object_response(http_response, response):
         return True
     else:
         return handler.parse_json(http_response, response)
+
+
+def _parse_listing(http_response, response, items_name, record_class):
+    body = http_response.read()
+    if body:
+        d = handler.loads_json(body)
+        attrs = {}
+        for k, v in d.items():
+            if k == items_name and isinstance(v, list):
+                v = [record_class.from_json(item) for item in v]
+            else:
+                v = utils.to_python_object(v)
+            attrs[k] = v
+        response.__dict__.update(utils.dict_to_python_object(attrs).__dict__)
+    http_response.close()
+    return True
+
+
+@handler.json_parser
+def parse_list_objects(http_response, response):
+    """
+    response parser for list objects, the contents are decoded as bos_model.ObjectSummary
+    """
+    return _parse_listing(http_response, response, 'contents', bos_model.ObjectSummary)
+
+
+@handler.json_parser
+def parse_list_parts(http_response, response):
+    """
+    response parser for list parts, the parts are decoded as bos_model.PartSummary
+    """
+    return _parse_listing(http_response, response, 'parts', bos_model.PartSummary)
+
+
+@handler.json_parser
+def parse_list_multipart_uploads(http_response, response):
+    """
+    response parser for list multipart uploads, the uploads are decoded as
+    bos_model.UploadSummary
+    """
+    return _parse_listing(http_response, response, 'uploads', bos_model.UploadSummary)
@@ -0,0 +1,90 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides the record types of the BOS listing results.
+"""
+from future.utils import iteritems
+
+from baidubce import compat
+from baidubce import utils
+
+
+class Record(utils.Expando):
+    """
+    A listing entry decoded straight from its JSON object.
+
+    It is an utils.Expando with the attribute names utils.dict_to_python_object gives, so it
+    stays assignable and a missing attribute reads as None. Subclasses declare the mapping of
+    the known JSON names to attribute names in _fields, which saves pythonize_name on them.
+    """
+    _fields = {}
+    _nested = {}
+
+    @classmethod
+    def from_json(cls, d):
+        """
+        Build a record from a JSON object decoded without object_hook. A field unknown to the
+        record class is set under its pythonized name, so that no field sent by the server is
+        lost.
+
+        :type d: dict
+        :return: the record
+        """
+        record = cls.__new__(cls)
+        attrs = record.__dict__
+        fields = cls._fields
+        for k, v in iteritems(d):
+            name = fields.get(k)
+            if name is None:
+                name = utils.pythonize_name(compat.convert_to_string(k))
+            nested = cls._nested.get(k)
+            if nested is not None and isinstance(v, dict):
+                v = nested.from_json(v)
+            elif isinstance(v, (dict, list)):
+                v = utils.to_python_object(v)
+            attrs[name] = v
+        return record
+
+
+class Owner(Record):
+    """
+    The owner of a bucket, an object or an upload.
+    """
+    _fields = {'id': 'id', 'displayName': 'display_name'}
+
+
+class ObjectSummary(Record):
+    """
+    An object in the contents of list_objects.
+    """
+    _fields = {'key': 'key', 'lastModified': 'last_modified', 'eTag': 'etag', 'size': 'size',
+               'storageClass': 'storage_class', 'owner': 'owner'}
+    _nested = {'owner': Owner}
+
+
+class PartSummary(Record):
+    """
+    A part in the parts of list_parts.
+    """
+    _fields = {'partNumber': 'part_number', 'lastModified': 'last_modified', 'eTag': 'etag',
+               'size': 'size'}
+
+
+class UploadSummary(Record):
+    """
+    An upload in the uploads of list_multipart_uploads.
+    """
+    _fields = {'key': 'key', 'uploadId': 'upload_id', 'owner': 'owner',
+               'initiated': 'initiated', 'storageClass': 'storage_class'}
+    _nested = {'owner': Owner}
+
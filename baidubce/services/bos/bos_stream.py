@@ -0,0 +1,184 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides the stream returned as the data of BosClient.get_object.
+"""
+import hashlib
+import zlib
+
+from baidubce.exception import BceClientError
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class ObjectStream(object):
+    """
+    A bounded-memory reader of an object body.
+
+    The content is verified on the fly against the MD5 ETag and the x-bce-content-crc32 header
+    when the whole object is read, a BceClientError is raised by the read which reaches the end
+    of a corrupted body, and an IOError if the body is shorter than its Content-Length. The
+    underlying http response is closed once the body is exhausted.
+    Other attributes are delegated to the http response, so the stream can be used wherever
+    the raw response was.
+
+    :param http_response: the http response of get_object
+    :type http_response: http.client.HTTPResponse
+    :param content_length: the length of the body, None if unknown
+    :type content_length: int
+    :param etag: the ETag of the object if the body is the whole object, otherwise None
+    :type etag: str
+    :param crc32: the CRC32 of the object if the body is the whole object, otherwise None
+    :type crc32: int
+    """
+    def __init__(self, http_response, content_length=None, etag=None, crc32=None):
+        self._response = http_response
+        self._content_length = content_length
+        self._bytes_read = 0
+        self._closed = False
+        self._etag = None
+        self._md5 = None
+        if etag is not None and len(etag) == 32 and '-' not in etag:
+            self._etag = etag.lower()
+            self._md5 = hashlib.md5()
+        self._expected_crc32 = crc32
+        self._crc32 = 0
+
+    def __getattr__(self, item):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return getattr(self._response, item)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return self.iter_lines(keepends=True)
+
+    @property
+    def closed(self):
+        """
+        :return: true if the stream is exhausted or closed
+        :rtype: bool
+        """
+        return self._closed
+
+    @property
+    def bytes_read(self):
+        """
+        :return: number of bytes of the body read so far
+        :rtype: int
+        """
+        return self._bytes_read
+
+    def _update(self, data, size):
+        # an empty result is the end of the body, unless nothing was asked for
+        if data:
+            self._bytes_read += len(data)
+            if self._md5 is not None:
+                self._md5.update(data)
+            if self._expected_crc32 is not None:
+                self._crc32 = zlib.crc32(data, self._crc32)
+        if (not data and size != 0) or self._bytes_read == self._content_length:
+            self._finish()
+
+    def _finish(self):
+        if self._closed:
+            return
+        self.close()
+        if self._content_length is not None and self._bytes_read != self._content_length:
+            raise IOError('Object body is incomplete, %d of %d bytes received.'
+                          % (self._bytes_read, self._content_length))
+        if self._md5 is not None and self._md5.hexdigest() != self._etag:
+            raise BceClientError('MD5 of object mismatched, local: %s, server: %s'
+                                 % (self._md5.hexdigest(), self._etag))
+        if self._expected_crc32 is not None \
+                and self._crc32 & 0xffffffff != self._expected_crc32:
+            raise BceClientError('CRC32 of object mismatched, local: %d, server: %d'
+                                 % (self._crc32 & 0xffffffff, self._expected_crc32))
+
+    def read(self, amt=None):
+        """
+        Read at most amt bytes, or all the remaining bytes if amt is None.
+
+        :rtype: bytes
+        """
+        if self._closed:
+            return b''
+        if amt is None or amt < 0:
+            data = self._response.read()
+        else:
+            data = self._response.read(amt)
+        self._update(data, amt)
+        if amt is None or amt < 0:
+            self._finish()
+        return data
+
+    def readinto(self, buf):
+        """
+        Read into a preallocated writable buffer such as a bytearray or memoryview, without
+        creating intermediate bytes objects where the http response supports it.
+
+        :return: number of bytes read, 0 at the end of the body
+        :rtype: int
+        """
+        if self._closed:
+            return 0
+        view = memoryview(buf)
+        if hasattr(self._response, 'readinto'):
+            n = self._response.readinto(view)
+            self._update(view[:n], len(view))
+        else:
+            data = self._response.read(len(view))
+            n = len(data)
+            view[:n] = data
+            self._update(data, len(view))
+        return n
+
+    def iter_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Iterate over the body in chunks of at most chunk_size bytes.
+        """
+        while True:
+            data = self.read(chunk_size)
+            if not data:
+                break
+            yield data
+
+    def iter_lines(self, chunk_size=DEFAULT_CHUNK_SIZE, keepends=False):
+        """
+        Iterate over the lines of the body separated by b'\\n'. Only one chunk and the pending
+        partial line are held in memory.
+
+        :param keepends: keep the b'\\n' at the end of lines
+        :type keepends: bool
+        """
+        pending = b''
+        for chunk in self.iter_chunks(chunk_size):
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line + b'\n' if keepends else line
+        if pending:
+            yield pending
+
+    def close(self):
+        """
+        Close the underlying http response.
+        """
+        if not self._closed:
+            self._closed = True
+            self._response.close()
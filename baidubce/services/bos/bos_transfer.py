@@ -0,0 +1,494 @@
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides helpers for the high level transfer functions of BosClient.
+"""
+import calendar
+import hashlib
+import json
+import os
+import threading
+import time
+
+from baidubce.services import bos
+
+MB = 1024 * 1024
+
+
+def get_part_size(total_size, part_size=None):
+    """
+    Pick the part size of a multipart transfer.
+
+    The part size is at least part_size (bos.DEFAULT_PART_SIZE if None), and large enough to keep
+    the number of parts within bos.MAX_PART_NUMBER. It is rounded up to a multiple of 1MB.
+
+    :param total_size: the size of the object
+    :type total_size: int
+    :param part_size: the preferred part size
+    :type part_size: int
+    :return: the part size
+    :rtype: int
+    """
+    if part_size is None:
+        part_size = bos.DEFAULT_PART_SIZE
+    if part_size <= 0:
+        raise ValueError('part_size should be positive.')
+    min_part_size = (total_size + bos.MAX_PART_NUMBER - 1) // bos.MAX_PART_NUMBER
+    if part_size < min_part_size:
+        part_size = (min_part_size + MB - 1) // MB * MB
+    if part_size > bos.MAX_PUT_OBJECT_LENGTH:
+        raise ValueError('Object length should be less than %d.'
+                         % (bos.MAX_PUT_OBJECT_LENGTH * bos.MAX_PART_NUMBER))
+    return part_size
+
+
+def split_parts(total_size, part_size):
+    """
+    Split [0, total_size) into parts.
+
+    :return: list of (part_number, offset, size)
+    :rtype: list
+    """
+    parts = []
+    offset = 0
+    part_number = bos.MIN_PART_NUMBER
+    while offset < total_size:
+        size = min(part_size, total_size - offset)
+        parts.append((part_number, offset, size))
+        part_number += 1
+        offset += size
+    return parts
+
+
+class RateLimiter(object):
+    """
+    A thread-safe token bucket limiting the bytes per second shared by several workers.
+    """
+    def __init__(self, bytes_per_second):
+        if bytes_per_second <= 0:
+            raise ValueError('bytes_per_second should be positive.')
+        self._rate = float(bytes_per_second)
+        self._lock = threading.Lock()
+        self._next_time = time.time()
+
+    def consume(self, size):
+        """
+        Block until size bytes may be transferred.
+
+        :param size: number of bytes to transfer
+        :type size: int
+        """
+        with self._lock:
+            now = time.time()
+            if self._next_time < now:
+                self._next_time = now
+            wait = self._next_time - now
+            self._next_time += size / self._rate
+        if wait > 0:
+            time.sleep(wait)
+
+
+class ProgressTracker(object):
+    """
+    A thread-safe counter of transferred bytes which reports to a callback.
+
+    The callback is called as callback(transferred_bytes, total_bytes).
+    """
+    def __init__(self, total_size, callback=None, transferred=0):
+        self.total_size = total_size
+        self.transferred = transferred
+        self._callback = callback
+        self._lock = threading.Lock()
+
+    def add(self, size):
+        """
+        :param size: number of bytes transferred since last call, may be negative on retry
+        :type size: int
+        """
+        with self._lock:
+            self.transferred += size
+            transferred = self.transferred
+        if self._callback is not None and size != 0:
+            self._callback(transferred, self.total_size)
+
+
+class PartReader(object):
+    """
+    A file-like object reading size bytes from fp, which computes the MD5 of the data read and
+    reports the progress on the fly.
+
+    It supports tell() and seek() back to the start, so that the http client can resend it.
+    """
+    def __init__(self, fp, size, progress=None, rate_limiter=None):
+        self._fp = fp
+        self._start = fp.tell()
+        self._size = size
+        self._read = 0
+        self._progress = progress
+        self._rate_limiter = rate_limiter
+        self._md5 = hashlib.md5()
+
+    def read(self, size=-1):
+        """
+        :rtype: bytes
+        """
+        remaining = self._size - self._read
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if size == 0:
+            return b''
+        if self._rate_limiter is not None:
+            self._rate_limiter.consume(size)
+        data = self._fp.read(size)
+        self._read += len(data)
+        self._md5.update(data)
+        if self._progress is not None:
+            self._progress.add(len(data))
+        return data
+
+    def readinto(self, buf):
+        """
+        Read into a preallocated writable buffer, so that the sender can reuse one buffer.
+
+        :return: number of bytes read, 0 at the end of the part
+        :rtype: int
+        """
+        view = memoryview(buf)
+        remaining = self._size - self._read
+        if len(view) > remaining:
+            view = view[:remaining]
+        if len(view) == 0:
+            return 0
+        if self._rate_limiter is not None:
+            self._rate_limiter.consume(len(view))
+        n = self._fp.readinto(view)
+        if n:
+            self._read += n
+            self._md5.update(view[:n])
+            if self._progress is not None:
+                self._progress.add(n)
+        return n
+
+    def tell(self):
+        """
+        :rtype: int
+        """
+        return self._start + self._read
+
+    def seek(self, offset):
+        """
+        Only seeking back to the start of the part is supported.
+        """
+        if offset != self._start:
+            raise ValueError('PartReader can only seek to the start of the part.')
+        self._fp.seek(offset)
+        if self._progress is not None:
+            self._progress.add(-self._read)
+        self._read = 0
+        self._md5 = hashlib.md5()
+
+    def hexdigest(self):
+        """
+        :return: hex MD5 of the data read
+        :rtype: str
+        """
+        return self._md5.hexdigest()
+
+
+def split_ranges(total_size, range_size):
+    """
+    Split [0, total_size) into inclusive byte ranges.
+
+    :return: list of (start, end)
+    :rtype: list
+    """
+    return [(offset, offset + size - 1) for _, offset, size in split_parts(total_size, range_size)]
+
+
+class PositionalWriter(object):
+    """
+    A thread-safe writer to a preallocated file at given offsets.
+
+    os.pwrite is used when available, otherwise seek and write are serialized by a lock.
+    """
+    def __init__(self, file_name, size, truncate=True):
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        self._fd = os.open(file_name, flags, 0o644)
+        self._lock = threading.Lock()
+        if truncate:
+            os.ftruncate(self._fd, size)
+
+    def write(self, offset, data):
+        """
+        Write all data at offset.
+        """
+        view = memoryview(data)
+        while len(view) > 0:
+            if hasattr(os, 'pwrite'):
+                written = os.pwrite(self._fd, view, offset)
+            else:
+                with self._lock:
+                    os.lseek(self._fd, offset, os.SEEK_SET)
+                    written = os.write(self._fd, view)
+            view = view[written:]
+            offset += written
+
+    def close(self):
+        """
+        Close the file.
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class RangeDigest(object):
+    """
+    A thread-safe MD5 of a file written by ranges in any order.
+
+    The bytes written at the digested position are hashed as they are written. A range completed
+    ahead of the position is read back from the file once the position reaches it, usually
+    while it is still in the page cache, instead of reading the whole file after the download.
+    """
+    def __init__(self, file_name, buf_size=1024 * 1024):
+        self._file_name = file_name
+        self._buf_size = buf_size
+        self._md5 = hashlib.md5()
+        self._position = 0
+        self._completed = {}
+        self._fp = None
+        self._lock = threading.Lock()
+
+    def update(self, offset, data):
+        """
+        Hash the part of data written at offset which starts at the digested position.
+        """
+        with self._lock:
+            if offset <= self._position < offset + len(data):
+                self._md5.update(memoryview(data)[self._position - offset:])
+                self._position = offset + len(data)
+
+    def complete(self, start, end):
+        """
+        Mark the bytes from start to end, inclusive, as written to the file.
+        """
+        with self._lock:
+            self._completed[start] = end
+            while True:
+                reached = [key for key in self._completed if key <= self._position]
+                if not reached:
+                    break
+                self._read_to(max(self._completed.pop(key) for key in reached) + 1)
+
+    def hexdigest(self):
+        """
+        :return: hex MD5 of the file, the bytes not hashed yet are read from the file
+        :rtype: str
+        """
+        with self._lock:
+            self._read_to(None)
+        self.close()
+        return self._md5.hexdigest()
+
+    def close(self):
+        """
+        Close the file read back.
+        """
+        with self._lock:
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+
+    def _read_to(self, end):
+        if end is not None and end <= self._position:
+            return
+        if self._fp is None:
+            self._fp = open(self._file_name, 'rb')
+        self._fp.seek(self._position)
+        while end is None or self._position < end:
+            size = self._buf_size if end is None else min(self._buf_size, end - self._position)
+            buf = self._fp.read(size)
+            if not buf:
+                break
+            self._md5.update(buf)
+            self._position += len(buf)
+
+
+def get_md5_hex_from_file(file_name, buf_size=1024 * 1024):
+    """
+    :return: hex MD5 of the file
+    :rtype: str
+    """
+    md5 = hashlib.md5()
+    with open(file_name, 'rb') as f:
+        while True:
+            buf = f.read(buf_size)
+            if not buf:
+                break
+            md5.update(buf)
+    return md5.hexdigest()
+
+
+def is_md5_etag(etag):
+    """
+    :return: true if the ETag is the MD5 of the content, which is not the case for objects
+        created by multipart upload
+    :rtype: bool
+    """
+    return etag is not None and len(etag) == 32 and '-' not in etag
+
+
+def get_file_signature(file_name, sample_size=64 * 1024, sample_count=4):
+    """
+    Identify the content of a file cheaply by its size, mtime and the MD5 of a few evenly
+    spaced samples.
+
+    :return: dict with keys size, mtime and sampleMd5
+    :rtype: dict
+    """
+    size = os.path.getsize(file_name)
+    md5 = hashlib.md5()
+    with open(file_name, 'rb') as f:
+        if size <= sample_size * sample_count:
+            md5.update(f.read())
+        else:
+            step = (size - sample_size) // (sample_count - 1)
+            for i in range(sample_count):
+                f.seek(i * step)
+                md5.update(f.read(sample_size))
+    return {'size': size, 'mtime': os.path.getmtime(file_name), 'sampleMd5': md5.hexdigest()}
+
+
+class TransferJournal(object):
+    """
+    An append-only checkpoint file of a resumable transfer.
+
+    The first line is a JSON header describing the transfer, each following line is a JSON
+    record of a completed piece. A record torn by a crash is ignored when the journal is loaded.
+    """
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self._lock = threading.Lock()
+        self._fp = None
+
+    def load(self):
+        """
+        :return: (header, records), header is None if there is no valid journal
+        :rtype: tuple
+        """
+        try:
+            with open(self.file_name, 'r') as f:
+                lines = f.read().splitlines()
+        except (IOError, OSError):
+            return None, []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+        if not records:
+            return None, []
+        return records[0], records[1:]
+
+    def start(self, header, records=None):
+        """
+        Rewrite the journal with the header and records, and keep it open for append().
+        """
+        self.close()
+        self._fp = open(self.file_name, 'w')
+        for record in [header] + list(records or []):
+            self._fp.write(json.dumps(record) + '\n')
+        self._fp.flush()
+
+    def append(self, record):
+        """
+        Record a completed piece.
+        """
+        line = json.dumps(record) + '\n'
+        with self._lock:
+            self._fp.write(line)
+            self._fp.flush()
+
+    def close(self):
+        """
+        Close the journal file.
+        """
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+    def remove(self):
+        """
+        Close and delete the journal once the transfer is done.
+        """
+        self.close()
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
+
+
+SYNC_COMPARE_SIZE = 'size'
+SYNC_COMPARE_MTIME = 'mtime'
+SYNC_COMPARE_ETAG = 'etag'
+
+
+def list_local_files(local_dir):
+    """
+    List the files under local_dir recursively.
+
+    :return: dict of relative path with '/' separators to (path, size, mtime)
+    :rtype: dict
+    """
+    files = {}
+    for root, _, file_names in os.walk(local_dir):
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            relative_path = os.path.relpath(path, local_dir).replace(os.sep, '/')
+            stat = os.stat(path)
+            files[relative_path] = (path, stat.st_size, stat.st_mtime)
+    return files
+
+
+def parse_last_modified(last_modified):
+    """
+    :param last_modified: last modified time of a listing, like 2020-01-01T00:00:00Z
+    :return: seconds since epoch
+    :rtype: int
+    """
+    return calendar.timegm(time.strptime(last_modified, '%Y-%m-%dT%H:%M:%SZ'))
+
+
+def is_same_file(local_file, remote_object, compare, upload):
+    """
+    Decide if a local file and an object are the same for a sync.
+
+    With SYNC_COMPARE_SIZE only the sizes are compared. With SYNC_COMPARE_MTIME the file is also
+    different if the source side is newer than the target side. With SYNC_COMPARE_ETAG the MD5
+    of the file is compared to the ETag, or the mtimes if the ETag is not an MD5.
+
+    :param local_file: (path, size, mtime)
+    :param remote_object: the object summary of list_all_objects
+    :param upload: true if the file is the source of the sync
+    :rtype: bool
+    """
+    path, size, mtime = local_file
+    if size != int(remote_object.size):
+        return False
+    if compare == SYNC_COMPARE_SIZE:
+        return True
+    if compare == SYNC_COMPARE_ETAG and is_md5_etag(remote_object.etag):
+        return get_md5_hex_from_file(path) == remote_object.etag.lower()
+    remote_mtime = parse_last_modified(remote_object.last_modified)
+    if upload:
+        return int(mtime) <= remote_mtime
+    return remote_mtime <= int(mtime)
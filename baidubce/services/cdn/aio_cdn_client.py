@@ -0,0 +1,42 @@
+# Copyright (c) 2014 Baidu.com, Inc. All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+This module provides an asyncio client class for CDN. Python 3.6+ is required.
+"""
+
+from baidubce import utils
+from baidubce.auth import bce_v1_signer
+from baidubce.http import aio_http_client
+from baidubce.http import handler
+from baidubce.services.cdn.cdn_client import CdnClient
+
+
+class AsyncCdnClient(CdnClient):
+    """
+    asyncio CdnClient, every request method is a coroutine.
+    """
+    def __init__(self, config=None):
+        CdnClient.__init__(self, config)
+
+    def _send_request(
+            self, http_method, path,
+            body=None, headers=None, params=None,
+            config=None,
+            body_parser=None):
+        config = self._merge_config(self, config)
+        if body_parser is None:
+            body_parser = handler.parse_json
+
+        return aio_http_client.send_request(
+            config, bce_v1_signer.sign, [handler.parse_error, body_parser],
+            http_method, utils.append_uri(CdnClient.prefix, path), body, headers, params)
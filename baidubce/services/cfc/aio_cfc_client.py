@@ -0,0 +1,66 @@
+# Copyright (c) 2014 Baidu.com, Inc. All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+"""
+This module provides an asyncio client class for CFC. Python 3.6+ is required.
+"""
+
+from urllib.parse import quote
+
+from baidubce import compat
+from baidubce.auth import bce_v1_signer
+from baidubce.http import aio_http_client
+from baidubce.http import http_content_types
+from baidubce.http import http_headers
+from baidubce.services.cfc import cfc_client
+from baidubce.services.cfc import cfc_handler
+from baidubce.services.cfc.cfc_client import CfcClient
+
+
+def _keep_http_response(http_response, response):
+    response.data = http_response
+    return True
+
+
+class AsyncCfcClient(CfcClient):
+    """
+    asyncio CfcClient, every request method is a coroutine.
+    """
+    def __init__(self, config=None):
+        CfcClient.__init__(self, config)
+
+    async def _send_request(
+            self, http_method, path,
+            body=None, headers=None, params=None,
+            config=None,
+            body_parser=None, special=False):
+        config = self._merge_config(self, config)
+        if body_parser is None:
+            body_parser = cfc_handler.parse_json
+        headers = headers or {}
+        headers[http_headers.CONTENT_TYPE] = http_content_types.JSON
+        if config.security_token is not None:
+            headers[http_headers.STS_SECURITY_TOKEN] = config.security_token
+        if body is not None:
+            body = compat.convert_to_bytes(body)
+        path = compat.convert_to_bytes(quote(CfcClient.prefix + path))
+
+        # cfc invoke return doesn't have to be json, the raw http response is returned
+        headers_to_sign = cfc_client.get_headers_to_sign(headers)
+        if special:
+            response = await aio_http_client.send_request(
+                config, bce_v1_signer.sign, [_keep_http_response],
+                http_method, path, body, headers, params, headers_to_sign=headers_to_sign)
+            return response.data
+
+        return await aio_http_client.send_request(
+            config, bce_v1_signer.sign, [cfc_handler.parse_error, body_parser],
+            http_method, path, body, headers, params, headers_to_sign=headers_to_sign)
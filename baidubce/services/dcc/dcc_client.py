@@ -79,6 +79,32 @@ class DccClient(BceBaseClient):
 
         return self._send_request(http_methods.GET, path, params=params, config=config)
 
+    def list_all_dedicated_hosts(self, zone_name=None, page_size=None, max_items=None,
+                                 config=None, read_ahead=False):
+        """
+            Generate all the dedicatedHosts owned by the authenticated user, the pages are
+            listed by list_dedicated_hosts.
+
+            :param page_size:
+                The number of dedicatedHosts requested per page.
+            :type page_size: int
+
+            :param max_items:
+                Stop after max_items dedicatedHosts.
+            :type max_items: int
+
+            :param read_ahead:
+                Request the next page while the dedicatedHosts of the current one are consumed.
+            :type read_ahead: bool
+
+            :return: generator of dedicatedHost models
+        """
+        def list_page(marker, max_keys):
+            return self.list_dedicated_hosts(zone_name=zone_name, marker=marker,
+                                             max_keys=max_keys, config=config)
+        return utils.paginate(list_page, 'dedicated_hosts', page_size=page_size,
+                              max_items=max_items, read_ahead=read_ahead)
+
     @required(host_id=(str, unicode))
     def get_dedicated_host(self, host_id, config=None):
         """
@@ -350,6 +350,30 @@ class EipClient(BceBaseClient):
         return self._send_request(http_methods.GET, path, params=params,
                                   config=config)
 
+    def list_all_eips(self, eip=None, instance_type=None, instance_id=None, page_size=None,
+                      max_items=None, config=None, read_ahead=False):
+        """
+        get all the eips owned by the authenticated user and specified conditions, the pages
+        are listed by list_eips.
+
+        :type page_size: int
+        :param page_size: The number of eips requested per page.
+
+        :type max_items: int
+        :param max_items: Stop after max_items eips.
+
+        :type read_ahead: bool
+        :param read_ahead: Request the next page while the eips of the current one are consumed.
+
+        :return: generator of eip models
+        """
+        def list_page(marker, max_keys):
+            return self.list_eips(eip=eip, instance_type=instance_type,
+                                  instance_id=instance_id, marker=marker, max_keys=max_keys,
+                                  config=config)
+        return utils.paginate(list_page, 'eip_list', page_size=page_size, max_items=max_items,
+                              read_ahead=read_ahead)
+
     @staticmethod
     def _generate_default_client_token():
         """
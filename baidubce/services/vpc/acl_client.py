@@ -218,6 +218,37 @@ class AclClient(bce_base_client.BceBaseClient):
         return self._send_request(http_methods.GET, path,
                                   params=params, config=config)
 
+    @required(subnet_id=(bytes, str))
+    def list_all_subnet_acl(self, subnet_id, page_size=None, max_items=None, config=None,
+                            read_ahead=False):
+        """
+        Generate all the acl rules of specify subnet, the pages are listed by
+        list_subnet_acl.
+
+        :param subnet_id
+            the id of subnet whhich the acl applied
+        :type subnet_id: string
+
+        :param page_size
+            The number of acl rules requested per page.
+        :type page_size: int
+
+        :param max_items
+            Stop after max_items acl rules.
+        :type max_items: int
+
+        :param read_ahead
+            Request the next page while the acl rules of the current one are consumed.
+        :type read_ahead: bool
+
+        :return: generator of acl rules
+        """
+        def list_page(marker, max_keys):
+            return self.list_subnet_acl(subnet_id, marker=marker, max_keys=max_keys,
+                                        config=config)
+        return utils.paginate(list_page, 'acl_rules', page_size=page_size, max_items=max_items,
+                              read_ahead=read_ahead)
+
     @required(acl_rule_id=(bytes, str))
     def delete_acl(self, acl_rule_id, client_token=None, config=None):
         """
@@ -200,6 +200,37 @@ class NatClient(bce_base_client.BceBaseClient):
         return self._send_request(http_methods.GET, path,
                                   params=params, config=config)
 
+    @required(vpc_id=(bytes, str))
+    def list_all_nats(self, vpc_id, nat_id=None, name=None, ip=None, page_size=None,
+                      max_items=None, config=None, read_ahead=False):
+        """
+        Generate all the nat-gateways of the VPC matching the conditions, the pages are
+        listed by list_nats.
+
+        :param vpc_id:
+            The id of VPC.
+        :type vpc_id: string
+
+        :param page_size:
+            The number of nat-gateways requested per page.
+        :type page_size: int
+
+        :param max_items:
+            Stop after max_items nat-gateways.
+        :type max_items: int
+
+        :param read_ahead:
+            Request the next page while the nat-gateways of the current one are consumed.
+        :type read_ahead: bool
+
+        :return: generator of nat-gateways
+        """
+        def list_page(marker, max_keys):
+            return self.list_nats(vpc_id, nat_id=nat_id, name=name, ip=ip, marker=marker,
+                                  max_keys=max_keys, config=config)
+        return utils.paginate(list_page, 'nats', page_size=page_size, max_items=max_items,
+                              read_ahead=read_ahead)
+
     @required(nat_id=(bytes, str))
     def get_nat(self, nat_id, config=None):
         """
@@ -16,7 +16,7 @@ This module provide some tools for bce client.
 # str() generator unicode,bytes() for ASCII
 from __future__ import absolute_import
 from builtins import str, bytes
-from future.utils import iteritems, iterkeys, itervalues
+from future.utils import iteritems
 from baidubce import compat
 
 import os
@@ -24,7 +24,10 @@ import re
 import datetime
 import hashlib
 import base64
+import mmap
 import string
+import threading
+from concurrent import futures
 try:
     from urllib.parse import urlparse
 except ImportError:
@@ -73,6 +76,69 @@ def get_md5_from_fp(fp, offset=0, length=-1, buf_size=8192):
     return base64.standard_b64encode(md5.digest())
 
 
+def get_content_digests(data, sha256=False):
+    """
+    Get the MD5 and optionally the SHA-256 of a buffer such as bytes or a mmap.
+
+    The buffer is hashed in place. When both digests are asked they are computed on two
+    threads, hashlib releases the GIL while hashing large buffers.
+
+    :type data: bytes or buffer
+    :param sha256: compute the SHA-256 too
+    :type sha256: bool
+    :return: (MD5 encoded by base64, hex SHA-256 or None)
+    :rtype: tuple
+    """
+    md5 = hashlib.md5()
+    if not sha256:
+        md5.update(data)
+        return base64.standard_b64encode(md5.digest()), None
+    sha = hashlib.sha256()
+    worker = threading.Thread(target=sha.update, args=(data,))
+    worker.start()
+    md5.update(data)
+    worker.join()
+    return base64.standard_b64encode(md5.digest()), compat.convert_to_bytes(sha.hexdigest())
+
+
+def get_content_digests_from_file(file_name, length=None, sha256=False, buf_size=1024 * 1024):
+    """
+    Get the MD5 and optionally the SHA-256 of the first length bytes of a file.
+
+    The file is mapped read-only and hashed in place, without copying it into read buffers.
+    Files which can not be mapped, like empty ones, are read by chunks of buf_size instead.
+
+    :param length: number of bytes to hash, None for the whole file
+    :type length: int
+    :return: (MD5 encoded by base64, hex SHA-256 or None)
+    :rtype: tuple
+    """
+    with open(file_name, 'rb') as fp:
+        if length is None:
+            length = os.fstat(fp.fileno()).st_size
+        try:
+            mapped = mmap.mmap(fp.fileno(), length, access=mmap.ACCESS_READ)
+        except (ValueError, EnvironmentError):
+            mapped = None
+        if mapped is not None:
+            try:
+                return get_content_digests(mapped, sha256)
+            finally:
+                mapped.close()
+        md5 = hashlib.md5()
+        sha = hashlib.sha256() if sha256 else None
+        while length > 0:
+            buf = fp.read(min(buf_size, length))
+            if not buf:
+                break
+            md5.update(buf)
+            if sha is not None:
+                sha.update(buf)
+            length -= len(buf)
+    return (base64.standard_b64encode(md5.digest()),
+            compat.convert_to_bytes(sha.hexdigest()) if sha is not None else None)
+
+
 def get_canonical_time(timestamp=0):
     """
     Get cannonical time.
@@ -207,6 +273,10 @@ def _get_normalized_char_list():
         ret = [s.encode("utf-8") for s in ret]
     return ret
 _NORMALIZED_CHAR_LIST = _get_normalized_char_list()
+_NORMALIZED_CHAR_LIST_KEEP_SLASH = list(_NORMALIZED_CHAR_LIST)
+_NORMALIZED_CHAR_LIST_KEEP_SLASH[ord('/')] = b'/'
+_UNRESERVED_CHARS = (string.ascii_letters + string.digits + '.~-_').encode('utf-8')
+_UNRESERVED_CHARS_KEEP_SLASH = _UNRESERVED_CHARS + b'/'
 
 
 def normalize_string(in_str, encoding_slash=True):
@@ -214,6 +284,10 @@ def normalize_string(in_str, encoding_slash=True):
     Encode in_str.
     When encoding_slash is True, don't encode skip_chars, vice versa.
 
+    A string without any byte to encode is returned as is, which is checked in C by deleting
+    all the unreserved bytes, and '/' when it is kept, with translate(). Otherwise every byte
+    is mapped through the precomputed escape table.
+
     :type in_str: string
     :param in_str: None
 
@@ -223,23 +297,19 @@ def normalize_string(in_str, encoding_slash=True):
     :return:
         **ASCII  string**
     """
-    tmp = []
-    for ch in convert_to_standard_string(in_str):
-        # on python3, ch is int type
-        sep = ''
-        index = -1
-        if isinstance(ch, int):
-            # on py3
-            sep = chr(ch).encode("utf-8")
-            index = ch
-        else:
-            sep = ch
-            index = ord(ch)
-        if sep == b'/' and not encoding_slash:
-            tmp.append(b'/')
-        else:
-            tmp.append(_NORMALIZED_CHAR_LIST[index])
-    return (b'').join(tmp)
+    in_str = convert_to_standard_string(in_str)
+    if encoding_slash:
+        unreserved_chars = _UNRESERVED_CHARS
+        char_list = _NORMALIZED_CHAR_LIST
+    else:
+        unreserved_chars = _UNRESERVED_CHARS_KEEP_SLASH
+        char_list = _NORMALIZED_CHAR_LIST_KEEP_SLASH
+    if not in_str.translate(None, unreserved_chars):
+        return in_str
+    if compat.PY3:
+        # on python3, iterating bytes gives int
+        return (b'').join([char_list[ch] for ch in in_str])
+    return (b'').join([char_list[ch] for ch in bytearray(in_str)])
 
 
 def append_uri(base_uri, *path_components):
@@ -289,6 +359,36 @@ def check_bucket_valid(bucket):
     return True
 
 
+_CONTENT_TYPES = {
+    b"js": b"application/javascript",
+    b"xlsx": b"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    b"xltx": b"application/vnd.openxmlformats-officedocument.spreadsheetml.template",
+    b"potx": b"application/vnd.openxmlformats-officedocument.presentationml.template",
+    b"ppsx": b"application/vnd.openxmlformats-officedocument.presentationml.slideshow",
+    b"pptx": b"application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    b"sldx": b"application/vnd.openxmlformats-officedocument.presentationml.slide",
+    b"docx": b"application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    b"dotx": b"application/vnd.openxmlformats-officedocument.wordprocessingml.template",
+    b"xlam": b"application/vnd.ms-excel.addin.macroEnabled.12",
+    b"xlsb": b"application/vnd.ms-excel.sheet.binary.macroEnabled.12",
+}
+_MAX_GUESSED_CONTENT_TYPES = 1024
+_guessed_content_types = {}
+
+
+def _guess_content_type_by_suffix(suffix):
+    if suffix in _CONTENT_TYPES:
+        return _CONTENT_TYPES[suffix]
+    import mimetypes
+
+    if not mimetypes.inited:
+        mimetypes.init()
+    mime_type = mimetypes.types_map.get(compat.convert_to_string(b"." + suffix))
+    if not mime_type:
+        return b'application/octet-stream'
+    return compat.convert_to_bytes(mime_type)
+
+
 def guess_content_type_by_file_name(file_name):
     """
     Get file type by filename.
@@ -299,40 +399,25 @@ def guess_content_type_by_file_name(file_name):
     :return:
         **Type Value**
     """
-    mime_map = dict()
-    mime_map[b"js"] = b"application/javascript"
-    mime_map[b"xlsx"] = b"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    mime_map[b"xltx"] = b"application/vnd.openxmlformats-officedocument.spreadsheetml.template"
-    mime_map[b"potx"] = b"application/vnd.openxmlformats-officedocument.presentationml.template"
-    mime_map[b"ppsx"] = b"application/vnd.openxmlformats-officedocument.presentationml.slideshow"
-    mime_map[b"pptx"] = b"application/vnd.openxmlformats-officedocument.presentationml.presentation"
-    mime_map[b"sldx"] = b"application/vnd.openxmlformats-officedocument.presentationml.slide"
-    mime_map[b"docx"] = b"application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    mime_map[b"dotx"] = b"application/vnd.openxmlformats-officedocument.wordprocessingml.template"
-    mime_map[b"xlam"] = b"application/vnd.ms-excel.addin.macroEnabled.12"
-    mime_map[b"xlsb"] = b"application/vnd.ms-excel.sheet.binary.macroEnabled.12"
     try:
-        name = os.path.basename(file_name.lower())
+        name = os.path.basename(compat.convert_to_bytes(file_name).lower())
         suffix = name.split(b'.')[-1]
-        if suffix in iterkeys(mime_map):
-            mime_type = mime_map[suffix]
-        else:
-            import mimetypes
-
-            mimetypes.init()
-            suffix = compat.convert_to_string(b"." + suffix)
-            mime_type = mimetypes.types_map[suffix]
-            mime_type = compat.convert_to_bytes(mime_type)
+        mime_type = _guessed_content_types.get(suffix)
+        if mime_type is None:
+            mime_type = _guess_content_type_by_suffix(suffix)
+            if len(_guessed_content_types) >= _MAX_GUESSED_CONTENT_TYPES:
+                _guessed_content_types.clear()
+            _guessed_content_types[suffix] = mime_type
     except:
         mime_type = b'application/octet-stream'
-    if not mime_type:
-        mime_type = b'application/octet-stream'
     return mime_type
 
 
 _first_cap_regex = re.compile('(.)([A-Z][a-z]+)')
 _number_cap_regex = re.compile('([a-z])([0-9]{2,})')
 _end_cap_regex = re.compile('([a-z0-9])([A-Z])')
+_MAX_PYTHONIZED_NAMES = 4096
+_pythonized_names = {}
 
 
 def pythonize_name(name):
@@ -346,11 +431,20 @@ def pythonize_name(name):
         pythonize_name('ContentMd5')->'content_md5'
         pythonize_name('') -> ''
     """
-    if name == "eTag":
-        return "etag"
-    s1 = _first_cap_regex.sub(r'\1_\2', name)
-    s2 = _number_cap_regex.sub(r'\1_\2', s1)
-    return _end_cap_regex.sub(r'\1_\2', s2).lower()
+    pythonized = _pythonized_names.get(name)
+    if pythonized is None:
+        if name == "eTag":
+            pythonized = "etag"
+        else:
+            s1 = _first_cap_regex.sub(r'\1_\2', name)
+            s2 = _number_cap_regex.sub(r'\1_\2', s1)
+            pythonized = _end_cap_regex.sub(r'\1_\2', s2).lower()
+        # the names come from a small set of api fields and headers, the bound only guards
+        # against unbounded keys such as user metadata
+        if len(_pythonized_names) >= _MAX_PYTHONIZED_NAMES:
+            _pythonized_names.clear()
+        _pythonized_names[name] = pythonized
+    return pythonized
 
 
 def get_canonical_querystring(params, for_signature):
@@ -422,6 +516,28 @@ def dict_to_python_object(d):
     return Expando(attr)
 
 
+def to_python_object(value):
+    """
+    Convert a JSON value decoded into plain dicts and lists like json.loads with
+    object_hook=dict_to_python_object would have.
+
+    :param value: the decoded JSON value
+    :return: the value with every dict converted to an Expando
+    """
+    if isinstance(value, dict):
+        attr = {}
+        for k, v in iteritems(value):
+            if not isinstance(k, compat.string_types):
+                k = compat.convert_to_string(k)
+            if isinstance(v, (dict, list)):
+                v = to_python_object(v)
+            attr[pythonize_name(k)] = v
+        return Expando(attr)
+    if isinstance(value, list):
+        return [to_python_object(v) if isinstance(v, (dict, list)) else v for v in value]
+    return value
+
+
 def required(**types):
     """
     decorator of input param check
@@ -452,6 +568,80 @@ def required(**types):
     return _required
 
 
+def get_next_marker(response):
+    """
+    The default next page marker of paginate: next_marker if the response is truncated.
+    """
+    if response.is_truncated:
+        return response.next_marker
+    return None
+
+
+def paginate(list_page, items_name, page_size=None, max_items=None, read_ahead=False,
+             next_marker=get_next_marker):
+    """
+    Generate the items of a marker based list API lazily, page by page.
+
+    With read_ahead, the next page is requested in a background thread while the caller
+    consumes the items of the current one, so the round trip of a page overlaps the processing
+    of the previous one.
+
+    :type list_page: function
+    :param list_page: list_page(marker, max_keys) returns a page as a BceResponse, marker is
+        None for the first page and max_keys is None for the default page size of the service
+
+    :type items_name: string
+    :param items_name: the attribute of the response holding the items of a page
+
+    :type page_size: int
+    :param page_size: the number of items requested per page
+
+    :type max_items: int
+    :param max_items: stop after yielding max_items items, None for all
+
+    :type read_ahead: bool
+    :param read_ahead: request the next page before the items of the current one are consumed
+
+    :type next_marker: function
+    :param next_marker: next_marker(response) returns the marker of the next page, or None if
+        the response is the last page
+    :return: generator of the items
+    """
+    def fetch(marker, remaining):
+        max_keys = page_size
+        if remaining is not None and (max_keys is None or remaining < max_keys):
+            max_keys = remaining
+        return list_page(marker, max_keys)
+
+    remaining = max_items
+    if remaining is not None and remaining <= 0:
+        return
+    executor = futures.ThreadPoolExecutor(1) if read_ahead else None
+    task = None
+    try:
+        response = fetch(None, remaining)
+        while True:
+            items = getattr(response, items_name, None) or []
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+            marker = next_marker(response)
+            if marker is None or remaining == 0:
+                task = None
+            elif executor is not None:
+                task = executor.submit(fetch, marker, remaining)
+            for item in items:
+                yield item
+            if marker is None or remaining == 0:
+                break
+            response = task.result() if task is not None else fetch(marker, remaining)
+    finally:
+        if task is not None:
+            task.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
 def parse_host_port(endpoint, default_protocol):
     """
     parse protocol, host, port from endpoint in config
@@ -15,6 +15,8 @@ PYTHON=python
 
 echo "using Python=$PYTHON"
 
-$PYTHON setup.py bdist_wheel --universal
+# the asyncio clients are left out on python 2, so each python gets its own wheel
+$PYTHON setup.py bdist_wheel
+which python3 > /dev/null && python3 setup.py bdist_wheel
 $PYTHON setup.py sdist
 mv -fv dist/* output/dist/
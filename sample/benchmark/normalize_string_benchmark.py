@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+# an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+"""
+Benchmark of utils.normalize_string against the former byte by byte implementation.
+
+Run it from the root of the sdk:
+
+    python sample/benchmark/normalize_string_benchmark.py [number]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from baidubce import utils
+
+
+def normalize_string_by_byte(in_str, encoding_slash=True):
+    """The byte by byte normalize_string of the sdk before the translate() fast path."""
+    tmp = []
+    for ch in utils.convert_to_standard_string(in_str):
+        # on python3, ch is int type
+        if isinstance(ch, int):
+            sep = chr(ch).encode("utf-8")
+            index = ch
+        else:
+            sep = ch
+            index = ord(ch)
+        if sep == b'/' and not encoding_slash:
+            tmp.append(b'/')
+        else:
+            tmp.append(utils._NORMALIZED_CHAR_LIST[index])
+    return (b'').join(tmp)
+
+
+CASES = [
+    ('short key', b'a.txt', False),
+    ('plain key', b'logs/2020/01/01/app-server_01.access.log', False),
+    ('key to encode', u'日志/2020 01 01/访问日志.log'.encode('utf-8'), False),
+    ('query value', b'bytes=0-1048575', True),
+    ('long plain key', b'data/' + b'abcdefghij' * 100, False),
+]
+
+
+def main(number):
+    print('%-16s %14s %14s %8s' % ('case', 'by byte (us)', 'current (us)', 'speedup'))
+    for name, in_str, encoding_slash in CASES:
+        assert normalize_string_by_byte(in_str, encoding_slash) == \
+            utils.normalize_string(in_str, encoding_slash)
+        old = min(timeit.repeat(lambda: normalize_string_by_byte(in_str, encoding_slash),
+                                number=number, repeat=3)) / number * 1e6
+        new = min(timeit.repeat(lambda: utils.normalize_string(in_str, encoding_slash),
+                                number=number, repeat=3)) / number * 1e6
+        print('%-16s %14.2f %14.2f %7.1fx' % (name, old, new, old / new))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -17,10 +17,24 @@ from __future__ import absolute_import
 import io
 import os
 import re
+import sys
 try:
     from setuptools import setup
+    from setuptools.command.build_py import build_py
 except ImportError:
     from distutils.core import setup
+    from distutils.command.build_py import build_py
+
+
+class BuildPy(build_py):
+    """
+    Leave out the asyncio clients on python older than 3.6, they are written with async/await.
+    """
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if sys.version_info < (3, 6):
+            modules = [m for m in modules if not m[1].startswith('aio_')]
+        return modules
 
 
 with io.open(os.path.join("baidubce", "__init__.py"), "rt") as f:
@@ -31,7 +45,8 @@ setup(
     version=SDK_VERSION,
     install_requires=['pycrypto>=2.4',
                       'future>=0.6.0',
-                      'six>=1.4.0'],
+                      'six>=1.4.0',
+                      'futures>=3.0.0; python_version < "3"'],
     python_requires='>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, <4',
     packages=['baidubce',
               'baidubce.auth',
@@ -58,6 +73,7 @@ setup(
               'baidubce.services.bcc',
               'baidubce.services.tsdb'
               ],
+    cmdclass={'build_py': BuildPy},
     url='http://bce.baidu.com',
     license='Apache License 2.0',
     author='',
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the bce v1 signer.
+"""
+
+import os
+import sys
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce.auth import bce_credentials
+from baidubce.auth import bce_v1_signer
+
+
+class TestSigner(unittest.TestCase):
+    """test bce_v1_signer.Signer"""
+    def test_signer_cache(self):
+        """test cached signing keys and headers give the same authorization"""
+        credentials = bce_credentials.BceCredentials(b"my_ak", b"my_sk")
+        signer = bce_v1_signer.Signer(max_sign_keys=2, max_canonical_headers=2)
+        for i in range(5):
+            headers = {b"Host": b"localhost", b"x-bce-a": b"a/b:c", b"Content-Length": i}
+            for timestamp in (1402639056, 1402639057, 1402639058):
+                self.assertEqual(
+                    signer.sign(credentials, b"PUT", b"/bucket/object1", headers, {},
+                                timestamp),
+                    bce_v1_signer.Signer().sign(credentials, b"PUT", b"/bucket/object1",
+                                                headers, {}, timestamp))
+        self.assertEqual(len(signer._sign_keys), 2)
+        self.assertTrue(len(signer._canonical_headers) <= 2)
+
+    def test_prepared_signature(self):
+        """test a prepared signature follows x-bce-date"""
+        credentials = bce_credentials.BceCredentials(b"my_ak", b"my_sk")
+        headers = {b"Host": b"localhost", b"Content-Length": b"3"}
+        prepared = bce_v1_signer.prepare(credentials, b"PUT", b"/bucket/object1", headers,
+                                         {b"partNumber": 1})
+        for date in (b"2014-06-13T05:57:36Z", b"2014-06-13T05:57:37Z"):
+            headers[b"x-bce-date"] = date
+            self.assertEqual(prepared.sign(headers, 1402639056),
+                             bce_v1_signer.sign(credentials, b"PUT", b"/bucket/object1",
+                                                headers, {b"partNumber": 1}, 1402639056))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the asyncio BOS client, without BOS endpoint.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import warnings
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce import compat
+from baidubce import utils
+from baidubce.auth.bce_credentials import BceCredentials
+from baidubce.bce_response import BceResponse
+from baidubce.bce_client_configuration import BceClientConfiguration
+from baidubce.exception import BceClientError
+from baidubce.http import http_headers
+from baidubce.services.bos.bos_client import BosClient
+
+if compat.PY3:
+    import asyncio
+    from baidubce.services.bos.aio_bos_client import AsyncBosClient
+
+
+@unittest.skipUnless(compat.PY3, 'asyncio is required')
+class TestAsyncBosClient(unittest.TestCase):
+    """test AsyncBosClient"""
+    def setUp(self):
+        self.client = AsyncBosClient(BceClientConfiguration(
+            credentials=BceCredentials(b'my_ak', b'my_sk'), endpoint=b'127.0.0.1:1'))
+        self.requests = []
+
+        async def send_request(http_method, bucket_name=None, key=None, **kwargs):
+            self.requests.append((http_method, bucket_name, key))
+            self.kwargs = kwargs
+            return 'response'
+        self.client._send_request = send_request
+
+    @staticmethod
+    def _run(coroutine):
+        """run coroutine in a new event loop"""
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            return loop.run_until_complete(coroutine)
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    def test_inherited_request(self):
+        """test an inherited method sending one request returns its coroutine"""
+        response = self._run(self.client.delete_object('bucket', 'key'))
+        self.assertEqual(response, 'response')
+        self.assertEqual(len(self.requests), 1)
+
+    def test_sync_helpers_not_supported(self):
+        """test the BosClient helpers sending many requests fail clearly"""
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            with self.assertRaises(BceClientError) as context:
+                self.client.delete_keys('bucket', ['a', 'b'])
+        self.assertIn('AsyncBosClient', str(context.exception))
+        self.assertEqual([w for w in caught if 'never awaited' in str(w.message)], [])
+        self.assertEqual(self.requests, [])
+        for name in ('list_all_objects_parallel', 'walk_objects', 'download_file',
+                     'upload_file', 'copy_large_object', 'delete_prefix', 'sync_upload',
+                     'sync_download'):
+            self.assertNotEqual(getattr(AsyncBosClient, name), getattr(BosClient, name))
+            self.assertRaises(BceClientError, getattr(self.client, name), 'bucket', 'key')
+
+    def test_list_all_objects(self):
+        """test list_all_objects pages by page_size and stops after max_items"""
+        calls = []
+
+        async def list_objects(bucket_name, max_keys=None, prefix=None, marker=None,
+                               delimiter=None, config=None):
+            calls.append((marker, max_keys))
+            start = marker or 0
+            response = BceResponse()
+            response.contents = list(range(start, min(start + (max_keys or 4), 10)))
+            response.is_truncated = start + len(response.contents) < 10
+            response.next_marker = start + len(response.contents)
+            return response
+        self.client.list_objects = list_objects
+
+        async def collect(**kwargs):
+            return [item async for item in self.client.list_all_objects('bucket', **kwargs)]
+        self.assertEqual(self._run(collect()), list(range(10)))
+        del calls[:]
+        self.assertEqual(self._run(collect(page_size=3, max_items=5)), list(range(5)))
+        self.assertEqual(calls, [(None, 3), (3, 2)])
+        self.assertEqual(self._run(collect(max_items=0)), [])
+
+    def test_put_object_from_file(self):
+        """test the file is hashed and its body is read through coroutines"""
+        async def send_request(http_method, bucket_name=None, key=None, **kwargs):
+            body = kwargs['body']
+            read = body.read(3)
+            self.assertTrue(asyncio.iscoroutine(read))
+            self.bodies.append(await read + await body.read(100))
+            self.headers = kwargs['headers']
+        self.bodies = []
+        self.client._send_request = send_request
+        fd, file_name = tempfile.mkstemp()
+        try:
+            os.write(fd, b'content')
+            os.close(fd)
+            self._run(self.client.put_object_from_file('bucket', 'key', file_name))
+        finally:
+            os.remove(file_name)
+        self.assertEqual(self.bodies, [b'content'])
+        self.assertEqual(self.headers[http_headers.CONTENT_MD5],
+                         utils.convert_to_standard_string(AsyncBosClient._get_md5(b'content')))
+
+
+if __name__ == '__main__':
+    unittest.main()
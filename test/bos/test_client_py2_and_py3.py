@@ -25,9 +25,12 @@ from future.utils import itervalues
 import os
 import sys
 import random
+import shutil
+import tempfile
 import unittest
 import http.client
 import io
+import hashlib
 import json
 import socket
 import time
@@ -39,7 +42,13 @@ from baidubce.auth import bce_v1_signer
 from baidubce.auth import bce_credentials
 from baidubce import utils
 from baidubce import compat
+from baidubce.services import bos
+from baidubce.services.bos import bos_cache
 from baidubce.services.bos import bos_client
+from baidubce.services.bos import bos_handler
+from baidubce.services.bos import bos_model
+from baidubce.services.bos import bos_stream
+from baidubce.services.bos import bos_transfer
 from baidubce.services.bos import storage_class
 from baidubce.exception import BceHttpClientError
 from baidubce.exception import BceServerError
@@ -2039,6 +2048,10 @@ class TestUtil(unittest.TestCase):
         self.assertEqual(b"www.baidu.com", utils.normalize_string("www.baidu.com"))
         self.assertEqual(b"www.bai%5E%26%2A.com", utils.normalize_string("www.bai^&*.com"))
         self.assertEqual(b"www.baidu.com", utils.normalize_string("www.baidu.com", True))
+        self.assertEqual(b"a/b%20c", utils.normalize_string("a/b c", False))
+        self.assertEqual(b"a%2Fb%20c", utils.normalize_string("a/b c"))
+        self.assertEqual(b"", utils.normalize_string(""))
+        self.assertEqual(b"-12", utils.normalize_string(-12))
 
     #def test_append_param
     def test_check_bucket_valid(self):
@@ -2615,6 +2628,592 @@ class TestBucketStorageclass(TestClient):
         self.assertEqual(response.storage_class, "COLD")
         self.bos.set_bucket_storage_class(self.BUCKET, storage_class=storage_class.STANDARD)
 
+class TestTimeouts(unittest.TestCase):
+    """test the deadline of BosClient calls"""
+    def test_deadline_shared_by_pages(self):
+        """test the pages of list_all_objects share the deadline fixed by the call"""
+        client = bos_client.BosClient(BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint=b"bj.bcebos.com", deadline_in_mills=60000))
+        deadlines = []
+
+        def list_objects(bucket_name, max_keys=None, prefix=None, marker=None, delimiter=None,
+                         config=None):
+            deadlines.append(config.deadline)
+            response = BceResponse()
+            response.contents = [Expando({"key": "k%d" % len(deadlines)})]
+            response.is_truncated = len(deadlines) < 3
+            response.next_marker = "k%d" % len(deadlines)
+            return response
+        client.list_objects = list_objects
+        self.assertEqual(len(list(client.list_all_objects("bucket"))), 3)
+        self.assertEqual(len(set(deadlines)), 1)
+        self.assertTrue(deadlines[0] <= time.time() + 60)
+
+
+class TestBosTransfer(unittest.TestCase):
+    """test bos_transfer"""
+    def test_get_part_size(self):
+        """test part size is enlarged to fit MAX_PART_NUMBER"""
+        MB = 1024 * 1024
+        self.assertEqual(bos_transfer.get_part_size(100 * MB), bos.DEFAULT_PART_SIZE)
+        self.assertEqual(bos_transfer.get_part_size(100 * MB, 5 * MB), 5 * MB)
+        part_size = bos_transfer.get_part_size(1024 * 1024 * MB, 5 * MB)
+        self.assertEqual(part_size % MB, 0)
+        self.assertTrue(part_size * bos.MAX_PART_NUMBER >= 1024 * 1024 * MB)
+        self.assertRaises(ValueError, bos_transfer.get_part_size, 100, 0)
+
+    def test_split_parts(self):
+        """test split_parts"""
+        self.assertEqual(bos_transfer.split_parts(10, 4), [(1, 0, 4), (2, 4, 4), (3, 8, 2)])
+        self.assertEqual(bos_transfer.split_parts(8, 4), [(1, 0, 4), (2, 4, 4)])
+
+    def test_part_reader(self):
+        """test PartReader computes md5 and progress and can be resent"""
+        progress = []
+        tracker = bos_transfer.ProgressTracker(5, lambda a, b: progress.append((a, b)))
+        fp = io.BytesIO(b"0123456789")
+        fp.seek(3)
+        reader = bos_transfer.PartReader(fp, 5, tracker)
+        self.assertEqual(reader.read(2), b"34")
+        reader.seek(3)
+        self.assertEqual(tracker.transferred, 0)
+        self.assertEqual(reader.read(100), b"34567")
+        self.assertEqual(reader.read(100), b"")
+        self.assertEqual(reader.hexdigest(), hashlib.md5(b"34567").hexdigest())
+        self.assertEqual(progress[-1], (5, 5))
+
+    def test_upload_small_file(self):
+        """test a file of one part reports progress and is rate limited like the parts"""
+        file_name = "test_upload_small_file"
+        with open(file_name, "wb") as f:
+            f.write(b"0123456789")
+        client = bos_client.BosClient(BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint=b"bj.bcebos.com"))
+        uploaded = []
+
+        def put_object(bucket_name, key, data, content_length, content_md5, **kwargs):
+            uploaded.append((data.read(4), data.read(), content_md5))
+            return BceResponse()
+        client.put_object = put_object
+        progress = []
+        consumed = []
+        old_consume = bos_transfer.RateLimiter.consume
+        bos_transfer.RateLimiter.consume = lambda limiter, size: consumed.append(size)
+        try:
+            client.upload_file("bucket", "key", file_name, bandwidth_limit=1024,
+                               progress_callback=lambda a, b: progress.append((a, b)))
+        finally:
+            bos_transfer.RateLimiter.consume = old_consume
+            os.remove(file_name)
+        self.assertEqual(uploaded, [(b"0123", b"456789",
+                                     utils.get_md5_from_fp(io.BytesIO(b"0123456789")))])
+        self.assertEqual(progress, [(4, 10), (10, 10)])
+        self.assertEqual(consumed, [4, 6])
+
+    def test_positional_writer(self):
+        """test ranges written out of order by PositionalWriter"""
+        file_name = "test_positional_writer"
+        ranges = bos_transfer.split_ranges(10, 4)
+        self.assertEqual(ranges, [(0, 3), (4, 7), (8, 9)])
+        writer = bos_transfer.PositionalWriter(file_name, 10)
+        try:
+            for start, end in reversed(ranges):
+                writer.write(start, b"0123456789"[start:end + 1])
+        finally:
+            writer.close()
+        with open(file_name, "rb") as f:
+            self.assertEqual(f.read(), b"0123456789")
+        self.assertEqual(bos_transfer.get_md5_hex_from_file(file_name),
+                         hashlib.md5(b"0123456789").hexdigest())
+        os.remove(file_name)
+        self.assertTrue(bos_transfer.is_md5_etag(hashlib.md5(b"").hexdigest()))
+        self.assertFalse(bos_transfer.is_md5_etag("-".join(["a" * 15, "b" * 16])))
+
+    def test_range_digest(self):
+        """test RangeDigest hashes ranges written and completed out of order"""
+        file_name = "test_range_digest"
+        data = b"0123456789"
+        writer = bos_transfer.PositionalWriter(file_name, 10)
+        digest = bos_transfer.RangeDigest(file_name, 3)
+        try:
+            for start, end in [(8, 9), (0, 3), (4, 7)]:
+                writer.write(start, data[start:end + 1])
+                digest.update(start, data[start:end + 1])
+                # a retried chunk overlapping the digested bytes
+                digest.update(start, data[start:start + 2])
+                digest.complete(start, end)
+            self.assertEqual(digest.hexdigest(), hashlib.md5(data).hexdigest())
+        finally:
+            writer.close()
+            os.remove(file_name)
+
+    def test_download_range_retry_policy(self):
+        """test the ranges of download_file are retried by the retry policy"""
+        client = bos_client.BosClient(BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint=b"bj.bcebos.com"))
+        calls = []
+
+        class BrokenBody(object):
+            def read(self, size):
+                raise http.client.IncompleteRead(b"")
+
+            def close(self):
+                pass
+
+        def get_object(bucket_name, key, range=None, config=None):
+            calls.append(range)
+            response = BceResponse()
+            response.metadata = Expando({"etag": "etag"})
+            response.data = BrokenBody()
+            return response
+        client.get_object = get_object
+
+        progress = bos_transfer.ProgressTracker(10)
+        for retry_policy, attempts in [(NoRetryPolicy(), 1),
+                                       (BackOffRetryPolicy(2, 0, 0), 3)]:
+            del calls[:]
+            config = BceClientConfiguration(retry_policy=retry_policy)
+            self.assertRaises(IOError, client._download_range, "bucket", "key", "etag", None,
+                              (0, 9), progress, 5, config)
+            self.assertEqual(len(calls), attempts)
+
+    def test_transfer_journal(self):
+        """test TransferJournal ignores a torn record"""
+        file_name = "test_transfer_journal"
+        journal = bos_transfer.TransferJournal(file_name)
+        self.assertEqual(journal.load(), (None, []))
+        journal.start({"uploadId": "a"}, [{"partNumber": 1, "eTag": "x"}])
+        journal.append({"partNumber": 2, "eTag": "y"})
+        journal.close()
+        with open(file_name, "a") as f:
+            f.write('{"partNumber": 3, "eT')
+        header, records = journal.load()
+        self.assertEqual(header, {"uploadId": "a"})
+        self.assertEqual([record["partNumber"] for record in records], [1, 2])
+        journal.remove()
+        self.assertFalse(os.path.exists(file_name))
+
+    def test_get_file_signature(self):
+        """test the file signature changes with the content"""
+        file_name = "test_get_file_signature"
+        with open(file_name, "wb") as f:
+            f.write(b"a" * 1024 * 1024)
+        signature = bos_transfer.get_file_signature(file_name, 1024, 4)
+        self.assertEqual(signature["size"], 1024 * 1024)
+        self.assertEqual(signature, bos_transfer.get_file_signature(file_name, 1024, 4))
+        with open(file_name, "r+b") as f:
+            f.seek(1024 * 1024 - 1)
+            f.write(b"b")
+        self.assertNotEqual(signature["sampleMd5"],
+                            bos_transfer.get_file_signature(file_name, 1024, 4)["sampleMd5"])
+        os.remove(file_name)
+
+
+class TestDeleteKeys(unittest.TestCase):
+    """test delete_keys"""
+    def test_delete_keys(self):
+        """test keys are batched and the errors of all batches are aggregated"""
+        client = bos_client.BosClient(BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint=b"bj.bcebos.com"))
+        batches = []
+
+        def delete_multiple_objects(bucket_name, key_list, config=None):
+            batches.append(list(key_list))
+            if "k0" in key_list:
+                raise BceHttpClientError("failed", BceServerError("denied", code="AccessDenied"))
+            response = BceResponse()
+            response.errors = [Expando({"key": k, "code": "NoSuchKey", "message": "no"})
+                               for k in key_list if k.endswith("9")]
+            return response
+        client.delete_multiple_objects = delete_multiple_objects
+
+        result = client.delete_keys("bucket", ("k%d" % i for i in range(25)),
+                                    max_workers=2, batch_size=10)
+        self.assertEqual(sorted(len(batch) for batch in batches), [5, 10, 10])
+        self.assertEqual(result.deleted_count, 14)
+        self.assertEqual([e.key for e in result.errors if e.code == "NoSuchKey"], ["k19"])
+        self.assertEqual(len([e for e in result.errors if e.code == "AccessDenied"]), 10)
+        self.assertRaises(ValueError, client.delete_keys, "bucket", [], batch_size=1001)
+
+
+class TestListAllObjectsParallel(unittest.TestCase):
+    """test list_all_objects_parallel and walk_objects"""
+    def setUp(self):
+        self.client = bos_client.BosClient(BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint=b"bj.bcebos.com"))
+        self.keys = sorted(["a", "a/1", "a/2", "a/b/3", "a0", "b/", "b/4", "c/d/5", "e"])
+
+        def list_objects(bucket_name, max_keys=2, prefix=None, marker=None, delimiter=None,
+                         config=None):
+            prefix = prefix or ""
+            entries = []
+            for key in self.keys:
+                index = key.find(delimiter, len(prefix)) if delimiter else -1
+                entry = (key, False) if index < 0 else (key[:index + 1], True)
+                if key.startswith(prefix) and entry not in entries:
+                    entries.append(entry)
+            if marker:
+                entries = [e for e in entries if e[0] > marker and not marker.startswith(e[0])]
+            response = BceResponse()
+            response.is_truncated = len(entries) > max_keys
+            entries = entries[:max_keys]
+            response.next_marker = entries[-1][0] if entries else None
+            response.contents = [Expando({"key": e}) for e, is_prefix in entries
+                                 if not is_prefix]
+            response.common_prefixes = [Expando({"prefix": e}) for e, is_prefix in entries
+                                        if is_prefix]
+            return response
+        self.client.list_objects = list_objects
+
+    def test_list_all_objects_parallel(self):
+        """test the sharded listing yields all the keys"""
+        keys = [o.key for o in self.client.list_all_objects_parallel("bucket", max_workers=2)]
+        self.assertEqual(keys, self.keys)
+        keys = [o.key for o in self.client.list_all_objects_parallel("bucket", prefix="a/",
+                                                                     ordered=False)]
+        self.assertEqual(sorted(keys), ["a/1", "a/2", "a/b/3"])
+
+    def test_walk_objects(self):
+        """test the walk and pruning of sub prefixes"""
+        levels = {}
+        for prefix, sub_prefixes, objects in self.client.walk_objects("bucket"):
+            levels[prefix] = (list(sub_prefixes), [o.key for o in objects])
+            if "c/" in sub_prefixes:
+                sub_prefixes.remove("c/")
+        self.assertEqual(levels[None], (["a/", "b/", "c/"], ["a", "a0", "e"]))
+        self.assertEqual(levels["a/"], (["a/b/"], ["a/1", "a/2"]))
+        self.assertEqual(levels["b/"], ([], ["b/", "b/4"]))
+        self.assertNotIn("c/", levels)
+
+
+class TestBosModel(unittest.TestCase):
+    """test the listing records"""
+    def test_parse_list_objects(self):
+        """test contents are decoded as ObjectSummary with the Expando attribute names"""
+        body = json.dumps({
+            "name": "bucket", "isTruncated": False, "commonPrefixes": [{"prefix": "a/"}],
+            "contents": [{"key": "k", "lastModified": "2020-01-01T00:00:00Z", "eTag": "e",
+                          "size": 3, "owner": {"id": "i", "displayName": "d"}},
+                         {"key": "n", "newField": {"subField": 1}}]})
+        http_response = io.BytesIO(compat.convert_to_bytes(body))
+        response = BceResponse()
+        bos_handler.parse_list_objects(http_response, response)
+        self.assertTrue(http_response.closed)
+        self.assertFalse(response.is_truncated)
+        self.assertEqual(response.common_prefixes[0].prefix, "a/")
+        item = response.contents[0]
+        self.assertIsInstance(item, bos_model.ObjectSummary)
+        self.assertEqual((item.key, item.etag, item.size, item.owner.display_name),
+                         ("k", "e", 3, "d"))
+        self.assertIsNone(item.storage_class)
+        self.assertEqual(sorted(vars(item)), ["etag", "key", "last_modified", "owner", "size"])
+        # unknown fields are kept under their pythonized names
+        self.assertIsInstance(response.contents[1], bos_model.ObjectSummary)
+        self.assertEqual(response.contents[1].new_field.sub_field, 1)
+        item.size = 4
+        item.user_field = "u"
+        self.assertEqual((item.size, vars(item)["user_field"]), (4, "u"))
+
+    def test_raw_json_response(self):
+        """test the listing parsers are replaced by parse_json_raw for raw_json_response"""
+        parsers = [handler.parse_error, bos_handler.parse_list_objects]
+        self.assertEqual(handler.get_response_handlers(BceClientConfiguration(), parsers),
+                         parsers)
+        self.assertEqual(handler.get_response_handlers(
+            BceClientConfiguration(raw_json_response=True), parsers),
+            [handler.parse_error, handler.parse_json_raw])
+
+
+class TestCopyLargeObject(unittest.TestCase):
+    """test copy_large_object"""
+    def setUp(self):
+        self.client = bos_client.BosClient(BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint=b"bj.bcebos.com"))
+        self.calls = []
+
+        def get_meta_data(bucket_name, key, config):
+            response = BceResponse()
+            response.metadata.content_length = "10"
+            response.metadata.etag = "source-etag"
+            response.metadata.content_type = "text/plain"
+            response.user_metadata = {"owner": "me"}
+            return response
+
+        def initiate_multipart_upload(bucket_name, key, content_type=None, storage_class=None,
+                                      user_headers=None, config=None):
+            self.calls.append(("initiate", content_type, storage_class))
+            return Expando({"upload_id": "upload"})
+
+        def upload_part_copy(source_bucket_name, source_key, target_bucket_name, target_key,
+                             upload_id, part_number, part_size, offset, etag=None,
+                             config=None):
+            self.calls.append(("copy", part_number, offset, part_size, etag))
+            return Expando({"etag": "etag%d" % part_number})
+
+        def complete_multipart_upload(bucket_name, key, upload_id, part_list,
+                                      user_metadata=None, config=None):
+            self.calls.append(("complete", part_list, user_metadata))
+
+        def abort_multipart_upload(bucket_name, key, upload_id, config=None):
+            self.calls.append(("abort", upload_id))
+        self.client._get_object_meta_data_for_copy = get_meta_data
+        self.client.initiate_multipart_upload = initiate_multipart_upload
+        self.client.upload_part_copy = upload_part_copy
+        self.client.complete_multipart_upload = complete_multipart_upload
+        self.client.abort_multipart_upload = abort_multipart_upload
+
+    def test_copy_large_object(self):
+        """test the parts are copied pinned to the source etag and the metadata carried over"""
+        self.client.copy_large_object("src", "key", "dst", "key", part_size=4,
+                                      storage_class=storage_class.COLD)
+        self.assertEqual(self.calls[0], ("initiate", "text/plain", storage_class.COLD))
+        copies = sorted(call for call in self.calls if call[0] == "copy")
+        self.assertEqual(copies, [("copy", n, offset, size, "source-etag") for n, offset, size
+                                  in bos_transfer.split_parts(10, 4)])
+        self.assertEqual(self.calls[-1][0], "complete")
+        self.assertEqual([p["eTag"] for p in self.calls[-1][1]],
+                         ["etag%d" % (i + 1) for i in range(len(copies))])
+        self.assertEqual(self.calls[-1][2], {"owner": "me"})
+
+    def test_copy_large_object_abort(self):
+        """test the upload is aborted if a part fails"""
+        def upload_part_copy(*args, **kwargs):
+            raise BceHttpClientError("failed", BceServerError("changed", code="PreconditionFailed"))
+        self.client.upload_part_copy = upload_part_copy
+        self.assertRaises(BceHttpClientError, self.client.copy_large_object,
+                          "src", "key", "dst", "key", part_size=4)
+        self.assertEqual(self.calls[-1], ("abort", "upload"))
+
+
+class TestObjectCache(unittest.TestCase):
+    """test the object cache of get_object_as_string and get_object_to_file"""
+    class FakeHttpResponse(io.BytesIO):
+        """a http response with a body only"""
+        status = http.client.OK
+
+        def getheaders(self):
+            """no header"""
+            return []
+
+    def setUp(self):
+        self.client = bos_client.BosClient(BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint=b"bj.bcebos.com"))
+        self.content = b"content"
+        self.requests = []
+        self.temp_dir = tempfile.mkdtemp()
+
+        def send_request(http_method, bucket_name, key, headers=None, config=None,
+                         body_parser=None, hedge=False):
+            self.requests.append(headers)
+            etag = hashlib.md5(self.content).hexdigest()
+            if headers and headers[b"If-None-Match"] == compat.convert_to_bytes('"%s"' % etag):
+                error = BceServerError("Not Modified")
+                error.status_code = http.client.NOT_MODIFIED
+                raise BceHttpClientError("failed", error)
+            response = BceResponse()
+            response.metadata.etag = etag
+            response.metadata.last_modified = "Wed, 01 Jan 2020 00:00:00 GMT"
+            body_parser(TestObjectCache.FakeHttpResponse(self.content), response)
+            return response
+        self.client._send_request = send_request
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_memory_cache(self):
+        """test a 304 is a hit, a changed object is fetched again and ttl skips revalidation"""
+        self.client.object_cache = bos_cache.MemoryObjectCache(max_size=100)
+        self.assertEqual(self.client.get_object_as_string("bucket", "key"), b"content")
+        self.assertEqual(self.client.get_object_as_string("bucket", "key"), b"content")
+        self.assertEqual(self.requests[0], None)
+        self.assertEqual(self.requests[1][b"If-Modified-Since"],
+                         b"Wed, 01 Jan 2020 00:00:00 GMT")
+        self.content = b"changed"
+        self.assertEqual(self.client.get_object_as_string("bucket", "key"), b"changed")
+        self.client.object_cache.ttl = 60
+        self.content = b"changed again"
+        self.assertEqual(self.client.get_object_as_string("bucket", "key"), b"changed")
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(self.client.object_cache.size, len(b"changed"))
+
+    def test_eviction(self):
+        """test the least recently used entries are evicted beyond max_size"""
+        cache = bos_cache.MemoryObjectCache(max_size=20)
+        self.client.object_cache = cache
+        for key in ("a", "b", "c"):
+            self.client.get_object_as_string("bucket", key)
+        self.client.get_object_as_string("bucket", "a")
+        self.client.get_object_as_string("bucket", "d")
+        self.assertEqual(sorted(cache._entries), ["bucket/a", "bucket/d"])
+        self.assertEqual(cache.size, 14)
+
+    def test_disk_cache(self):
+        """test get_object_to_file through a disk cache reloaded from its directory"""
+        cache_dir = os.path.join(self.temp_dir, "cache")
+        file_name = os.path.join(self.temp_dir, "file")
+        self.client.object_cache = bos_cache.DiskObjectCache(cache_dir, ttl=60)
+        self.client.get_object_to_file("bucket", "key", file_name)
+        os.remove(file_name)
+        self.client.object_cache = bos_cache.DiskObjectCache(cache_dir, ttl=60)
+        response = self.client.get_object_to_file("bucket", "key", file_name)
+        self.assertEqual(len(self.requests), 1)
+        with open(file_name, "rb") as f:
+            self.assertEqual(f.read(), b"content")
+        self.assertEqual(response.metadata.etag, hashlib.md5(b"content").hexdigest())
+
+    def test_evicted_after_lookup(self):
+        """test an entry evicted by another thread after its lookup falls back to a GET"""
+        cache = bos_cache.MemoryObjectCache(max_size=100, ttl=60)
+        self.client.object_cache = cache
+        self.client.get_object_as_string("bucket", "key")
+        entry = cache.get("bucket/key")
+        get_object_through_cache = self.client._get_object_through_cache
+
+        def evict_after_lookup(*args, **kwargs):
+            result = get_object_through_cache(*args, **kwargs)
+            cache.clear()
+            return result
+        self.client._get_object_through_cache = evict_after_lookup
+        self.assertEqual(self.client.get_object_as_string("bucket", "key"), b"content")
+        self.assertEqual(len(self.requests), 2)
+        self.assertIsNone(cache.open(entry))
+        self.assertEqual(entry.data, b"content")
+
+        self.client.get_object_as_string("bucket", "key")
+        file_name = os.path.join(self.temp_dir, "file")
+        response = self.client.get_object_to_file("bucket", "key", file_name)
+        self.assertEqual(len(self.requests), 4)
+        self.assertEqual(response.metadata.etag, hashlib.md5(b"content").hexdigest())
+        with open(file_name, "rb") as f:
+            self.assertEqual(f.read(), b"content")
+
+
+class TestSync(unittest.TestCase):
+    """test sync_upload and sync_download"""
+    def setUp(self):
+        self.client = bos_client.BosClient(BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint=b"bj.bcebos.com"))
+        self.local_dir = tempfile.mkdtemp()
+        for name, data in [("same", b"abc"), ("changed", b"new"), ("d/new", b"n")]:
+            path = os.path.join(self.local_dir, *name.split("/"))
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, "wb") as f:
+                f.write(data)
+            mtime = 1700000000 if name == "changed" else 1500000000
+            os.utime(path, (mtime, mtime))
+        self.objects = [Expando({"key": "p/same", "size": 3,
+                                 "etag": hashlib.md5(b"abc").hexdigest(),
+                                 "last_modified": "2020-01-01T00:00:00Z"}),
+                        Expando({"key": "p/changed", "size": 3, "etag": "old",
+                                 "last_modified": "2020-01-01T00:00:00Z"}),
+                        Expando({"key": "p/stale", "size": 1, "etag": "old",
+                                 "last_modified": "2020-01-01T00:00:00Z"})]
+        self.client.list_all_objects = lambda bucket_name, prefix=None, config=None: \
+            iter(self.objects)
+
+    def tearDown(self):
+        shutil.rmtree(self.local_dir)
+
+    def test_sync_upload(self):
+        """test only the different files are uploaded and extraneous objects deleted"""
+        uploaded = []
+        deleted = []
+        self.client.upload_file = lambda bucket_name, key, file_name, config=None: \
+            uploaded.append(key)
+        self.client.delete_keys = lambda bucket_name, keys, max_workers=None, config=None: \
+            deleted.extend(keys) or Expando({"deleted_count": 1, "errors": []})
+
+        summary = self.client.sync_upload(self.local_dir, "bucket", "p", delete=True,
+                                          dry_run=True)
+        self.assertEqual((summary.transferred, summary.deleted, uploaded),
+                         (["changed", "d/new"], ["stale"], []))
+        summary = self.client.sync_upload(self.local_dir, "bucket", "p",
+                                          compare=bos_transfer.SYNC_COMPARE_ETAG, delete=True)
+        self.assertEqual(sorted(uploaded), ["p/changed", "p/d/new"])
+        self.assertEqual((summary.skipped, summary.transferred_bytes, deleted),
+                         (1, 4, ["p/stale"]))
+
+    def test_sync_download(self):
+        """test only the objects newer than the files are downloaded with their mtime"""
+        downloaded = []
+
+        def get_object_to_file(bucket_name, key, file_name, config=None):
+            downloaded.append(key)
+            with open(file_name, "wb") as f:
+                f.write(b"x")
+        self.client.get_object_to_file = get_object_to_file
+        summary = self.client.sync_download("bucket", self.local_dir, "p/", delete=True)
+        self.assertEqual(sorted(downloaded), ["p/same", "p/stale"])
+        self.assertEqual(summary.deleted, ["d/new"])
+        self.assertEqual(os.path.getmtime(os.path.join(self.local_dir, "stale")),
+                         bos_transfer.parse_last_modified("2020-01-01T00:00:00Z"))
+        self.assertRaises(ValueError, self.client.sync_download, "bucket", self.local_dir,
+                          compare="unknown")
+
+
+class TestObjectStream(unittest.TestCase):
+    """test bos_stream"""
+    def _get_stream(self, data, etag=None, crc32=None):
+        return bos_stream.ObjectStream(io.BytesIO(data), len(data), etag, crc32)
+
+    def test_iter_lines(self):
+        """test iter_lines across chunk boundaries"""
+        data = b"a\nbb\n\nccc\ndddd"
+        stream = self._get_stream(data, hashlib.md5(data).hexdigest())
+        self.assertEqual(list(stream.iter_lines(chunk_size=3)),
+                         [b"a", b"bb", b"", b"ccc", b"dddd"])
+        self.assertTrue(stream.closed)
+        stream = self._get_stream(data)
+        self.assertEqual(b"".join(stream), data)
+
+    def test_readinto(self):
+        """test readinto a preallocated buffer"""
+        data = b"0123456789"
+        stream = self._get_stream(data, hashlib.md5(data).hexdigest())
+        buf = bytearray(4)
+        received = bytearray()
+        while True:
+            n = stream.readinto(buf)
+            if n == 0:
+                break
+            received += buf[:n]
+        self.assertEqual(bytes(received), data)
+        self.assertEqual(stream.bytes_read, 10)
+
+    def test_read_zero(self):
+        """test reading zero bytes is not the end of the body"""
+        data = b"0123456789"
+        stream = self._get_stream(data, hashlib.md5(data).hexdigest())
+        self.assertEqual(stream.read(0), b"")
+        self.assertEqual(stream.readinto(bytearray(0)), 0)
+        self.assertFalse(stream.closed)
+        self.assertEqual(stream.read(4), b"0123")
+        self.assertEqual(stream.read(0), b"")
+        self.assertEqual(stream.read(), b"456789")
+        self.assertTrue(stream.closed)
+
+    def test_verify(self):
+        """test corrupted or incomplete body is detected"""
+        data = b"0123456789"
+        stream = self._get_stream(data, hashlib.md5(b"x").hexdigest())
+        self.assertRaises(BceClientError, stream.read)
+        stream = self._get_stream(data, crc32=1)
+        self.assertRaises(BceClientError, list, stream.iter_chunks(4))
+        stream = bos_stream.ObjectStream(io.BytesIO(data), 11)
+        self.assertRaises(IOError, stream.read)
+        stream = self._get_stream(data, "%s-2" % hashlib.md5(b"x").hexdigest())
+        self.assertEqual(stream.read(), data)
+
+
 def run_test():
     """start run test"""
     runner = unittest.TextTestRunner()
@@ -2637,6 +3236,15 @@ def run_test():
     runner.run(unittest.makeSuite(TestUtil))
     runner.run(unittest.makeSuite(TestHandler))
     runner.run(unittest.makeSuite(TestBceHttpClient))
+    runner.run(unittest.makeSuite(TestTimeouts))
+    runner.run(unittest.makeSuite(TestBosTransfer))
+    runner.run(unittest.makeSuite(TestObjectStream))
+    runner.run(unittest.makeSuite(TestDeleteKeys))
+    runner.run(unittest.makeSuite(TestListAllObjectsParallel))
+    runner.run(unittest.makeSuite(TestBosModel))
+    runner.run(unittest.makeSuite(TestCopyLargeObject))
+    runner.run(unittest.makeSuite(TestSync))
+    runner.run(unittest.makeSuite(TestObjectCache))
     runner.run(unittest.makeSuite(TestDoesBucketExist))
     runner.run(unittest.makeSuite(TestBceClientConfiguration))
     runner.run(unittest.makeSuite(TestGetRangeHeaderDict))
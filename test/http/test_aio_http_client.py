@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the asyncio http client.
+"""
+
+import os
+import sys
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce import compat
+from baidubce.bce_client_configuration import BceClientConfiguration
+from baidubce.http import http_methods
+
+if compat.PY3:
+    import asyncio
+    from baidubce.http import aio_http_client
+
+
+@unittest.skipIf(compat.PY2, "asyncio is not available on python2")
+class TestAioHttpClient(unittest.TestCase):
+    """test aio_http_client"""
+    class _Conn(object):
+        """fake connection reading from a stream"""
+        def __init__(self, data):
+            self.reader = asyncio.StreamReader()
+            self.reader.feed_data(data)
+            self.reader.feed_eof()
+            self.closed = False
+
+        def close(self):
+            """close"""
+            self.closed = True
+
+    def _read_response(self, data, http_method=http_methods.GET):
+        """parse data as a response and read the whole body"""
+        config = BceClientConfiguration(connection_timeout_in_mills=1000,
+                                        recv_buf_size=4,
+                                        connection_pool_size=0)
+        conn = TestAioHttpClient._Conn(data)
+        http_response = aio_http_client.AsyncHttpResponse(conn, http_method, config)
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(http_response.begin())
+            body = loop.run_until_complete(http_response.aread())
+        finally:
+            loop.close()
+        return http_response, body, conn
+
+    def test_chunked_response(self):
+        """test chunked body"""
+        http_response, body, conn = self._read_response(
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nX-Bce-Request-Id: r\r\n\r\n"
+            b"5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n")
+        self.assertEqual(http_response.status, 200)
+        self.assertEqual(http_response.getheader("x-bce-request-id"), "r")
+        self.assertEqual(body, b"hello world")
+        self.assertTrue(http_response.isclosed())
+        self.assertTrue(conn.closed)
+
+    def test_content_length_response(self):
+        """test body delimited by content-length and HEAD response"""
+        http_response, body, _ = self._read_response(
+            b"HTTP/1.1 404 Not Found\r\nContent-Length: 10\r\n\r\n0123456789trailing")
+        self.assertEqual(http_response.status, 404)
+        self.assertEqual(http_response.reason, "Not Found")
+        self.assertEqual(body, b"0123456789")
+
+        http_response, body, _ = self._read_response(
+            b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n", http_methods.HEAD)
+        self.assertEqual(body, b"")
+        self.assertTrue(http_response.isclosed())
+
+
+if __name__ == '__main__':
+    unittest.main()
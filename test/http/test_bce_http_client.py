@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the http client, without BCE endpoint.
+"""
+
+import io
+import mmap
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce import protocol
+from baidubce.auth import bce_credentials
+from baidubce.auth import bce_v1_signer
+from baidubce.bce_client_configuration import BceClientConfiguration
+from baidubce.exception import BceClientError
+from baidubce.exception import BceHttpClientError
+from baidubce.http import bce_http_client
+from baidubce.http import handler
+from baidubce.http import http_methods
+from baidubce.http import throttle
+from baidubce.retry.retry_policy import BackOffRetryPolicy
+from baidubce.retry.retry_policy import NoRetryPolicy
+
+
+class TestPreparedRequest(unittest.TestCase):
+    """test bce_http_client.PreparedRequest"""
+    def test_prepare(self):
+        """test headers are encoded once and the request is signed again on every attempt"""
+        config = BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint=b"bj.bcebos.com:8080", protocol=protocol.HTTP)
+        request = bce_http_client.PreparedRequest(
+            config, bce_v1_signer.sign, http_methods.PUT, b"/bucket/object1", u"data",
+            {b"x-bce-meta-a": 1}, {b"uploadId": b"a b"})
+        self.assertEqual(request.uri, b"/bucket/object1?uploadId=a%20b")
+        self.assertEqual(request.headers[b"Host"], b"bj.bcebos.com:8080")
+        self.assertEqual(request.headers[b"Content-Length"], b"4")
+        self.assertEqual(request.headers[b"x-bce-meta-a"], b"1")
+        request.sign()
+        self.assertEqual(request.headers[b"Authorization"],
+                         bce_v1_signer.sign(config.credentials, http_methods.PUT,
+                                            b"/bucket/object1", request.headers,
+                                            {b"uploadId": b"a b"}))
+        self.assertRaises(BceClientError, bce_http_client.PreparedRequest,
+                          config, bce_v1_signer.sign, http_methods.GET, b"/", None,
+                          {b"x-bce-meta-a": b"a\nb"}, None)
+
+
+class TestSendBody(unittest.TestCase):
+    """test bce_http_client._send_body"""
+    class RecordingConnection(object):
+        """a connection recording the chunks sent"""
+        def __init__(self, sock=None):
+            self.sock = sock
+            self.chunks = []
+
+        def send(self, data):
+            """record a copy of data and the type of data"""
+            self.chunks.append((type(data), bytes(data)))
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.temp_dir, "file")
+        self.content = os.urandom(100000)
+        with open(self.file_name, "wb") as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_sendfile(self):
+        """test a regular file is sent by socket.sendfile from its position"""
+        left, right = socket.socketpair()
+        received = []
+        reader = threading.Thread(target=lambda: received.append(right.makefile("rb").read()))
+        reader.start()
+        try:
+            conn = TestSendBody.RecordingConnection(left)
+            with open(self.file_name, "rb") as f:
+                f.seek(10)
+                self.assertEqual(bce_http_client._send_body(conn, f, 50000, 4096), 50000)
+                self.assertEqual(f.tell(), 50010)
+        finally:
+            left.close()
+            reader.join()
+            right.close()
+        self.assertEqual(conn.chunks, [])
+        self.assertEqual(received, [self.content[10:50010]])
+
+    def test_empty_body(self):
+        """test nothing is sent for a zero Content-Length"""
+        conn = TestSendBody.RecordingConnection(socket.socket())
+        try:
+            with open(self.file_name, "rb") as f:
+                self.assertEqual(bce_http_client._send_body(conn, f, 0, 4096), 0)
+        finally:
+            conn.sock.close()
+        self.assertEqual(conn.chunks, [])
+
+    def test_readinto(self):
+        """test a stream with readinto is sent through one reused buffer"""
+        conn = TestSendBody.RecordingConnection()
+        body = io.BytesIO(self.content)
+        self.assertEqual(bce_http_client._send_body(conn, body, 100001, 4096), 100000)
+        self.assertEqual(b"".join(chunk for _, chunk in conn.chunks), self.content)
+        self.assertEqual(set(t for t, _ in conn.chunks), set([memoryview]))
+
+    def test_mmap(self):
+        """test a mmap is sent by slices without reading it"""
+        conn = TestSendBody.RecordingConnection()
+        with open(self.file_name, "rb") as f:
+            body = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                body.seek(100)
+                self.assertEqual(bce_http_client._send_body(conn, body, 10000, 4096), 10000)
+                self.assertEqual(body.tell(), 10100)
+            finally:
+                body.close()
+        self.assertEqual(b"".join(chunk for _, chunk in conn.chunks), self.content[100:10100])
+        self.assertEqual([len(chunk) for _, chunk in conn.chunks], [4096, 4096, 1808])
+
+
+class TestTimeouts(unittest.TestCase):
+    """test the separate timeouts and the deadline of sdk calls"""
+    def _get_config(self, **kwargs):
+        return BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            protocol=protocol.HTTP, connection_timeout_in_mills=5000, **kwargs)
+
+    def test_get_timeouts(self):
+        """test unset timeouts fall back to connection_timeout_in_mills and are clipped"""
+        config = self._get_config(read_timeout_in_mills=100)
+        self.assertEqual(bce_http_client.get_timeouts_in_millis(config), (5000, 5000, 100))
+        timeouts = bce_http_client.get_timeouts_in_millis(config, time.time() + 1)
+        self.assertTrue(900 < timeouts[0] <= 1000)
+        self.assertEqual(timeouts[2], 100)
+
+    def test_read_timeout(self):
+        """test a server which never responds times out after the read timeout"""
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        config = self._get_config(read_timeout_in_mills=100, retry_policy=NoRetryPolicy(),
+                                  connection_pool_size=0,
+                                  endpoint="127.0.0.1:%d" % server.getsockname()[1])
+        start = time.time()
+        try:
+            with self.assertRaises(BceHttpClientError) as context:
+                bce_http_client.send_request(config, bce_v1_signer.sign, [handler.parse_error],
+                                             http_methods.GET, b"/", None, {}, {})
+        finally:
+            server.close()
+        self.assertTrue(isinstance(context.exception.last_error, socket.timeout))
+        self.assertTrue(time.time() - start < 1)
+
+    def test_deadline_bounds_retries(self):
+        """test send_request gives up instead of sleeping past the deadline"""
+        calls = []
+
+        def send_http_request(*args):
+            calls.append(args)
+            raise IOError("connection reset")
+        config = self._get_config(endpoint=b"127.0.0.1:1", deadline_in_mills=500,
+                                  retry_policy=BackOffRetryPolicy(base_interval_in_millis=300))
+        old_send_http_request = bce_http_client._send_http_request
+        bce_http_client._send_http_request = send_http_request
+        start = time.time()
+        try:
+            with self.assertRaises(BceHttpClientError) as context:
+                bce_http_client.send_request(config, bce_v1_signer.sign, [handler.parse_error],
+                                             http_methods.GET, b"/", None, {}, {})
+        finally:
+            bce_http_client._send_http_request = old_send_http_request
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(time.time() - start < 0.5)
+        self.assertTrue(isinstance(context.exception.last_error, IOError))
+
+    def test_deadline_bounds_limiter(self):
+        """test send_request waits for the limiter only until the deadline"""
+        limiter = throttle.AdaptiveLimiter(1)
+        limiter.acquire()
+        config = self._get_config(endpoint=b"127.0.0.1:1", deadline_in_mills=100,
+                                  max_concurrency=1)
+        old_get_limiter = bce_http_client._get_limiter
+        bce_http_client._get_limiter = lambda *args: limiter
+        start = time.time()
+        try:
+            with self.assertRaises(BceHttpClientError) as context:
+                bce_http_client.send_request(config, bce_v1_signer.sign, [handler.parse_error],
+                                             http_methods.GET, b"/", None, {}, {})
+        finally:
+            bce_http_client._get_limiter = old_get_limiter
+        self.assertTrue(time.time() - start < 1)
+        self.assertIn("before the deadline", str(context.exception))
+        self.assertEqual(limiter.in_flight, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
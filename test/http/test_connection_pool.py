@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the connection pool of the http client.
+"""
+
+import os
+import socket
+import sys
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce import protocol
+from baidubce.http import connection_pool
+
+
+class TestConnectionPool(unittest.TestCase):
+    """test connection_pool"""
+    class _Conn(object):
+        """fake connection holding a socket"""
+        def __init__(self, sock):
+            self.sock = sock
+            self.closed = False
+
+        def close(self):
+            """close"""
+            self.closed = True
+
+    def test_reuse_connection(self):
+        """test idle connections are reused and bounded by max_size"""
+        pool = connection_pool.ConnectionPool()
+        a, b = socket.socketpair()
+        c, d = socket.socketpair()
+        conn1 = TestConnectionPool._Conn(a)
+        conn2 = TestConnectionPool._Conn(c)
+        self.assertIsNone(pool.get_connection(protocol.HTTP, b"h", 80, 1000))
+        pool.release_connection(protocol.HTTP, b"h", 80, conn1, 1)
+        pool.release_connection(protocol.HTTP, b"h", 80, conn2, 1)
+        self.assertTrue(conn2.closed)
+        self.assertIsNone(pool.get_connection(protocol.HTTPS, b"h", 80, 1000))
+        self.assertIs(pool.get_connection(protocol.HTTP, b"h", 80, 1000), conn1)
+        self.assertIsNone(pool.get_connection(protocol.HTTP, b"h", 80, 1000))
+        for s in (a, b, c, d):
+            s.close()
+
+    def test_discard_dropped_connection(self):
+        """test half-closed and expired connections are not reused"""
+        pool = connection_pool.ConnectionPool()
+        a, b = socket.socketpair()
+        conn = TestConnectionPool._Conn(a)
+        self.assertFalse(connection_pool.is_connection_dropped(conn))
+        b.close()
+        self.assertTrue(connection_pool.is_connection_dropped(conn))
+        pool.release_connection(protocol.HTTP, b"h", 80, conn, 10)
+        self.assertIsNone(pool.get_connection(protocol.HTTP, b"h", 80, 1000))
+        self.assertTrue(conn.closed)
+        a.close()
+
+        a, b = socket.socketpair()
+        conn = TestConnectionPool._Conn(a)
+        pool.release_connection(protocol.HTTP, b"h", 80, conn, 10)
+        self.assertIsNone(pool.get_connection(protocol.HTTP, b"h", 80, -1))
+        self.assertTrue(conn.closed)
+        a.close()
+        b.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the dns cache.
+"""
+
+import os
+import socket
+import sys
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce import protocol
+from baidubce.http import bce_http_client
+from baidubce.http import dns_cache
+from baidubce.http import request_event
+
+
+class TestDnsCache(unittest.TestCase):
+    """test the dns cache"""
+    def setUp(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(5)
+        self.port = self.server.getsockname()[1]
+        self.calls = []
+        self.old_getaddrinfo = socket.getaddrinfo
+
+        def getaddrinfo(host, port, *args):
+            self.calls.append(host)
+            if host == "unknown":
+                raise socket.gaierror("unknown host")
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.2", 1)),
+                    (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", self.port))]
+        socket.getaddrinfo = getaddrinfo
+
+    def tearDown(self):
+        socket.getaddrinfo = self.old_getaddrinfo
+        self.server.close()
+
+    def test_resolve(self):
+        """test resolutions and failures are cached"""
+        cache = dns_cache.DnsCache()
+        self.assertEqual(len(cache.resolve(b"multi", self.port)), 2)
+        self.assertEqual(len(cache.resolve("multi", self.port)), 2)
+        self.assertRaises(socket.gaierror, cache.resolve, "unknown", self.port)
+        self.assertRaises(socket.gaierror, cache.resolve, "unknown", self.port)
+        self.assertEqual(self.calls, ["multi", "unknown"])
+        first = [a[4] for a in cache.get_addresses("multi", self.port)]
+        second = [a[4] for a in cache.get_addresses("multi", self.port)]
+        self.assertEqual(first, list(reversed(second)))
+
+    def test_eject(self):
+        """test an address failing to connect is tried last"""
+        cache = dns_cache.DnsCache()
+        for _ in range(3):
+            cache.create_connection(("multi", self.port), 1).close()
+        self.assertEqual([a[4] for a in cache.get_addresses("multi", self.port)],
+                         [("127.0.0.1", self.port), ("127.0.0.2", 1)])
+        cache.eject_timeout = 0
+        self.assertEqual(len(set(a[4] for a in [cache.get_addresses("multi", self.port)[0],
+                                                cache.get_addresses("multi", self.port)[0]])),
+                         2)
+
+    def test_negative_cache_raises_new_error(self):
+        """test every failure to resolve a cached name raises its own error"""
+        cache = dns_cache.DnsCache()
+        errors = []
+        for _ in range(2):
+            try:
+                cache.resolve("unknown", self.port)
+            except socket.gaierror as e:
+                errors.append(e)
+        self.assertEqual(len(errors), 2)
+        self.assertIsNot(errors[0], errors[1])
+        self.assertEqual(errors[0].args, errors[1].args)
+        self.assertEqual(self.calls, ["unknown"])
+
+    def test_cached_connection(self):
+        """test the connections of the http client resolve the host through the cache"""
+        conn = bce_http_client._get_connection(protocol.HTTP, b"multi", self.port, 1000)
+        self.assertIsInstance(conn, dns_cache.CachedHTTPConnection)
+        conn.dns_cache = dns_cache.DnsCache()
+        conn.request_event = request_event.RequestEvent(None, b'GET', None, 0)
+        conn.connect()
+        conn.close()
+        self.assertEqual(self.calls, ["multi"])
+        self.assertIn(request_event.DNS, conn.request_event.timings)
+        self.assertIn(request_event.CONNECT, conn.request_event.timings)
+
+        conn = bce_http_client._get_connection(protocol.HTTPS, b"multi", self.port, 1000)
+        self.assertIsInstance(conn, dns_cache.CachedHTTPSConnection)
+        conn = bce_http_client._get_connection(protocol.HTTP, b"multi", self.port, 1000, False)
+        self.assertNotIsInstance(conn, dns_cache.CachedHTTPConnection)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the response handlers of bce clients.
+"""
+
+import io
+import os
+import sys
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce.bce_client_configuration import BceClientConfiguration
+from baidubce.bce_response import BceResponse
+from baidubce.http import handler
+
+
+class TestHandler(unittest.TestCase):
+    """test baidubce.http.handler"""
+    def test_parse_json_raw(self):
+        """test raw_json_response mode and the JSON backend fallback"""
+        config = BceClientConfiguration(raw_json_response=True)
+        handlers = handler.get_response_handlers(config, [handler.parse_error,
+                                                          handler.parse_json])
+        self.assertEqual(handlers, [handler.parse_error, handler.parse_json_raw])
+        body = b'{"instanceId": "i-1", "size": 100000000000000000000000}'
+        response = BceResponse()
+        handler.parse_json_raw(io.BytesIO(body), response)
+        self.assertEqual(response.body, {"instanceId": "i-1", "size": 10 ** 23})
+
+        def failing_loads(body):
+            raise ValueError("unsupported")
+        handler.set_json_backend(failing_loads)
+        try:
+            self.assertEqual(handler.loads_json(body)["size"], 10 ** 23)
+        finally:
+            handler.set_json_backend(None)
+        response = BceResponse()
+        handler.parse_json(io.BytesIO(body), response)
+        self.assertEqual((response.instance_id, response.size), ("i-1", 10 ** 23))
+
+
+if __name__ == '__main__':
+    unittest.main()
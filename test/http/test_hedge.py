@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the hedged requests.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce.exception import BceClientError
+from baidubce.http import bce_http_client
+from baidubce.http import throttle
+from baidubce.http.hedge import HedgePolicy
+from baidubce.utils import Expando
+
+
+class TestHedge(unittest.TestCase):
+    """test hedged requests"""
+    def test_hedge_policy(self):
+        """test the hedge delay follows the latency percentile and hedges are budgeted"""
+        policy = HedgePolicy(initial_delay_in_millis=100, max_tokens=1)
+        self.assertEqual(policy.get_delay_in_millis("e"), 100)
+        for latency in range(1, 101):
+            policy.record_latency("e", latency)
+        self.assertEqual(policy.get_delay_in_millis("e"), 96)
+        self.assertTrue(policy.acquire())
+        self.assertFalse(policy.acquire())
+        for _ in range(20):
+            policy.record_request()
+        self.assertTrue(policy.acquire())
+
+    class Connection(object):
+        """a connection recording it is closed"""
+        closed = False
+
+        def close(self):
+            """close the connection"""
+            self.closed = True
+
+    def execute_hedged(self, first_latency, limiter=None, policy=None, deadline=None):
+        """run _execute_hedged with a first attempt taking first_latency or until cancelled"""
+        self.connections = []
+        self.threads = []
+
+        def execute(config, request, response_handler_functions, timeouts_in_millis,
+                    attempt=None, event=None):
+            conn = TestHedge.Connection()
+            self.connections.append(conn)
+            self.threads.append(threading.current_thread())
+            if len(self.connections) == 1:
+                deadline = time.time() + first_latency
+                while time.time() < deadline:
+                    # a cancelled attempt has its socket shut down
+                    if attempt._cancelled:
+                        conn.close()
+                        raise BceClientError("cancelled")
+                    time.sleep(0.01)
+            return conn, None, "response %d" % len(self.connections)
+        old_execute = bce_http_client._execute
+        bce_http_client._execute = execute
+        try:
+            return bce_http_client._execute_hedged(
+                None, Expando({"http_method": b"GET", "uri": b"/"}), [], None,
+                policy or HedgePolicy(initial_delay_in_millis=50), "e", limiter=limiter,
+                deadline=deadline)
+        finally:
+            bce_http_client._execute = old_execute
+
+    def test_slow_request_is_hedged(self):
+        """test a hedge answers a slow request, and the slow one is cancelled"""
+        start = time.time()
+        result = self.execute_hedged(5)
+        self.assertTrue(time.time() - start < 1)
+        self.assertEqual(result[2], "response 2")
+        self.assertTrue(self.connections[0].closed)
+        self.assertFalse(self.connections[1].closed)
+        self.assertIs(self.threads[0], threading.current_thread())
+        self.assertIsNot(self.threads[1], threading.current_thread())
+
+    def test_hedge_takes_limiter_slot(self):
+        """test a hedge holds a slot of the limiter, and is skipped if none is free"""
+        limiter = throttle.AdaptiveLimiter(2)
+        limiter.acquire()
+        result = self.execute_hedged(5, limiter)
+        self.assertEqual(result[2], "response 2")
+        for _ in range(100):
+            if limiter.in_flight == 1:
+                break
+            time.sleep(0.01)
+        self.assertEqual(limiter.in_flight, 1)
+
+        limiter = throttle.AdaptiveLimiter(1)
+        limiter.acquire()
+        policy = HedgePolicy(initial_delay_in_millis=50)
+        result = self.execute_hedged(0.2, limiter, policy)
+        self.assertEqual(result[2], "response 1")
+        self.assertEqual(len(self.connections), 1)
+        self.assertEqual(limiter.in_flight, 1)
+        # the budget taken for the skipped hedge is given back
+        self.assertEqual(policy._tokens, policy.max_tokens)
+
+    def test_no_hedge_after_deadline(self):
+        """test a request is not hedged if the hedge would start after the deadline"""
+        result = self.execute_hedged(0.2, deadline=time.time() + 0.03)
+        self.assertEqual(result[2], "response 1")
+        self.assertEqual(len(self.connections), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
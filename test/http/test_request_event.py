@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the request listeners of the http client.
+"""
+
+import os
+import socket
+import sys
+import threading
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce import protocol
+from baidubce.auth import bce_credentials
+from baidubce.auth import bce_v1_signer
+from baidubce.bce_client_configuration import BceClientConfiguration
+from baidubce.http import bce_http_client
+from baidubce.http import handler
+from baidubce.http import http_methods
+
+
+class TestRequestEvent(unittest.TestCase):
+    """test the request listeners"""
+    def setUp(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+
+        def serve():
+            conn, _ = self.server.accept()
+            conn.recv(65536)
+            conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n"
+                         b"x-bce-request-id: r\r\n\r\n{}")
+            conn.close()
+        self.thread = threading.Thread(target=serve)
+        self.thread.start()
+
+    def tearDown(self):
+        self.thread.join()
+        self.server.close()
+
+    def test_listeners(self):
+        """test an event is passed to the listeners after each attempt"""
+        events = []
+
+        def failing_listener(event):
+            raise ValueError("failing listener")
+        config = BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint="127.0.0.1:%d" % self.server.getsockname()[1], protocol=protocol.HTTP,
+            connection_timeout_in_mills=5000, connection_pool_size=0,
+            request_listeners=[failing_listener, events.append])
+        bce_http_client.send_request(config, bce_v1_signer.sign,
+                                     [handler.parse_error, handler.parse_json],
+                                     http_methods.PUT, b"/bucket/key", b"data", {}, {},
+                                     service_id="bos", path_template=b"/{bucket}/{key}")
+        self.assertEqual(len(events), 1)
+        event = events[0]
+        self.assertEqual((event.service_id, event.http_method, event.path_template),
+                         ("bos", http_methods.PUT, b"/{bucket}/{key}"))
+        self.assertEqual((event.status, event.retries_attempted, event.error), (200, 0, None))
+        self.assertEqual((event.bytes_sent, event.bytes_received), (4, 2))
+        for phase in ("sign", "dns", "connect", "write", "first_byte", "read"):
+            self.assertTrue(event.timings[phase] >= 0)
+        self.assertTrue(event.total_time_in_millis >= sum(event.timings.values()) * 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
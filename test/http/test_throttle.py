@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the adaptive limiter of the requests to an endpoint.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce import protocol
+from baidubce.exception import BceServerError
+from baidubce.http import throttle
+
+
+class TestThrottle(unittest.TestCase):
+    """test the adaptive limiter of the requests to an endpoint"""
+    def test_concurrency_limit(self):
+        """test no more than the limit of requests are in flight"""
+        limiter = throttle.AdaptiveLimiter(3)
+        lock = threading.Lock()
+        peak = [0]
+
+        def request():
+            limiter.acquire()
+            with lock:
+                peak[0] = max(peak[0], limiter.in_flight)
+            time.sleep(0.01)
+            limiter.release()
+        threads = [threading.Thread(target=request) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak[0], 3)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_try_acquire(self):
+        """test try_acquire fails instead of waiting for a slot or a token"""
+        limiter = throttle.AdaptiveLimiter(1)
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+        limiter.release()
+        limiter = throttle.AdaptiveLimiter(None, requests_per_second=1)
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+        self.assertEqual(limiter.in_flight, 1)
+
+    def test_acquire_timeout(self):
+        """test acquire gives up after the timeout without taking a slot or a token"""
+        limiter = throttle.AdaptiveLimiter(1)
+        self.assertTrue(limiter.acquire(1))
+        start = time.time()
+        self.assertFalse(limiter.acquire(0.05))
+        self.assertTrue(0.05 <= time.time() - start < 1)
+        self.assertEqual(limiter.in_flight, 1)
+        limiter.release()
+        limiter = throttle.AdaptiveLimiter(None, requests_per_second=1)
+        self.assertTrue(limiter.acquire(0))
+        self.assertFalse(limiter.acquire(0.1))
+        self.assertEqual(limiter.in_flight, 1)
+        self.assertTrue(limiter._bucket.tokens > -1)
+
+    def test_aimd(self):
+        """test throttling halves the limit once per interval and successes grow it back"""
+        limiter = throttle.AdaptiveLimiter(8, decrease_interval=60)
+        slow_down = BceServerError("slow down", status_code=503, code="SlowDown")
+        for _ in range(3):
+            limiter.acquire()
+        limiter.release(slow_down)
+        limiter.release(slow_down)
+        limiter.release(BceServerError("not found", status_code=404))
+        self.assertEqual(limiter.limit, 4)
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release()
+        self.assertEqual(int(limiter.limit), 5)
+        self.assertTrue(throttle.is_throttling_error(BceServerError("", status_code=429)))
+        self.assertFalse(throttle.is_throttling_error(IOError()))
+
+    def test_requests_per_second(self):
+        """test the rate cap lets a burst of one second through and then spaces requests"""
+        limiter = throttle.AdaptiveLimiter(None, requests_per_second=20)
+        start = time.time()
+        for _ in range(25):
+            limiter.acquire()
+            limiter.release()
+        self.assertTrue(0.2 <= time.time() - start < 1)
+
+    def test_shared_by_endpoint(self):
+        """test the limiter of an endpoint is shared by the clients with the same limits"""
+        registry = throttle.LimiterRegistry()
+        limiter = registry.get_limiter(protocol.HTTP, b"bj.bcebos.com", 80, 8)
+        self.assertTrue(registry.get_limiter(protocol.HTTP, b"bj.bcebos.com", 80, 8) is limiter)
+        other = registry.get_limiter(protocol.HTTP, b"bj.bcebos.com", 80, 4)
+        self.assertFalse(other is limiter)
+        self.assertEqual((limiter.limit, other.limit), (8, 4))
+        self.assertFalse(registry.get_limiter(protocol.HTTPS, b"bj.bcebos.com", 443, 8)
+                         is limiter)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the retry policies.
+"""
+
+import os
+import sys
+import time
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce import protocol
+from baidubce.auth import bce_credentials
+from baidubce.auth import bce_v1_signer
+from baidubce.bce_client_configuration import BceClientConfiguration
+from baidubce.exception import BceHttpClientError
+from baidubce.exception import BceClientError
+from baidubce.exception import BceServerError
+from baidubce.http import bce_http_client
+from baidubce.http import handler
+from baidubce.http import http_methods
+from baidubce.retry import retry_policy
+
+
+class TestJitterRetryPolicy(unittest.TestCase):
+    """test JitterRetryPolicy, RetryBudget and CircuitBreaker"""
+    def test_jitter(self):
+        """test the delays are randomized within the back-off bounds"""
+        policy = retry_policy.JitterRetryPolicy(base_interval_in_millis=100,
+                                                max_delay_in_millis=1000)
+        delays = [policy.get_delay_before_next_retry_in_millis(IOError(), 2) for _ in range(50)]
+        self.assertTrue(all(0 <= d <= 400 for d in delays))
+        self.assertTrue(len(set(delays)) > 1)
+        policy = retry_policy.JitterRetryPolicy(base_interval_in_millis=100,
+                                                max_delay_in_millis=1000,
+                                                jitter=retry_policy.JITTER_DECORRELATED)
+        previous = policy.get_delay_before_next_retry_in_millis(IOError(), 0)
+        self.assertTrue(100 <= previous <= 300)
+        for retries_attempted in range(1, 10):
+            delay = policy.get_delay_before_next_retry_in_millis(IOError(), retries_attempted)
+            self.assertTrue(100 <= delay <= min(1000, previous * 3))
+            previous = delay
+
+    def test_throttling_and_retry_after(self):
+        """test throttling errors are retried after the delay asked by the server"""
+        policy = retry_policy.JitterRetryPolicy(max_delay_in_millis=5000,
+                                                retry_budget=retry_policy.RetryBudget(1, 2))
+        error = BceServerError("slow down", status_code=429, retry_after="2")
+        self.assertTrue(policy.should_retry(error, 0))
+        self.assertEqual(policy.get_delay_before_next_retry_in_millis(error, 0), 2000)
+        self.assertFalse(policy.should_retry(BceServerError("", status_code=400), 0))
+        error.retry_after = time.strftime("%a, %d %b %Y %H:%M:%S GMT",
+                                          time.gmtime(time.time() + 3))
+        self.assertTrue(1000 < retry_policy.get_retry_after_in_millis(error) <= 3000)
+        self.assertTrue(policy.should_retry(BceServerError("", code="SlowDown"), 0))
+        # the budget of 2 tokens is exhausted
+        self.assertFalse(policy.should_retry(IOError(), 0))
+        error.retry_after = "60"
+        self.assertFalse(retry_policy.JitterRetryPolicy(max_delay_in_millis=5000)
+                         .should_retry(error, 0))
+
+    def test_circuit_breaker(self):
+        """test an endpoint failing repeatedly fails fast until a trial request succeeds"""
+        breaker = retry_policy.CircuitBreaker(failure_threshold=2, reset_timeout_in_millis=50)
+        endpoint = ("http", b"bj.bcebos.com", 80)
+        breaker.record_error(endpoint, BceServerError("", status_code=429))
+        breaker.record_error(endpoint, IOError())
+        self.assertTrue(breaker.allow_request(endpoint))
+        breaker.record_error(endpoint, BceServerError("", status_code=500))
+        self.assertFalse(breaker.allow_request(endpoint))
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request(endpoint))
+        self.assertFalse(breaker.allow_request(endpoint))
+        breaker.record_success(endpoint)
+        self.assertFalse(breaker.is_open(endpoint))
+
+    def test_circuit_breaker_client_error(self):
+        """test an error raised on the client side neither closes nor opens the circuit"""
+        breaker = retry_policy.CircuitBreaker(failure_threshold=1, reset_timeout_in_millis=50)
+        endpoint = ("http", b"bj.bcebos.com", 80)
+        breaker.record_error(endpoint, IOError())
+        breaker.record_error(endpoint, BceClientError("Deadline exceeded."))
+        self.assertTrue(breaker.is_open(endpoint))
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request(endpoint))
+        breaker.record_error(endpoint, ValueError())
+        self.assertTrue(breaker.is_open(endpoint))
+        # the trial was released, another one may be sent
+        self.assertTrue(breaker.allow_request(endpoint))
+        breaker.record_error(endpoint, BceServerError("", status_code=404))
+        self.assertFalse(breaker.is_open(endpoint))
+
+    def test_send_request_fails_fast(self):
+        """test send_request does not send requests to an endpoint whose circuit is open"""
+        calls = []
+
+        def send_http_request(*args):
+            calls.append(args)
+            raise IOError("connection refused")
+        config = BceClientConfiguration(
+            credentials=bce_credentials.BceCredentials(b"my_ak", b"my_sk"),
+            endpoint=b"127.0.0.1:1", protocol=protocol.HTTP, connection_timeout_in_mills=100,
+            retry_policy=retry_policy.JitterRetryPolicy(
+                max_error_retry=5, base_interval_in_millis=1,
+                circuit_breaker=retry_policy.CircuitBreaker(failure_threshold=2)))
+        old_send_http_request = bce_http_client._send_http_request
+        bce_http_client._send_http_request = send_http_request
+        try:
+            for _ in range(2):
+                self.assertRaises(BceHttpClientError, bce_http_client.send_request, config,
+                                  bce_v1_signer.sign, [handler.parse_error],
+                                  http_methods.GET, b"/", None, {}, {})
+        finally:
+            bce_http_client._send_http_request = old_send_http_request
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014 Baidu, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file
+# except in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the
+# License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Test the utils of bce clients.
+"""
+
+import hashlib
+import io
+import os
+import random
+import string
+import sys
+import tempfile
+import unittest
+
+file_path = os.path.normpath(os.path.dirname(__file__))
+sys.path.append(file_path + '/../../')
+
+from baidubce import compat
+from baidubce import utils
+from baidubce.bce_response import BceResponse
+
+
+class TestUtils(unittest.TestCase):
+    """test baidubce.utils"""
+    @staticmethod
+    def _normalize_string_by_byte(in_str, encoding_slash=True):
+        """the byte by byte implementation normalize_string has to be identical to"""
+        result = []
+        for ch in bytearray(utils.convert_to_standard_string(in_str)):
+            if ch == ord('/') and not encoding_slash:
+                result.append(b'/')
+            elif chr(ch) in string.ascii_letters + string.digits + '.~-_':
+                result.append(compat.convert_to_bytes(chr(ch)))
+            else:
+                result.append(compat.convert_to_bytes('%%%02X' % ch))
+        return b''.join(result)
+
+    def test_normalize_string_identical(self):
+        """test normalize_string against the byte by byte implementation on random input"""
+        rand = random.Random(0)
+        for _ in range(2000):
+            data = bytearray(rand.randint(0, 255) for _ in range(rand.randint(0, 64)))
+            safe = bytearray(rand.choice(bytearray(b'abcXYZ019.~-_/'))
+                             for _ in range(rand.randint(0, 64)))
+            for in_str in (bytes(data), bytes(safe), bytes(data).decode('latin-1'),
+                           rand.randint(-1000, 1000)):
+                for encoding_slash in (True, False):
+                    self.assertEqual(self._normalize_string_by_byte(in_str, encoding_slash),
+                                     utils.normalize_string(in_str, encoding_slash))
+        key = b"logs/2020/01/01/a-b_c.d~e"
+        self.assertIs(utils.normalize_string(key, False), key)
+
+    def test_paginate(self):
+        """test paginate with page size, item cap and read ahead"""
+        calls = []
+
+        def list_page(marker, max_keys):
+            calls.append((marker, max_keys))
+            start = marker or 0
+            response = BceResponse()
+            response.items = list(range(start, min(start + (max_keys or 4), 10)))
+            response.is_truncated = start + len(response.items) < 10
+            response.next_marker = start + len(response.items)
+            return response
+
+        self.assertEqual(list(utils.paginate(list_page, "items", read_ahead=True)),
+                         list(range(10)))
+        self.assertEqual(calls, [(None, None), (4, None), (8, None)])
+        del calls[:]
+        self.assertEqual(list(utils.paginate(list_page, "items", page_size=3, max_items=5)),
+                         list(range(5)))
+        self.assertEqual(calls, [(None, 3), (3, 2)])
+        del calls[:]
+        pages = utils.paginate(list_page, "items")
+        self.assertEqual(next(pages), 0)
+        # the next page is only requested once the items of the first one are consumed
+        self.assertEqual(calls, [(None, None)])
+        self.assertEqual(list(utils.paginate(list_page, "items", max_items=0)), [])
+
+    def test_pythonize_name_cache(self):
+        """test pythonize_name results are memoized within a bound"""
+        self.assertEqual(utils.pythonize_name("HTTPStatus200Ok"), "http_status_200_ok")
+        self.assertEqual(utils._pythonized_names["HTTPStatus200Ok"], "http_status_200_ok")
+        self.assertEqual(utils.pythonize_name("eTag"), "etag")
+        for i in range(utils._MAX_PYTHONIZED_NAMES + 1):
+            utils.pythonize_name("name%d" % i)
+        self.assertLessEqual(len(utils._pythonized_names), utils._MAX_PYTHONIZED_NAMES)
+
+    def test_guess_content_type_by_file_name(self):
+        """test guess_content_type_by_file_name with bytes and str names"""
+        self.assertEqual(utils.guess_content_type_by_file_name(b"a/b.JS"),
+                         b"application/javascript")
+        self.assertEqual(utils.guess_content_type_by_file_name("a/b.html"), b"text/html")
+        self.assertEqual(utils.guess_content_type_by_file_name("b.html"), b"text/html")
+        self.assertEqual(utils.guess_content_type_by_file_name("noext"),
+                         b"application/octet-stream")
+
+    def test_get_content_digests_from_file(self):
+        """test the digests of a mapped file match those of get_md5_from_fp"""
+        content = os.urandom(100000)
+        fd, file_name = tempfile.mkstemp()
+        try:
+            os.write(fd, content)
+            os.close(fd)
+            md5, sha256 = utils.get_content_digests_from_file(file_name, sha256=True)
+            self.assertEqual(md5, utils.get_md5_from_fp(io.BytesIO(content)))
+            self.assertEqual(sha256, compat.convert_to_bytes(hashlib.sha256(content).hexdigest()))
+            self.assertEqual(utils.get_content_digests_from_file(file_name, length=10),
+                             (utils.get_md5_from_fp(io.BytesIO(content[:10])), None))
+            open(file_name, "wb").close()
+            self.assertEqual(utils.get_content_digests_from_file(file_name),
+                             utils.get_content_digests(b""))
+        finally:
+            os.remove(file_name)
+
+
+if __name__ == '__main__':
+    unittest.main()